@@ -5,9 +5,12 @@ Agentes que recrean roles profesionales auténticos de la industria del software
 
 SPRINT 4: Integración completa con LLM real (Gemini/OpenAI) para respuestas dinámicas
 """
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from enum import Enum
+import asyncio
+import json
 import logging
+import re
 import time
 
 logger = logging.getLogger(__name__)
@@ -38,6 +41,121 @@ class SimuladorType(str, Enum):
     DEMANDING_CLIENT = "demanding_client"  # DC-IA - Demanding Client (harder version)
 
 
+# Firmas inseguras que detecta DSO-IA (auditar_seguridad), en un único regex
+# para recorrer el código una sola vez. El grupo que matchea identifica la firma.
+_DSO_SIGNATURES = re.compile(
+    r"(?P<code_injection>eval\(|exec\()"
+    r"|(?P<sql_select>SELECT \* FROM)"
+    r"|(?P<password>(?i:password))"
+)
+
+# ============================================================================
+# System prompts de los métodos Sprint 6 (IT-IA / IR-IA)
+# ============================================================================
+# Literales fijos: los datos de cada llamada (tipo, dificultad, respuesta,
+# diagnóstico...) van en el mensaje del usuario. Así el system prompt es
+# idéntico byte a byte entre llamadas y los providers con prompt caching
+# (prefijo) reutilizan el prefill en lugar de recalcularlo.
+
+INTERVIEW_QUESTION_SYSTEM_PROMPT = """Eres un entrevistador técnico senior evaluando candidatos para una posición de desarrollador.
+
+INSTRUCCIONES:
+- Genera UNA pregunta específica y desafiante apropiada para el tipo y dificultad indicados
+- Para CONCEPTUAL: pregunta sobre fundamentos, paradigmas, patrones de diseño
+- Para ALGORITHMIC: pregunta sobre complejidad, estructuras de datos, algoritmos
+- Para DESIGN: pregunta sobre diseño de sistemas, escalabilidad, arquitectura
+- Para BEHAVIORAL: pregunta sobre experiencia, decisiones técnicas pasadas
+
+La pregunta debe ser:
+- Clara y específica
+- Apropiada para el nivel de dificultad indicado
+- Que requiera razonamiento en voz alta
+- Que permita evaluar profundidad técnica
+
+Responde SOLO con la pregunta, sin preambles ni explicaciones."""
+
+INTERVIEW_ANSWER_SYSTEM_PROMPT = """Eres un entrevistador técnico senior evaluando una respuesta.
+
+EVALÚA la respuesta del candidato a la pregunta formulada en estas dimensiones:
+
+1. **Claridad** (0.0-1.0): ¿Se explica de forma clara y estructurada?
+2. **Precisión técnica** (0.0-1.0): ¿Es técnicamente correcta?
+3. **Razonamiento en voz alta** (true/false): ¿Explica su proceso de pensamiento?
+4. **Puntos clave cubiertos**: Lista de conceptos importantes mencionados
+
+Responde SOLO en formato JSON:
+{
+  "clarity_score": 0.0-1.0,
+  "technical_accuracy": 0.0-1.0,
+  "thinking_aloud": true/false,
+  "key_points_covered": ["punto1", "punto2", ...],
+  "feedback": "Feedback breve y constructivo (2-3 oraciones)"
+}"""
+
+INTERVIEW_FEEDBACK_SYSTEM_PROMPT = """Eres un entrevistador técnico senior proporcionando feedback final.
+
+A partir del resumen de la entrevista, genera un feedback narrativo (4-5 oraciones) que:
+1. Resuma el desempeño general
+2. Destaque fortalezas específicas
+3. Identifique áreas de mejora
+4. Sea constructivo y motivador
+
+Responde SOLO con el feedback, sin formato JSON."""
+
+INCIDENT_SYSTEM_PROMPT = """Eres un sistema de monitoreo generando un reporte de incidente en producción.
+
+Genera un escenario REALISTA de incidente que incluya:
+
+1. **Descripción del incidente** (2-3 líneas):
+   - Qué está fallando
+   - Impacto en usuarios/negocio
+   - Tiempo de inactividad aproximado
+
+2. **Logs simulados** (5-8 líneas de logs realistas):
+   - Timestamps
+   - Niveles de log (ERROR, WARN, INFO)
+   - Stack traces si aplica
+   - Mensajes de error específicos
+
+3. **Métricas simuladas** (JSON):
+   - cpu_usage_percent (0-100)
+   - memory_usage_percent (0-100)
+   - requests_per_second (número)
+   - error_rate_percent (0-100)
+   - response_time_ms (número)
+
+Responde SOLO en formato JSON:
+{
+  "description": "descripción del incidente",
+  "logs": "logs simulados del sistema\\n...",
+  "metrics": {
+    "cpu_usage_percent": 0-100,
+    "memory_usage_percent": 0-100,
+    "requests_per_second": número,
+    "error_rate_percent": 0-100,
+    "response_time_ms": número
+  }
+}"""
+
+INCIDENT_EVALUATION_SYSTEM_PROMPT = """Eres un ingeniero DevOps senior evaluando la resolución de un incidente.
+
+EVALÚA en estas dimensiones (0.0-1.0):
+
+1. **Diagnóstico sistemático**: ¿Siguió un proceso lógico de triage y diagnóstico?
+2. **Priorización**: ¿Priorizó correctamente las acciones por impacto?
+3. **Calidad de documentación**: ¿El post-mortem es completo y útil?
+4. **Claridad de comunicación**: ¿Se expresó de forma clara y profesional?
+
+Responde SOLO en formato JSON:
+{
+  "diagnosis_systematic": 0.0-1.0,
+  "prioritization": 0.0-1.0,
+  "documentation_quality": 0.0-1.0,
+  "communication_clarity": 0.0-1.0,
+  "feedback": "Feedback constructivo (3-4 oraciones)"
+}"""
+
+
 class SimuladorProfesionalAgent:
     """
     S-IA-X: Simuladores Profesionales
@@ -52,17 +170,37 @@ class SimuladorProfesionalAgent:
 
     def __init__(
         self, 
-        simulator_type: SimuladorType, 
+        simulator_type: Optional[SimuladorType] = None,
         llm_provider=None, 
         trace_repo=None,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        llm_batcher=None,
+        response_cache=None
     ):
         self.simulator_type = simulator_type
         self.llm_provider = llm_provider
+        # LLMRequestBatcher opcional (sobre el mismo provider): agrupa las
+        # llamadas no-streaming concurrentes de distintos requests
+        self.llm_batcher = llm_batcher
+        # RedisCache opcional: respuestas del LLM reutilizables entre requests
+        # con los mismos parámetros (ej: incidente por tipo + severidad)
+        self.response_cache = response_cache
         self.trace_repo = trace_repo
         self.config = config or {}
         self.context = {}
         self.flow_id = self.config.get("flow_id")
+        # Cola de tokens mientras corre stream_interact() (None = sin streaming)
+        self._token_queue: Optional[asyncio.Queue] = None
+        # Historial cargado de antemano con preload_conversation_history()
+        self._preloaded_history: Optional[List] = None
+
+    def preload_conversation_history(self, session_id: str, trace_repo) -> None:
+        """
+        Carga el historial de la sesión antes de interact() con un repositorio
+        de vida corta. interact() reutiliza este historial y no consulta la DB,
+        así la conexión no queda retenida mientras se espera al LLM.
+        """
+        self._preloaded_history = self._load_conversation_history(session_id, trace_repo)
 
     async def interact(
         self, 
@@ -86,7 +224,7 @@ class SimuladorProfesionalAgent:
             # VALIDACIÓN DE ENTRADA ROBUSTA
             # ============================================================
             if not student_input or not isinstance(student_input, str):
-                logger.error(f"Invalid student_input: {student_input}")
+                logger.error("Invalid student_input: %s", student_input)
                 return {
                     "message": "Por favor, ingresá un mensaje válido para continuar la simulación.",
                     "role": self.simulator_type.value if self.simulator_type else "unknown",
@@ -95,7 +233,7 @@ class SimuladorProfesionalAgent:
                 }
             
             if student_input.strip() == "":
-                logger.warning(f"Empty student_input for simulator {self.simulator_type}")
+                logger.warning("Empty student_input for simulator %s", self.simulator_type)
                 return {
                     "message": "Esperaba una respuesta de tu parte. ¿Podrías compartir tu opinión o propuesta?",
                     "role": self.simulator_type.value if self.simulator_type else "unknown",
@@ -105,7 +243,7 @@ class SimuladorProfesionalAgent:
             
             context = context or {}
             if not isinstance(context, dict):
-                logger.warning(f"Invalid context type {type(context)}, using empty dict")
+                logger.warning("Invalid context type %s, using empty dict", type(context))
                 context = {}
             
             logger.info(
@@ -134,7 +272,7 @@ class SimuladorProfesionalAgent:
             elif self.simulator_type == SimuladorType.CLIENT:
                 return await self._interact_as_client(student_input, context, session_id)
             else:
-                logger.warning(f"Unknown or unimplemented simulator type: {self.simulator_type}")
+                logger.warning("Unknown or unimplemented simulator type: %s", self.simulator_type)
                 return {
                     "message": f"El simulador {self.simulator_type} está en desarrollo. Por favor, seleccioná otro simulador.",
                     "role": self.simulator_type.value if self.simulator_type else "unknown",
@@ -143,9 +281,7 @@ class SimuladorProfesionalAgent:
                 }
         
         except Exception as e:
-            logger.error(f"Critical error in simulator interact: {type(e).__name__}: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.error("Critical error in simulator interact: %s: %s", type(e).__name__, e, exc_info=True)
             return {
                 "message": "Disculpá, tuve un problema técnico. Por favor, intentá nuevamente o reformulá tu mensaje.",
                 "role": self.simulator_type.value if self.simulator_type else "unknown",
@@ -157,6 +293,90 @@ class SimuladorProfesionalAgent:
                 }
             }
 
+    async def stream_interact(
+        self,
+        student_input: str,
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Variante streaming de interact().
+
+        Emite ("token", chunk) a medida que el LLM genera la respuesta y, al
+        final, ("response", dict) con el mismo resultado que devolvería
+        interact(). Las respuestas predefinidas (sin LLM) solo emiten el final.
+        """
+        async for event in self._stream_tokens(
+            self.interact(student_input, context, session_id), "response"
+        ):
+            yield event
+
+    async def stream_incidente(
+        self,
+        tipo_incidente: str,
+        severidad: str = "HIGH"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Variante streaming de generar_incidente().
+
+        Emite ("token", chunk) a medida que el LLM genera el JSON del incidente
+        y, al final, ("incident", dict) con el mismo resultado que devolvería
+        generar_incidente(). Fallback y cache solo emiten el final.
+        """
+        async for event in self._stream_tokens(
+            self.generar_incidente(tipo_incidente, severidad), "incident"
+        ):
+            yield event
+
+    async def _stream_tokens(self, coro, final_kind: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Corre coro publicando los chunks del LLM en la cola de tokens (ver
+        _generate_streaming) y emite ("token", chunk) por cada uno y al final
+        (final_kind, resultado).
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._token_queue = queue
+        task = asyncio.create_task(coro)
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield "token", chunk
+            yield final_kind, task.result()
+        finally:
+            self._token_queue = None
+            task.cancel()  # No-op si terminó; corta el LLM si el cliente se desconectó
+
+    async def _generate(self, messages: List[Any], **kwargs) -> Any:
+        """Llamada no-streaming al LLM, vía el batcher si fue inyectado"""
+        if self.llm_batcher is not None:
+            return await self.llm_batcher.submit(messages, **kwargs)
+        return await self.llm_provider.generate(messages=messages, **kwargs)
+
+    async def _generate_streaming(self, messages: List[Any], **kwargs) -> Any:
+        """
+        Consume generate_stream() publicando cada chunk en la cola de tokens y
+        devuelve la respuesta agregada como LLMResponse. Si el provider no
+        soporta streaming, usa generate() y publica la respuesta completa.
+        """
+        from ..llm.base import LLMResponse
+
+        chunks: List[str] = []
+        try:
+            async for chunk in self.llm_provider.generate_stream(messages, **kwargs):
+                if chunk:
+                    chunks.append(chunk)
+                    self._token_queue.put_nowait(chunk)
+        except NotImplementedError:
+            response = await self.llm_provider.generate(messages=messages, **kwargs)
+            self._token_queue.put_nowait(response.content)
+            return response
+        return LLMResponse(
+            content="".join(chunks),
+            model=getattr(self.llm_provider, "model", "unknown"),
+            usage={},
+            metadata={"streamed": True},
+        )
+
     async def _interact_as_product_owner(
         self,
         student_input: str,
@@ -497,59 +717,62 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
             # VALIDACIÓN DE PARÁMETROS
             # ============================================================
             if not role or not isinstance(role, str):
-                logger.error(f"Invalid role parameter: {role}")
+                logger.error("Invalid role parameter: %s", role)
                 role = "Unknown"
             
             if not system_prompt or not isinstance(system_prompt, str):
-                logger.error(f"Invalid system_prompt for role {role}")
+                logger.error("Invalid system_prompt for role %s", role)
                 system_prompt = f"You are a {role} in a professional simulation."
             
             if not isinstance(competencies, list):
-                logger.warning(f"Invalid competencies type for role {role}: {type(competencies)}")
+                logger.warning("Invalid competencies type for role %s: %s", role, type(competencies))
                 competencies = []
             
             if not isinstance(expects, list):
-                logger.warning(f"Invalid expects type for role {role}: {type(expects)}")
+                logger.warning("Invalid expects type for role %s: %s", role, type(expects))
                 expects = []
 
-            # Construir contexto completo
+            # Construir contexto dinámico (claves ordenadas: mismo contexto, mismos bytes)
             context_str = ""
             if context and isinstance(context, dict):
                 try:
-                    context_str = f"\n\nContexto adicional:\n{context}"
+                    context_str = "Contexto adicional:\n" + json.dumps(
+                        context, sort_keys=True, ensure_ascii=False, default=str
+                    )
                 except Exception as e:
-                    logger.warning(f"Error building context string: {e}")
+                    logger.warning("Error building context string: %s", e)
                     context_str = ""
 
             # ============================================================
             # CONSTRUCCIÓN DE MENSAJES CON MANEJO DE ERRORES
             # ============================================================
-            try:
-                messages = [
-                    LLMMessage(
-                        role=LLMRole.SYSTEM,
-                        content=f"{system_prompt}{context_str}"
-                    )
-                ]
-            except Exception as e:
-                logger.error(f"Error creating system message for role {role}: {e}")
-                # Fallback a mensaje simple
-                messages = [
-                    LLMMessage(role=LLMRole.SYSTEM, content=system_prompt)
-                ]
+            # Orden pensado para el prompt caching de los providers:
+            # [system prompt estático] -> [historial] -> [contexto + prompt actual].
+            # El system prompt del rol es un literal fijo y el historial solo crece
+            # al final, así el prefijo es idéntico entre turnos; el contexto varía
+            # por request y va en el último mensaje para no invalidar ese prefijo.
+            messages = [
+                LLMMessage(
+                    role=LLMRole.SYSTEM,
+                    content=system_prompt
+                )
+            ]
             
             # ✅ NUEVO: Cargar historial de conversación si hay session_id
             conversation_history = []
-            if session_id and self.trace_repo:
+            if self._preloaded_history is not None:
+                conversation_history = self._preloaded_history
+                messages.extend(conversation_history)
+            elif session_id and self.trace_repo:
                 try:
                     conversation_history = self._load_conversation_history(session_id)
                     messages.extend(conversation_history)
                     logger.info(
-                        f"Loaded {len(conversation_history)} messages from conversation history for role {role}",
+                        "Loaded %s messages from conversation history for role %s", len(conversation_history), role,
                         extra={"session_id": session_id, "role": role}
                     )
                 except Exception as e:
-                    logger.warning(f"Error loading conversation history for session {session_id}: {type(e).__name__}: {e}")
+                    logger.warning("Error loading conversation history for session %s: %s: %s", session_id, type(e).__name__, e)
                     # Continuar sin historial
             
             # Agregar el prompt actual del estudiante
@@ -557,11 +780,11 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                 messages.append(
                     LLMMessage(
                         role=LLMRole.USER,
-                        content=student_input
+                        content=f"{context_str}\n\n{student_input}" if context_str else student_input
                     )
                 )
             except Exception as e:
-                logger.error(f"Error adding user message for role {role}: {e}")
+                logger.error("Error adding user message for role %s: %s", role, e)
                 raise ValueError(f"Could not process student input: {e}")
 
             # ============================================================
@@ -583,12 +806,15 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                 llm_started_at = time.perf_counter()
                 
                 # Los simuladores usan Flash (conversaci\u00f3n normal, no an\u00e1lisis profundo)
-                response = await self.llm_provider.generate(
-                    messages=messages,
-                    temperature=simulator_temperature,
-                    max_tokens=simulator_max_tokens,
-                    is_code_analysis=False  # Simuladores usan Flash
-                )
+                llm_kwargs = {
+                    "temperature": simulator_temperature,
+                    "max_tokens": simulator_max_tokens,
+                    "is_code_analysis": False,  # Simuladores usan Flash
+                }
+                if self._token_queue is not None:
+                    response = await self._generate_streaming(messages, **llm_kwargs)
+                else:
+                    response = await self._generate(messages, **llm_kwargs)
                 logger.info(
                     "Simulator received LLM response",
                     extra={
@@ -601,15 +827,13 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                     },
                 )
             except AttributeError as e:
-                logger.error(f"LLM provider missing 'generate' method: {type(e).__name__}: {e}")
+                logger.error("LLM provider missing 'generate' method: %s: %s", type(e).__name__, e)
                 raise RuntimeError(f"LLM provider is not properly configured: {e}")
             except ValueError as e:
-                logger.error(f"Invalid parameters for LLM generation: {type(e).__name__}: {e}")
+                logger.error("Invalid parameters for LLM generation: %s: %s", type(e).__name__, e)
                 raise ValueError(f"Invalid LLM parameters: {e}")
             except Exception as e:
-                logger.error(f"Unexpected error calling LLM for role {role}: {type(e).__name__}: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
+                logger.error("Unexpected error calling LLM for role %s: %s: %s", role, type(e).__name__, e, exc_info=True)
                 raise RuntimeError(f"LLM generation failed: {e}")
 
             # ============================================================
@@ -619,7 +843,7 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
             try:
                 competency_scores = self._analyze_competencies(student_input, response.content, competencies)
             except Exception as e:
-                logger.warning(f"Error analyzing competencies for role {role}: {type(e).__name__}: {e}")
+                logger.warning("Error analyzing competencies for role %s: %s: %s", role, type(e).__name__, e)
                 # Continuar sin scores de competencias
 
             # ============================================================
@@ -648,7 +872,7 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                     }
                 }
             except Exception as e:
-                logger.error(f"Error building final response for role {role}: {type(e).__name__}: {e}")
+                logger.error("Error building final response for role %s: %s: %s", role, type(e).__name__, e)
                 # Retornar respuesta mínima
                 return {
                     "message": response.content if hasattr(response, 'content') else "Response generated successfully",
@@ -658,7 +882,7 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                 }
 
         except ValueError as ve:
-            logger.error(f"Validation error in _generate_llm_response for role {role}: {ve}")
+            logger.error("Validation error in _generate_llm_response for role %s: %s", role, ve)
             return {
                 "message": f"[{role}] No pude procesar tu entrada. Por favor, reformulá tu consulta.",
                 "role": role.lower().replace(" ", "_"),
@@ -670,7 +894,7 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                 }
             }
         except RuntimeError as re:
-            logger.error(f"Runtime error in _generate_llm_response for role {role}: {re}")
+            logger.error("Runtime error in _generate_llm_response for role %s: %s", role, re)
             return {
                 "message": f"[{role}] Ocurrió un problema técnico. Por favor, intentá nuevamente.",
                 "role": role.lower().replace(" ", "_"),
@@ -682,9 +906,7 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                 }
             }
         except Exception as e:
-            logger.error(f"Critical error in _generate_llm_response for role {role}: {type(e).__name__}: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.error("Critical error in _generate_llm_response for role %s: %s: %s", role, type(e).__name__, e, exc_info=True)
             # Fallback: respuesta genérica
             return {
                 "message": f"[{role}] Ha ocurrido un error inesperado. Por favor, reformulá tu consulta o contactá al soporte técnico.",
@@ -763,7 +985,8 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
 
     def _load_conversation_history(
         self,
-        session_id: str
+        session_id: str,
+        trace_repo=None
     ) -> List:
         """
         ✅ NUEVO: Carga el historial de conversación de esta sesión como mensajes LLM.
@@ -773,11 +996,13 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
         
         Args:
             session_id: ID de la sesión actual
+            trace_repo: Repositorio a usar (default: self.trace_repo)
         
         Returns:
             Lista de LLMMessage con el historial formateado
         """
-        if self.trace_repo is None:
+        trace_repo = trace_repo or self.trace_repo
+        if trace_repo is None:
             logger.warning("No trace repository available for conversation history")
             return []
         
@@ -786,7 +1011,7 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
             from ..models.trace import InteractionType
             
             # Recuperar todas las trazas de esta sesión
-            db_traces = self.trace_repo.get_by_session(session_id)
+            db_traces = trace_repo.get_by_session(session_id)
             
             messages = []
             for trace in db_traces:
@@ -812,14 +1037,14 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
                     )
             
             logger.info(
-                f"Loaded conversation history: {len(messages)} messages",
+                "Loaded conversation history: %s messages", len(messages),
                 extra={"session_id": session_id}
             )
             return messages
             
         except Exception as e:
             logger.error(
-                f"Error loading conversation history: {e}",
+                "Error loading conversation history: %s", e,
                 exc_info=True,
                 extra={"session_id": session_id}
             )
@@ -853,49 +1078,34 @@ Ah, y tiene que estar lista en 2 semanas porque mi cuñado dijo que puede conseg
         try:
             from ..llm.base import LLMMessage, LLMRole
 
-            system_prompt = f"""Eres un entrevistador técnico senior evaluando candidatos para una posición de desarrollador.
-
-Tipo de entrevista: {tipo_entrevista}
+            user_prompt = f"""Tipo de entrevista: {tipo_entrevista}
 Nivel de dificultad: {dificultad}
 
-INSTRUCCIONES:
-- Genera UNA pregunta específica y desafiante apropiada para el tipo y dificultad
-- Para CONCEPTUAL: pregunta sobre fundamentos, paradigmas, patrones de diseño
-- Para ALGORITHMIC: pregunta sobre complejidad, estructuras de datos, algoritmos
-- Para DESIGN: pregunta sobre diseño de sistemas, escalabilidad, arquitectura
-- Para BEHAVIORAL: pregunta sobre experiencia, decisiones técnicas pasadas
-
-La pregunta debe ser:
-- Clara y específica
-- Apropiada para el nivel ({dificultad})
-- Que requiera razonamiento en voz alta
-- Que permita evaluar profundidad técnica
-
 {contexto}
 
-Responde SOLO con la pregunta, sin preambles ni explicaciones."""
+Genera una pregunta {tipo_entrevista} de nivel {dificultad}"""
 
             messages = [
-                LLMMessage(role=LLMRole.SYSTEM, content=system_prompt),
-                LLMMessage(role=LLMRole.USER, content=f"Genera una pregunta {tipo_entrevista} de nivel {dificultad}")
+                LLMMessage(role=LLMRole.SYSTEM, content=INTERVIEW_QUESTION_SYSTEM_PROMPT),
+                LLMMessage(role=LLMRole.USER, content=user_prompt)
             ]
 
-            response = await self.llm_provider.generate(
-                messages=messages,
+            response = await self._generate(
+                messages,
                 temperature=0.8,  # Alta creatividad para preguntas variadas
                 max_tokens=300,
                 is_code_analysis=False  # Simuladores usan Flash
             )
 
             logger.info(
-                f"Pregunta de entrevista generada",
+                "Pregunta de entrevista generada",
                 extra={"tipo": tipo_entrevista, "dificultad": dificultad}
             )
 
             return response.content.strip()
 
         except Exception as e:
-            logger.error(f"Error generando pregunta de entrevista: {e}", exc_info=True)
+            logger.error("Error generando pregunta de entrevista: %s", e, exc_info=True)
             return self._get_fallback_question(tipo_entrevista, dificultad)
 
     def _get_fallback_question(self, tipo_entrevista: str, dificultad: str) -> str:
@@ -954,34 +1164,19 @@ Responde SOLO con la pregunta, sin preambles ni explicaciones."""
         try:
             from ..llm.base import LLMMessage, LLMRole
 
-            system_prompt = f"""Eres un entrevistador técnico senior evaluando una respuesta.
-
-Pregunta formulada: {pregunta}
+            user_prompt = f"""Pregunta formulada: {pregunta}
 Tipo de entrevista: {tipo_entrevista}
 
-EVALÚA la respuesta del candidato en estas dimensiones:
-
-1. **Claridad** (0.0-1.0): ¿Se explica de forma clara y estructurada?
-2. **Precisión técnica** (0.0-1.0): ¿Es técnicamente correcta?
-3. **Razonamiento en voz alta** (true/false): ¿Explica su proceso de pensamiento?
-4. **Puntos clave cubiertos**: Lista de conceptos importantes mencionados
-
-Responde SOLO en formato JSON:
-{{
-  "clarity_score": 0.0-1.0,
-  "technical_accuracy": 0.0-1.0,
-  "thinking_aloud": true/false,
-  "key_points_covered": ["punto1", "punto2", ...],
-  "feedback": "Feedback breve y constructivo (2-3 oraciones)"
-}}"""
+Respuesta del candidato:
+{respuesta}"""
 
             messages = [
-                LLMMessage(role=LLMRole.SYSTEM, content=system_prompt),
-                LLMMessage(role=LLMRole.USER, content=f"Respuesta del candidato:\n{respuesta}")
+                LLMMessage(role=LLMRole.SYSTEM, content=INTERVIEW_ANSWER_SYSTEM_PROMPT),
+                LLMMessage(role=LLMRole.USER, content=user_prompt)
             ]
 
-            response = await self.llm_provider.generate(
-                messages=messages,
+            response = await self._generate(
+                messages,
                 temperature=0.3,  # Baja temperatura para evaluación consistente
                 max_tokens=400,
                 is_code_analysis=False  # Simuladores usan Flash
@@ -993,7 +1188,7 @@ Responde SOLO en formato JSON:
                 evaluation = json.loads(response.content)
             except json.JSONDecodeError as json_err:
                 logger.warning(
-                    f"Failed to parse LLM response as JSON: {json_err}",
+                    "Failed to parse LLM response as JSON: %s", json_err,
                     extra={"raw_response": response.content[:200]}
                 )
                 return self._evaluate_response_heuristic(respuesta)
@@ -1009,7 +1204,7 @@ Responde SOLO en formato JSON:
             return evaluation
 
         except Exception as e:
-            logger.error(f"Error evaluando respuesta de entrevista: {e}", exc_info=True)
+            logger.error("Error evaluando respuesta de entrevista: %s", e, exc_info=True)
             return self._evaluate_response_heuristic(respuesta)
 
     def _evaluate_response_heuristic(self, respuesta: str) -> Dict[str, Any]:
@@ -1084,9 +1279,7 @@ Responde SOLO en formato JSON:
             try:
                 from ..llm.base import LLMMessage, LLMRole
 
-                system_prompt = f"""Eres un entrevistador técnico senior proporcionando feedback final.
-
-Tipo de entrevista: {tipo_entrevista}
+                user_prompt = f"""Tipo de entrevista: {tipo_entrevista}
 Número de preguntas: {len(preguntas)}
 Score global: {overall_score:.2f} / 1.0
 
@@ -1095,21 +1288,15 @@ Scores por dimensión:
 - Precisión técnica: {avg_accuracy:.2f}
 - Comunicación: {communication_score:.2f}
 
-Genera un feedback narrativo (4-5 oraciones) que:
-1. Resuma el desempeño general
-2. Destaque fortalezas específicas
-3. Identifique áreas de mejora
-4. Sea constructivo y motivador
-
-Responde SOLO con el feedback, sin formato JSON."""
+Genera el feedback final de la entrevista"""
 
                 messages = [
-                    LLMMessage(role=LLMRole.SYSTEM, content=system_prompt),
-                    LLMMessage(role=LLMRole.USER, content="Genera el feedback final de la entrevista")
+                    LLMMessage(role=LLMRole.SYSTEM, content=INTERVIEW_FEEDBACK_SYSTEM_PROMPT),
+                    LLMMessage(role=LLMRole.USER, content=user_prompt)
                 ]
 
-                response = await self.llm_provider.generate(
-                    messages=messages,
+                response = await self._generate(
+                    messages,
                     temperature=0.6,
                     max_tokens=300,
                     is_code_analysis=False  # Simuladores usan Flash
@@ -1118,7 +1305,7 @@ Responde SOLO con el feedback, sin formato JSON."""
                 feedback = response.content.strip()
 
             except Exception as e:
-                logger.error(f"Error generando feedback final: {e}")
+                logger.error("Error generando feedback final: %s", e)
                 feedback = self._generate_fallback_feedback(overall_score, breakdown)
         else:
             feedback = self._generate_fallback_feedback(overall_score, breakdown)
@@ -1175,65 +1362,41 @@ Se recomienda practicar razonamiento en voz alta y profundizar conceptos técnic
         if not self.llm_provider:
             return self._get_fallback_incident(tipo_incidente, severidad)
 
+        cache_key = f"{tipo_incidente}:{severidad}"
+        if self.response_cache is not None:
+            # El cache es síncrono (Redis): se consulta fuera del event loop
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key, mode="INCIDENT")
+            if cached is not None:
+                return json.loads(cached)
+
         try:
             from ..llm.base import LLMMessage, LLMRole
 
-            system_prompt = f"""Eres un sistema de monitoreo generando un reporte de incidente en producción.
-
-Tipo de incidente: {tipo_incidente}
+            user_prompt = f"""Tipo de incidente: {tipo_incidente}
 Severidad: {severidad}
 
-Genera un escenario REALISTA de incidente que incluya:
-
-1. **Descripción del incidente** (2-3 líneas):
-   - Qué está fallando
-   - Impacto en usuarios/negocio
-   - Tiempo de inactividad aproximado
-
-2. **Logs simulados** (5-8 líneas de logs realistas):
-   - Timestamps
-   - Niveles de log (ERROR, WARN, INFO)
-   - Stack traces si aplica
-   - Mensajes de error específicos
-
-3. **Métricas simuladas** (JSON):
-   - cpu_usage_percent (0-100)
-   - memory_usage_percent (0-100)
-   - requests_per_second (número)
-   - error_rate_percent (0-100)
-   - response_time_ms (número)
-
-Responde SOLO en formato JSON:
-{{
-  "description": "descripción del incidente",
-  "logs": "logs simulados del sistema\\n...",
-  "metrics": {{
-    "cpu_usage_percent": 0-100,
-    "memory_usage_percent": 0-100,
-    "requests_per_second": número,
-    "error_rate_percent": 0-100,
-    "response_time_ms": número
-  }}
-}}"""
+Genera incidente {tipo_incidente} de severidad {severidad}"""
 
             messages = [
-                LLMMessage(role=LLMRole.SYSTEM, content=system_prompt),
-                LLMMessage(role=LLMRole.USER, content=f"Genera incidente {tipo_incidente} de severidad {severidad}")
+                LLMMessage(role=LLMRole.SYSTEM, content=INCIDENT_SYSTEM_PROMPT),
+                LLMMessage(role=LLMRole.USER, content=user_prompt)
             ]
 
-            response = await self.llm_provider.generate(
-                messages=messages,
-                temperature=0.7,
-                max_tokens=600,
-                is_code_analysis=False  # Simuladores usan Flash
-            )
+            llm_kwargs = {
+                "temperature": 0.7,
+                "max_tokens": 600,
+                "is_code_analysis": False,  # Simuladores usan Flash
+            }
+            if self._token_queue is not None:
+                response = await self._generate_streaming(messages, **llm_kwargs)
+            else:
+                response = await self._generate(messages, **llm_kwargs)
 
-            import json
             try:
                 incident_data = json.loads(response.content)
             except json.JSONDecodeError as json_err:
                 logger.warning(
-                    f"Failed to parse incident JSON from LLM: {json_err}",
+                    "Failed to parse incident JSON from LLM: %s", json_err,
                     extra={"raw_response": response.content[:200]}
                 )
                 return self._get_fallback_incident(tipo_incidente, severidad)
@@ -1243,10 +1406,16 @@ Responde SOLO en formato JSON:
                 extra={"tipo": tipo_incidente, "severidad": severidad}
             )
 
+            # Solo se cachea lo que generó el LLM, nunca el fallback
+            if self.response_cache is not None:
+                await asyncio.to_thread(
+                    self.response_cache.set, cache_key, response.content, mode="INCIDENT"
+                )
+
             return incident_data
 
         except Exception as e:
-            logger.error(f"Error generando incidente: {e}", exc_info=True)
+            logger.error("Error generando incidente: %s", e, exc_info=True)
             return self._get_fallback_incident(tipo_incidente, severidad)
 
     def _get_fallback_incident(self, tipo_incidente: str, severidad: str) -> Dict[str, Any]:
@@ -1365,9 +1534,7 @@ Responde SOLO en formato JSON:
         try:
             from ..llm.base import LLMMessage, LLMRole
 
-            system_prompt = f"""Eres un ingeniero DevOps senior evaluando la resolución de un incidente.
-
-PROCESO DE DIAGNÓSTICO ({len(proceso_diagnostico)} pasos):
+            user_prompt = f"""PROCESO DE DIAGNÓSTICO ({len(proceso_diagnostico)} pasos):
 {self._format_diagnosis_process(proceso_diagnostico)}
 
 SOLUCIÓN PROPUESTA:
@@ -1379,29 +1546,15 @@ CAUSA RAÍZ IDENTIFICADA:
 POST-MORTEM:
 {post_mortem}
 
-EVALÚA en estas dimensiones (0.0-1.0):
-
-1. **Diagnóstico sistemático**: ¿Siguió un proceso lógico de triage y diagnóstico?
-2. **Priorización**: ¿Priorizó correctamente las acciones por impacto?
-3. **Calidad de documentación**: ¿El post-mortem es completo y útil?
-4. **Claridad de comunicación**: ¿Se expresó de forma clara y profesional?
-
-Responde SOLO en formato JSON:
-{{
-  "diagnosis_systematic": 0.0-1.0,
-  "prioritization": 0.0-1.0,
-  "documentation_quality": 0.0-1.0,
-  "communication_clarity": 0.0-1.0,
-  "feedback": "Feedback constructivo (3-4 oraciones)"
-}}"""
+Evalúa la resolución del incidente"""
 
             messages = [
-                LLMMessage(role=LLMRole.SYSTEM, content=system_prompt),
-                LLMMessage(role=LLMRole.USER, content="Evalúa la resolución del incidente")
+                LLMMessage(role=LLMRole.SYSTEM, content=INCIDENT_EVALUATION_SYSTEM_PROMPT),
+                LLMMessage(role=LLMRole.USER, content=user_prompt)
             ]
 
-            response = await self.llm_provider.generate(
-                messages=messages,
+            response = await self._generate(
+                messages,
                 temperature=0.3,
                 max_tokens=500,
                 is_code_analysis=False  # Simuladores usan Flash
@@ -1412,7 +1565,7 @@ Responde SOLO en formato JSON:
                 evaluation = json.loads(response.content)
             except json.JSONDecodeError as json_err:
                 logger.warning(
-                    f"Failed to parse incident evaluation JSON from LLM: {json_err}",
+                    "Failed to parse incident evaluation JSON from LLM: %s", json_err,
                     extra={"raw_response": response.content[:200]}
                 )
                 return self._evaluate_incident_heuristic(
@@ -1437,7 +1590,7 @@ Responde SOLO en formato JSON:
             return evaluation
 
         except Exception as e:
-            logger.error(f"Error evaluando resolución de incidente: {e}", exc_info=True)
+            logger.error("Error evaluando resolución de incidente: %s", e, exc_info=True)
             return self._evaluate_incident_heuristic(
                 proceso_diagnostico, solucion, causa_raiz, post_mortem
             )
@@ -1563,27 +1716,39 @@ Responde SOLO en formato JSON:
 
         vulnerabilities_found = []
 
-        # Detección simple de patrones inseguros
-        if "eval(" in codigo or "exec(" in codigo:
+        # Detección simple de patrones inseguros: una sola pasada sobre el
+        # código con el regex precompilado; primera aparición de cada firma
+        first_hit: Dict[str, int] = {}
+        for match in _DSO_SIGNATURES.finditer(codigo):
+            if match.lastgroup not in first_hit:
+                first_hit[match.lastgroup] = match.start()
+
+        def line_of(offset: int) -> int:
+            return codigo.count("\n", 0, offset) + 1
+
+        if "code_injection" in first_hit:
             vulnerabilities_found.append({
                 "severity": "CRITICAL",
                 "vulnerability_type": "CODE_INJECTION",
+                "line_number": line_of(first_hit["code_injection"]),
                 "description": "Uso de eval/exec permite ejecución de código arbitrario",
                 "recommendation": "Nunca uses eval/exec con input de usuario"
             })
 
-        if "SELECT * FROM" in codigo and "%" in codigo:
+        if "sql_select" in first_hit and "%" in codigo:
             vulnerabilities_found.append({
                 "severity": "HIGH",
                 "vulnerability_type": "SQL_INJECTION",
+                "line_number": line_of(first_hit["sql_select"]),
                 "description": "Posible SQL injection por concatenación de strings",
                 "recommendation": "Usa queries parametrizadas"
             })
 
-        if "password" in codigo.lower() and ("=" in codigo or ":" in codigo):
+        if "password" in first_hit and ("=" in codigo or ":" in codigo):
             vulnerabilities_found.append({
                 "severity": "CRITICAL",
                 "vulnerability_type": "HARDCODED_CREDENTIALS",
+                "line_number": line_of(first_hit["password"]),
                 "description": "Credenciales hardcodeadas en el código",
                 "recommendation": "Usa variables de entorno o secret management"
             })
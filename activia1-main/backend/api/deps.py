@@ -2,9 +2,13 @@
 Dependency injection para FastAPI
 Sistema centralizado para proveer dependencias a los endpoints
 """
-from typing import Generator, Optional
+from typing import Generator, NamedTuple, Optional
+import asyncio
 import logging
+import os
 import threading
+
+import orjson
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -19,7 +23,8 @@ from ..database.repositories import (
 )
 from ..core import AIGateway
 from ..core.cache import get_llm_cache
-from ..llm import LLMProviderFactory
+from ..core.redis_cache import RedisCache
+from ..llm import LLMMessage, LLMProviderFactory, LLMRole
 
 logger = logging.getLogger(__name__)
 
@@ -187,6 +192,51 @@ def get_llm_provider():
     return _llm_provider_instance
 
 
+# Warm-up del LLM al arrancar: la primera llamada paga el handshake con el
+# provider (o la carga del modelo en Ollama) y no un request de un estudiante.
+# Mientras corre, /health/ready responde 503.
+LLM_WARMUP_TIMEOUT_SECONDS = float(os.getenv("LLM_WARMUP_TIMEOUT_SECONDS", "120"))
+_llm_warmup_pending = False
+
+
+async def _warm_up_llm_provider() -> None:
+    """Crea el provider compartido y hace una generación mínima (1 token)."""
+    global _llm_warmup_pending
+    try:
+        provider = await asyncio.to_thread(get_llm_provider)
+        await asyncio.wait_for(
+            provider.generate([LLMMessage(role=LLMRole.USER, content="ping")], max_tokens=1),
+            timeout=LLM_WARMUP_TIMEOUT_SECONDS,
+        )
+        logger.info("LLM provider warmed up", extra={"model": getattr(provider, "model", None)})
+    except Exception as e:
+        # Un provider caído no bloquea el arranque: el primer request reintenta
+        logger.warning("LLM warm-up failed (non-critical): %s: %s", type(e).__name__, e)
+    finally:
+        _llm_warmup_pending = False
+
+
+def start_llm_warmup() -> asyncio.Task:
+    """Lanza el warm-up del LLM en background (llamar desde el lifespan de la app)."""
+    global _llm_warmup_pending
+    _llm_warmup_pending = True
+    return asyncio.get_running_loop().create_task(_warm_up_llm_provider())
+
+
+async def stop_llm_warmup(task: Optional[asyncio.Task]) -> None:
+    """Cancela el warm-up si sigue corriendo y espera a que termine de cerrarse."""
+    if task is None or task.done():
+        return
+    task.cancel()
+    # Sin esperar, la generación en curso queda colgada y nunca se cierra
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def is_llm_warming_up() -> bool:
+    """True mientras el warm-up lanzado al arrancar no terminó."""
+    return _llm_warmup_pending
+
+
 def get_ai_gateway(
     session_repo: SessionRepository = Depends(get_session_repository),
     trace_repo: TraceRepository = Depends(get_trace_repository),
@@ -588,4 +638,69 @@ async def validate_session_exists(
     if not session:
         raise SessionNotFoundError(session_id)
 
-    return session
\ No newline at end of file
+    return session
+
+# =============================================================================
+# Session State Cache
+# =============================================================================
+# Los endpoints de simuladores validan la sesión (existe / está activa) en cada
+# turno. Esa proyección mínima se cachea en Redis (fallback a memoria) con TTL
+# corto; los endpoints que cambian el estado de la sesión la invalidan.
+
+SESSION_STATE_CACHE_TTL_SECONDS = int(os.getenv("SESSION_STATE_CACHE_TTL_SECONDS", "60"))
+_SESSION_STATE_CACHE_MODE = "SESSION_STATE"
+
+_session_state_cache: Optional[RedisCache] = None
+
+
+class SessionState(NamedTuple):
+    """Proyección de SessionDB necesaria para validar interacciones"""
+    id: str
+    student_id: str
+    activity_id: str
+    status: str
+
+
+def _get_session_state_cache() -> RedisCache:
+    """Cache de estado de sesiones, creado lazy."""
+    global _session_state_cache
+    if _session_state_cache is None:
+        _session_state_cache = RedisCache(
+            ttl_seconds=SESSION_STATE_CACHE_TTL_SECONDS,
+            prefix="session_state:",
+        )
+    return _session_state_cache
+
+
+def get_session_state(session_repo: SessionRepository, session_id: str) -> Optional[SessionState]:
+    """
+    Obtiene id/student_id/activity_id/status de una sesión, desde el cache si
+    está disponible y si no desde la base de datos.
+
+    Args:
+        session_repo: Repositorio de sesiones
+        session_id: ID de la sesión
+
+    Returns:
+        SessionState, o None si la sesión no existe (los misses no se cachean)
+    """
+    cache = _get_session_state_cache()
+    cached = cache.get(session_id, mode=_SESSION_STATE_CACHE_MODE)
+    if cached is not None:
+        return SessionState(*orjson.loads(cached))
+
+    session = session_repo.get_by_id(session_id)
+    if not session:
+        return None
+
+    state = SessionState(session.id, session.student_id, session.activity_id, session.status)
+    try:
+        cache.set(session_id, orjson.dumps(list(state)).decode(), mode=_SESSION_STATE_CACHE_MODE)
+    except TypeError:
+        pass  # Campos no serializables (p. ej. mocks en tests): no se cachea
+    return state
+
+
+def invalidate_session_state(session_id: str) -> None:
+    """Descarta el estado cacheado de una sesión (llamar al cambiar su status)."""
+    _get_session_state_cache().delete(session_id, mode=_SESSION_STATE_CACHE_MODE)
@@ -10,11 +10,13 @@ Autores: AI-Native Research Team
 Versión: 0.1.0
 """
 import logging
+import os
 import sys
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .. import __version__, __author__
 from ..database import init_database
@@ -119,11 +121,40 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to initialize Prometheus metrics (non-critical): {e}")
 
+    # Redis de las sesiones de training (si no responde, quedan en memoria)
+    from .routers.training import check_redis_connection
+    await check_redis_connection()
+
+    # Warm-up del LLM en background (/health/ready responde 503 hasta que termine)
+    llm_warmup_task = None
+    if os.getenv("LLM_WARMUP_ON_STARTUP", "true").lower() == "true":
+        from .deps import start_llm_warmup
+        llm_warmup_task = start_llm_warmup()
+
     yield  # Aplicación en ejecución
 
     # Shutdown
     logger.info("AI-Native MVP - Shutting down")
 
+    from .deps import stop_llm_warmup
+    await stop_llm_warmup(llm_warmup_task)
+
+    # Cerrar los batchers de LLM compartidos (los requests en espera fallan
+    # en lugar de quedar colgados)
+    from .routers.exercises import close_ai_eval_batcher
+    from .routers.risk_analysis import close_risk_batcher
+    from .routers.simulators import close_simulator_batcher
+    await close_ai_eval_batcher()
+    await close_risk_batcher()
+    await close_simulator_batcher()
+
+    # Cerrar el pool de procesos del sandbox de ejercicios
+    from .routers.exercises import shutdown_sandbox_pool
+    shutdown_sandbox_pool()
+
+    from .routers.training import close_redis_pool
+    await close_redis_pool()
+
 
 # =============================================================================
 # Crear aplicación FastAPI
@@ -232,6 +263,8 @@ app = FastAPI(
         },
     ],
     lifespan=lifespan,
+    # orjson serializa las respuestas en C (más rápido que json stdlib, UTF-8 nativo)
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
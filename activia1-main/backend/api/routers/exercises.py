@@ -1,16 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, status, Request, Response, BackgroundTasks
+from sqlalchemy import func, case, tuple_
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import asyncio
+import functools
+import multiprocessing
 import subprocess
 import tempfile
 import os
 import time
-import json
 import logging
+import re
+import uuid
+import orjson
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from backend.database.config import get_db
+from backend.database.background_session import get_background_db_session
 from backend.models.exercise import Exercise, UserExerciseSubmission
 from backend.api.routers.auth_new import get_current_user
 # FIX Cortez25: Use UserDB from database.models to avoid duplicate table definition
@@ -24,6 +32,7 @@ from backend.services.code_evaluator import CodeEvaluator
 # Importar LLM provider para evaluación con IA
 from backend.api.deps import get_llm_provider
 from backend.llm.base import LLMMessage, LLMRole
+from backend.llm.batcher import LLMRequestBatcher
 from backend.api.schemas.exercises import (
     ExerciseJSONSchema,
     ExerciseListItemSchema,
@@ -35,6 +44,7 @@ from backend.api.schemas.exercises import (
     UserProgressSchema,
     # Legacy schemas
     ExerciseResponse,
+    ExerciseListResponse,
     CodeSubmission,
     SubmissionResult,
 )
@@ -45,39 +55,122 @@ router = APIRouter(prefix="/exercises", tags=["Code Exercises"])
 
 # Inicializar loader y evaluador
 exercise_loader = ExerciseLoader()
+# Items de listado precalculados: los ejercicios JSON son estáticos en runtime
+_json_list_items: Dict[str, ExerciseListItemSchema] = {
+    ex['id']: ExerciseListItemSchema(
+        id=ex['id'],
+        title=ex['meta']['title'],
+        difficulty=ex['meta']['difficulty'],
+        estimated_time_minutes=ex['meta'].get('estimated_time_min', ex['meta'].get('estimated_time_minutes', 0)),
+        points=ex['meta'].get('points', 0),
+        tags=ex['meta']['tags'],
+        is_completed=False  # TODO: checkear en BD si el usuario lo completó
+    )
+    for ex in exercise_loader.get_all()
+}
 # Code evaluator se inicializará con LLM provider en cada request
 
 
-# Schemas
-class ExerciseResponse(BaseModel):
-    id: str
-    title: str
-    description: str
-    difficulty_level: int
-    starter_code: Optional[str]
-    hints: Optional[List[str]]
-    max_score: float
-    time_limit_seconds: int
+# =============================================================================
+# SECURITY: Prefiltro de código peligroso para execute_python_code
+# =============================================================================
+DANGEROUS_IMPORTS = [
+    'os', 'subprocess', 'sys', 'shutil', 'pathlib',
+    'socket', 'requests', 'urllib', 'http',
+    'multiprocessing', 'threading', 'asyncio',
+    'pickle', 'marshal', 'shelve',
+    'ctypes', 'cffi', 'importlib',
+    'builtins', '__builtins__',
+    'code', 'codeop', 'compile',
+]
+
+DANGEROUS_PATTERNS = [
+    '__import__', 'exec(', 'eval(', 'compile(',
+    'open(', 'file(',
+    # 'input(' - PERMITIDO: necesario para ejercicios de entrada del usuario
+    'globals(', 'locals(', 'vars(',
+    'getattr(', 'setattr(', 'delattr(',
+    '__class__', '__bases__', '__subclasses__',
+    '__mro__', '__code__', '__globals__',
+    'breakpoint(', 'help(',
+]
+
+# stderr que devuelve execute_python_code cuando se agota el tiempo
+SANDBOX_TIMEOUT_ERROR = "Error: Tiempo de ejecución excedido"
+
+# Todas las formas bloqueadas de cada import, en minúsculas -> nombre del módulo
+_DANGEROUS_IMPORT_FORMS = {
+    form.lower(): dangerous_import
+    for dangerous_import in DANGEROUS_IMPORTS
+    for form in (
+        f'import {dangerous_import}',
+        f'from {dangerous_import}',
+        f'__import__("{dangerous_import}"',
+        f"__import__('{dangerous_import}'",
+    )
+}
+_DANGEROUS_PATTERN_NAMES = {pattern.lower(): pattern for pattern in DANGEROUS_PATTERNS}
+
 
+def _compile_literal_alternation(literals) -> "re.Pattern[str]":
+    """
+    Compila una lista de literales en un único regex case-insensitive.
 
-class CodeSubmission(BaseModel):
-    exercise_id: str
-    code: str
+    Equivale a buscar cada literal como substring de code.lower(), pero en
+    una sola pasada sobre el código. Los literales más largos van primero
+    para que el match reporte, por ejemplo, 'codeop' y no 'code'.
+    """
+    ordered = sorted(literals, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(literal) for literal in ordered), re.IGNORECASE)
+
+
+def _matched_literal(names: Dict[str, str], matched: str) -> str:
+    """Devuelve el nombre asociado al literal que produjo el match."""
+    name = names.get(matched.lower())
+    if name is None:
+        # IGNORECASE también acepta variantes Unicode (ej: 'ſ' por 's')
+        name = next(
+            value for key, value in names.items()
+            if re.fullmatch(re.escape(key), matched, re.IGNORECASE)
+        )
+    return name
+
+
+_DANGEROUS_IMPORT_RE = _compile_literal_alternation(_DANGEROUS_IMPORT_FORMS)
+_DANGEROUS_PATTERN_RE = _compile_literal_alternation(_DANGEROUS_PATTERN_NAMES)
+
+
+# Límites del proceso del sandbox, aplicados antes de arrancar el intérprete
+# (el wrapper vuelve a ajustarlos más estrictos antes del código del usuario)
+SANDBOX_MEMORY_LIMIT_BYTES = 256 * 1024 * 1024
+# Usuario sin privilegios para el sandbox cuando la API corre como root
+# (ej: "nobody"); el intérprete de Python debe ser accesible para ese usuario
+SANDBOX_RUN_AS_USER = os.getenv("SANDBOX_RUN_AS_USER", "")
+
+
+def _sandbox_preexec(timeout_seconds: int, run_as: Optional[tuple[int, int]]) -> None:
+    """
+    preexec_fn del subprocess del sandbox (solo POSIX): fija rlimits de
+    memoria, CPU y escritura de archivos y baja privilegios si corresponde.
+    """
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS, (SANDBOX_MEMORY_LIMIT_BYTES, SANDBOX_MEMORY_LIMIT_BYTES))
+    resource.setrlimit(resource.RLIMIT_CPU, (timeout_seconds, timeout_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    if run_as is not None:
+        uid, gid = run_as
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
 
 
-class SubmissionResult(BaseModel):
-    id: str
-    passed_tests: int
-    total_tests: int
-    is_correct: bool
-    execution_time_ms: int
-    ai_score: Optional[float]
-    ai_feedback: Optional[str]
-    code_quality_score: Optional[float]
-    readability_score: Optional[float]
-    efficiency_score: Optional[float]
-    best_practices_score: Optional[float]
-    test_results: List[Dict[str, Any]]
+def _sandbox_run_as() -> Optional[tuple[int, int]]:
+    """(uid, gid) de SANDBOX_RUN_AS_USER si la API corre como root, si no None."""
+    if not SANDBOX_RUN_AS_USER or os.geteuid() != 0:
+        return None
+    import pwd
+    user = pwd.getpwnam(SANDBOX_RUN_AS_USER)
+    return user.pw_uid, user.pw_gid
 
 
 def execute_python_code(code: str, test_input: str, timeout_seconds: int = 5) -> tuple[str, str, int]:
@@ -88,8 +181,9 @@ def execute_python_code(code: str, test_input: str, timeout_seconds: int = 5) ->
     1. Bloquea imports peligrosos (os, subprocess, sys, etc.)
     2. Bloquea funciones peligrosas (exec, eval, open, etc.)
     3. Limita tiempo de ejecución
-    4. Limita memoria (si es posible)
+    4. Limita memoria, CPU y escritura de archivos (rlimits, POSIX)
     5. Ejecuta en proceso separado sin acceso a red
+    6. Opcionalmente baja privilegios (SANDBOX_RUN_AS_USER)
 
     Returns:
         tuple: (stdout, stderr, execution_time_ms)
@@ -97,44 +191,17 @@ def execute_python_code(code: str, test_input: str, timeout_seconds: int = 5) ->
     # ==========================================================================
     # SECURITY: Validate code before execution
     # ==========================================================================
-    DANGEROUS_IMPORTS = [
-        'os', 'subprocess', 'sys', 'shutil', 'pathlib',
-        'socket', 'requests', 'urllib', 'http',
-        'multiprocessing', 'threading', 'asyncio',
-        'pickle', 'marshal', 'shelve',
-        'ctypes', 'cffi', 'importlib',
-        'builtins', '__builtins__',
-        'code', 'codeop', 'compile',
-    ]
-
-    DANGEROUS_PATTERNS = [
-        '__import__', 'exec(', 'eval(', 'compile(',
-        'open(', 'file(',
-        # 'input(' - PERMITIDO: necesario para ejercicios de entrada del usuario
-        'globals(', 'locals(', 'vars(',
-        'getattr(', 'setattr(', 'delattr(',
-        '__class__', '__bases__', '__subclasses__',
-        '__mro__', '__code__', '__globals__',
-        'breakpoint(', 'help(',
-    ]
-
     # Check for dangerous imports
-    code_lower = code.lower()
-    for dangerous_import in DANGEROUS_IMPORTS:
-        patterns = [
-            f'import {dangerous_import}',
-            f'from {dangerous_import}',
-            f'__import__("{dangerous_import}"',
-            f"__import__('{dangerous_import}'",
-        ]
-        for pattern in patterns:
-            if pattern.lower() in code_lower:
-                return "", f"Error de seguridad: Import '{dangerous_import}' no permitido", 0
+    match = _DANGEROUS_IMPORT_RE.search(code)
+    if match:
+        dangerous_import = _matched_literal(_DANGEROUS_IMPORT_FORMS, match.group(0))
+        return "", f"Error de seguridad: Import '{dangerous_import}' no permitido", 0
 
     # Check for dangerous patterns
-    for pattern in DANGEROUS_PATTERNS:
-        if pattern.lower() in code_lower:
-            return "", f"Error de seguridad: Patrón '{pattern}' no permitido", 0
+    match = _DANGEROUS_PATTERN_RE.search(code)
+    if match:
+        pattern = _matched_literal(_DANGEROUS_PATTERN_NAMES, match.group(0))
+        return "", f"Error de seguridad: Patrón '{pattern}' no permitido", 0
 
     # ==========================================================================
     # Create sandboxed execution script
@@ -224,6 +291,13 @@ __builtins__ = restricted_builtins
         temp_file = f.name
 
     try:
+        preexec_fn = None
+        if os.name == 'posix':
+            run_as = _sandbox_run_as()
+            if run_as is not None:
+                os.chmod(temp_file, 0o644)  # Legible por el usuario sin privilegios
+            preexec_fn = functools.partial(_sandbox_preexec, timeout_seconds, run_as)
+
         start_time = time.time()
         result = subprocess.run(
             ['python', '-I', temp_file],  # -I: isolated mode (no user site, PYTHONPATH ignored)
@@ -235,13 +309,14 @@ __builtins__ = restricted_builtins
                 'PATH': os.environ.get('PATH', ''),
                 'PYTHONDONTWRITEBYTECODE': '1',
                 'PYTHONUNBUFFERED': '1',
-            }
+            },
+            preexec_fn=preexec_fn,
         )
         execution_time = int((time.time() - start_time) * 1000)
 
         return result.stdout.strip(), result.stderr.strip(), execution_time
     except subprocess.TimeoutExpired:
-        return "", "Error: Tiempo de ejecución excedido", timeout_seconds * 1000
+        return "", SANDBOX_TIMEOUT_ERROR, timeout_seconds * 1000
     except Exception as e:
         return "", f"Error: {str(e)}", 0
     finally:
@@ -249,19 +324,104 @@ __builtins__ = restricted_builtins
             os.remove(temp_file)
 
 
+# Pool acotado de workers para el sandbox: limita cuántas ejecuciones corren a
+# la vez y reutiliza procesos ya inicializados entre requests
+SANDBOX_POOL_WORKERS = min(os.cpu_count() or 1, 8)
+_sandbox_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _pin_sandbox_worker(next_core: Any) -> None:
+    """
+    Initializer de los workers del sandbox: fija cada worker a un core distinto
+    (Linux) para reducir el jitter de latencia. El subprocess del sandbox hereda
+    la afinidad del worker.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return  # No disponible en Windows/Mac
+    with next_core.get_lock():
+        worker_index = next_core.value
+        next_core.value += 1
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[worker_index % len(cores)]})
+    except OSError:
+        pass  # Sin permisos para cambiar afinidad: se ejecuta sin fijar
+
+
+def _get_sandbox_pool() -> ProcessPoolExecutor:
+    """Crea (lazy) el pool de procesos del sandbox."""
+    global _sandbox_pool
+    if _sandbox_pool is None:
+        _sandbox_pool = ProcessPoolExecutor(
+            max_workers=SANDBOX_POOL_WORKERS,
+            initializer=_pin_sandbox_worker,
+            initargs=(multiprocessing.Value("i", 0),),
+        )
+    return _sandbox_pool
+
+
+async def run_in_sandbox(code: str, test_input: str, timeout_seconds: int = 5) -> tuple[str, str, int]:
+    """
+    Ejecuta execute_python_code en el pool del sandbox sin bloquear el event loop.
+
+    Es la única entrada al sandbox desde los endpoints: el preexec_fn del
+    subprocess no es seguro en el proceso multithread de la API, solo en los
+    workers del pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_sandbox_pool(), execute_python_code, code, test_input, timeout_seconds
+    )
+
+
+def shutdown_sandbox_pool() -> None:
+    """Cierra el pool del sandbox (llamar al apagar la aplicación)."""
+    global _sandbox_pool
+    if _sandbox_pool is not None:
+        _sandbox_pool.shutdown(wait=False, cancel_futures=True)
+        _sandbox_pool = None
+
+
+_ai_eval_batcher: Optional[LLMRequestBatcher] = None
+
+
+def _get_ai_eval_batcher() -> LLMRequestBatcher:
+    """
+    Batcher compartido para las evaluaciones con IA de submit_code.
+
+    Cuando varios estudiantes envían código a la vez, las evaluaciones que
+    llegan dentro de la misma ventana se despachan juntas contra una única
+    instancia de Ollama (aprovecha OLLAMA_NUM_PARALLEL en el servidor).
+    """
+    global _ai_eval_batcher
+    if _ai_eval_batcher is None:
+        # Configurar Ollama con variables de entorno
+        ollama_config = {
+            "base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+            "model": os.getenv("OLLAMA_MODEL", "llama3.2:3b"),
+            "temperature": float(os.getenv("OLLAMA_TEMPERATURE", "0.7")),
+            "timeout": float(os.getenv("OLLAMA_TIMEOUT", "120"))
+        }
+        _ai_eval_batcher = LLMRequestBatcher(
+            OllamaProvider(ollama_config),
+            window_ms=float(os.getenv("AI_EVAL_BATCH_WINDOW_MS", "30")),
+            max_batch=int(os.getenv("AI_EVAL_BATCH_MAX", "8")),
+        )
+    return _ai_eval_batcher
+
+
+async def close_ai_eval_batcher() -> None:
+    """Cierra el batcher de las evaluaciones con IA (llamar al apagar la aplicación)."""
+    global _ai_eval_batcher
+    if _ai_eval_batcher is not None:
+        await _ai_eval_batcher.close()
+        _ai_eval_batcher = None
+
+
 async def evaluate_code_with_ai(code: str, exercise: Exercise, test_results: dict) -> dict:
     """
     Evalúa el código usando Ollama para obtener feedback cualitativo
     """
-    # Configurar Ollama con variables de entorno
-    ollama_config = {
-        "base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
-        "model": os.getenv("OLLAMA_MODEL", "llama3.2:3b"),
-        "temperature": float(os.getenv("OLLAMA_TEMPERATURE", "0.7")),
-        "timeout": float(os.getenv("OLLAMA_TIMEOUT", "120"))
-    }
-    llm = OllamaProvider(ollama_config)
-    
     prompt = f"""Eres un profesor de programación experto. Evalúa el siguiente código Python:
 
 EJERCICIO: {exercise.title}
@@ -292,8 +452,8 @@ Proporciona una evaluación detallada en formato JSON con:
 RESPONDE SOLO CON EL JSON, SIN TEXTO ADICIONAL."""
 
     try:
-        response = await llm.generate(
-            messages=[{"role": "user", "content": prompt}],
+        response = await _get_ai_eval_batcher().submit(
+            [{"role": "user", "content": prompt}],
             temperature=0.3,
             max_tokens=1000
         )
@@ -308,7 +468,7 @@ RESPONDE SOLO CON EL JSON, SIN TEXTO ADICIONAL."""
         if content.endswith("```"):
             content = content[:-3]
         
-        evaluation = json.loads(content.strip())
+        evaluation = orjson.loads(content.strip())
         return evaluation
     except Exception as e:
         logger.warning(f"Error en evaluación de IA: {e}", exc_info=True)
@@ -359,35 +519,27 @@ async def list_json_exercises(
     
     tags_list = [tag] if tag else None
     
-    exercises = exercise_loader.search(
-        difficulty=difficulty,
-        tags=tags_list,
-        unit=unit_num,
-        language=language,
-        framework=framework
-    )
-    
-    # Convertir a schema de listado
-    result = []
-    for ex in exercises:
-        result.append(ExerciseListItemSchema(
-            id=ex['id'],
-            title=ex['meta']['title'],
-            difficulty=ex['meta']['difficulty'],
-            estimated_time_minutes=ex['meta'].get('estimated_time_min', ex['meta'].get('estimated_time_minutes', 0)),
-            points=ex['meta'].get('points', 0),
-            tags=ex['meta']['tags'],
-            is_completed=False  # TODO: checkear en BD si el usuario lo completó
-        ))
-    
-    return result
+    # Filtrar y devolver los items de listado precalculados
+    return [
+        _json_list_items[ex['id']]
+        for ex in exercise_loader.search(
+            difficulty=difficulty,
+            tags=tags_list,
+            unit=unit_num,
+            language=language,
+            framework=framework
+        )
+    ]
 
 
 @router.get("/json/stats")
-async def get_json_exercises_stats():
+async def get_json_exercises_stats(response: Response):
     """Obtiene estadísticas de los ejercicios JSON incluyendo lenguaje y framework"""
     stats = exercise_loader.get_stats()
     
+    # Datos estáticos en runtime: cacheables por el cliente
+    response.headers["Cache-Control"] = "public, max-age=60"
+    
     # Retornar stats completas incluyendo by_language y by_framework
     return {
         "total_exercises": stats['total_exercises'],
@@ -470,32 +622,56 @@ async def submit_json_exercise(
     # Ejecutar tests ocultos (solo para Python)
     tests_passed = 0
     tests_total = len(exercise['hidden_tests'])
-    stdout_output = ""
-    stderr_output = ""
+    stdout_parts: List[str] = []
+    stderr_parts: List[str] = []
     total_execution_time = 0
+    # Namespace del código del estudiante para los tests de expresión:
+    # se ejecuta una sola vez y se reutiliza en todos los tests
+    exec_globals: Optional[Dict[str, Any]] = None
+    exec_error: Optional[Exception] = None
     
     if not is_java:  # Solo ejecutar si es Python
-        for i, test in enumerate(exercise['hidden_tests'], 1):
-            # Adaptarse a la estructura real de los JSON (input/expected)
-            test_input = test.get('input', test.get('input_data', ''))
-            if isinstance(test_input, dict) or isinstance(test_input, list):
-                test_input = json.dumps(test_input)
+        # Preparar tests: (input, expected, expresión compilada o None)
+        prepared_tests = []
+        for test in exercise['hidden_tests']:
+            # Input ya serializado por el loader
+            test_input = test['_input_str']
             
             # Soportar tanto 'expected_output' (legacy) como 'expected' (nuevo)
             expected = test.get('expected_output') or test.get('expected', '')
             
-            logger.info(f"Ejecutando test {i}/{tests_total}: input='{test_input}', expected='{expected}'")
+            # Clasificado y compilado por el loader: las expresiones se evalúan
+            # en el contexto del código, sin pasar por el sandbox
+            prepared_tests.append((test_input, expected, test['_expected_code']))
+        
+        # Ejecutar en paralelo solo los tests de output en el pool del sandbox
+        sandbox_runs = iter(await asyncio.gather(*(
+            run_in_sandbox(submission.student_code, test_input, 30)
+            for test_input, _, expected_code in prepared_tests
+            if expected_code is None
+        )))
+        
+        # Verificación de resultados (sin I/O)
+        for i, (test_input, expected, expected_code) in enumerate(prepared_tests, 1):
+            logger.info(f"Verificando test {i}/{tests_total}: input='{test_input}', expected='{expected}'")
             
-            # Si expected es una expresión Python (ej: "total == 42600"), evaluarla
-            if expected and ('==' in expected or 'and' in expected or 'or' in expected or '>' in expected or '<' in expected):
-                # Es una expresión Python, ejecutar código y evaluar
-                try:
-                    # Crear contexto ejecutando el código del estudiante
+            if expected_code is not None:
+                # Es una expresión Python, evaluarla en el contexto del código
+                if exec_globals is None and exec_error is None:
+                    # Crear contexto ejecutando el código del estudiante (una vez)
                     exec_globals = {}
-                    exec(submission.student_code, exec_globals)
-                    
+                    try:
+                        exec(submission.student_code, exec_globals)
+                    except Exception as e:
+                        exec_error = e
+                
+                if exec_error is not None:
+                    logger.warning(f"✗ Test {i} ERROR: {exec_error}")
+                    continue
+                
+                try:
                     # Evaluar la expresión expected en ese contexto
-                    test_passed = eval(expected, exec_globals)
+                    test_passed = eval(expected_code, exec_globals)
                     
                     if test_passed:
                         tests_passed += 1
@@ -505,16 +681,12 @@ async def submit_json_exercise(
                 except Exception as e:
                     logger.warning(f"✗ Test {i} ERROR: {e}")
             else:
-                # Es un test de output, ejecutar código con input
-                stdout, stderr, exec_time = execute_python_code(
-                    submission.student_code,
-                    str(test_input),
-                    timeout_seconds=30
-                )
+                # Es un test de output: resultado de la ejecución en sandbox
+                stdout, stderr, exec_time = next(sandbox_runs)
                 
                 total_execution_time += exec_time
-                stdout_output += stdout + "\n"
-                stderr_output += stderr + "\n"
+                stdout_parts.append(stdout)
+                stderr_parts.append(stderr)
                 
                 # Verificar si pasó el test
                 if not stderr:
@@ -534,6 +706,9 @@ async def submit_json_exercise(
                 else:
                     logger.warning(f"✗ Test {i} FALLÓ: {stderr}")
         
+        stdout_output = "\n".join(stdout_parts)
+        stderr_output = "\n".join(stderr_parts)
+        
         # Crear sandbox_result solo si es Python (si es Java ya se creó arriba)
         sandbox_result = {
             "exit_code": 0 if not stderr_output.strip() else 1,
@@ -574,26 +749,23 @@ async def list_exercises(
     db: Session = Depends(get_db)
 ):
     """Lista todos los ejercicios disponibles"""
-    query = db.query(Exercise)
+    # Solo las columnas del listado: starter_code, hints y test_cases se
+    # cargan en el detalle (get_exercise)
+    query = db.query(
+        Exercise.id,
+        Exercise.title,
+        Exercise.description,
+        Exercise.difficulty_level,
+        Exercise.max_score,
+        Exercise.time_limit_seconds,
+    )
     
     if difficulty is not None:
         query = query.filter(Exercise.difficulty_level == difficulty)
     
-    exercises = query.order_by(Exercise.difficulty_level).all()
+    rows = query.order_by(Exercise.difficulty_level).all()
     
-    return [
-        {
-            "id": ex.id,
-            "title": ex.title,
-            "description": ex.description,
-            "difficulty_level": ex.difficulty_level,
-            "starter_code": ex.starter_code,
-            "hints": ex.hints,
-            "max_score": ex.max_score,
-            "time_limit_seconds": ex.time_limit_seconds
-        }
-        for ex in exercises
-    ]
+    return [ExerciseListResponse.model_validate(row) for row in rows]
 
 
 @router.get("/stats")
@@ -602,28 +774,20 @@ async def get_user_stats(
     current_user: User = Depends(get_current_user)
 ):
     """Obtiene estadísticas del usuario"""
-    submissions = db.query(UserExerciseSubmission).filter(
+    # Agregación en la BD: una sola fila en lugar de traer todo el historial
+    total_submissions, correct_count, avg_score, unique_exercises = db.query(
+        func.count(UserExerciseSubmission.id),
+        func.sum(case((UserExerciseSubmission.is_correct == "true", 1), else_=0)),
+        func.avg(UserExerciseSubmission.ai_score),
+        func.count(func.distinct(UserExerciseSubmission.exercise_id)),
+    ).filter(
         UserExerciseSubmission.user_id == current_user.id
-    ).all()
-    
-    if not submissions:
-        return {
-            "total_submissions": 0,
-            "completed_exercises": 0,
-            "average_score": 0.0,
-            "total_exercises": 0
-        }
-    
-    correct_count = sum(1 for s in submissions if s.is_correct == "true")
-    scores = [s.ai_score for s in submissions if s.ai_score is not None]
-    avg_score = sum(scores) / len(scores) if scores else 0.0
-    
-    unique_exercises = len(set(s.exercise_id for s in submissions))
+    ).one()
     
     return {
-        "total_submissions": len(submissions),
-        "completed_exercises": correct_count,
-        "average_score": round(avg_score, 2),
+        "total_submissions": total_submissions,
+        "completed_exercises": correct_count or 0,
+        "average_score": round(float(avg_score), 2) if avg_score is not None else 0.0,
         "total_exercises": unique_exercises
     }
 
@@ -639,16 +803,18 @@ async def get_exercise(
     if not exercise:
         raise HTTPException(status_code=404, detail="Ejercicio no encontrado")
     
-    return {
-        "id": exercise.id,
-        "title": exercise.title,
-        "description": exercise.description,
-        "difficulty_level": exercise.difficulty_level,
-        "starter_code": exercise.starter_code,
-        "hints": exercise.hints,
-        "max_score": exercise.max_score,
-        "time_limit_seconds": exercise.time_limit_seconds
-    }
+    return ExerciseResponse.model_validate(exercise)
+
+
+def _persist_submission(submission_data: Dict[str, Any]) -> None:
+    """
+    Persiste una submission en segundo plano (BackgroundTasks).
+
+    Usa una sesión propia: la sesión del request ya está cerrada cuando
+    FastAPI ejecuta las background tasks.
+    """
+    with get_background_db_session() as db:
+        db.add(UserExerciseSubmission(**submission_data))
 
 
 @router.post("/submit", response_model=SubmissionResult)
@@ -656,6 +822,7 @@ async def get_exercise(
 async def submit_code(
     request: Request,  # FIX 1.3 Cortez3: Required for rate limiter
     submission: CodeSubmission,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -666,37 +833,34 @@ async def submit_code(
     if not exercise:
         raise HTTPException(status_code=404, detail="Ejercicio no encontrado")
     
-    # Ejecutar tests
-    test_results = []
-    passed_tests = 0
-    total_tests = len(exercise.test_cases)
-    total_execution_time = 0
+    # Materializar los test cases una sola vez (input, expected_output)
+    cases = [
+        (test_case.get("input", ""), test_case.get("expected_output", ""))
+        for test_case in exercise.test_cases
+    ]
     
-    for i, test_case in enumerate(exercise.test_cases):
-        test_input = test_case.get("input", "")
-        expected_output = test_case.get("expected_output", "")
-        
-        output, error, exec_time = execute_python_code(
-            submission.code,
-            test_input,
-            exercise.time_limit_seconds
-        )
-        
-        total_execution_time += exec_time
-        
-        is_correct = output == expected_output and not error
-        if is_correct:
-            passed_tests += 1
-        
-        test_results.append({
-            "test_number": i + 1,
+    # Ejecutar todos los tests en paralelo en el pool del sandbox
+    runs = await asyncio.gather(*(
+        run_in_sandbox(submission.code, test_input, exercise.time_limit_seconds)
+        for test_input, _ in cases
+    ))
+    
+    # Verificación de resultados (sin I/O)
+    test_results = [
+        {
+            "test_number": i,
             "input": test_input,
             "expected_output": expected_output,
             "actual_output": output,
             "error": error,
-            "passed": is_correct,
+            "passed": output == expected_output and not error,
             "execution_time_ms": exec_time
-        })
+        }
+        for i, ((test_input, expected_output), (output, error, exec_time)) in enumerate(zip(cases, runs), 1)
+    ]
+    passed_tests = sum(1 for result in test_results if result["passed"])
+    total_tests = len(cases)
+    total_execution_time = sum(exec_time for _, _, exec_time in runs)
     
     # Evaluar con IA
     ai_evaluation = await evaluate_code_with_ai(
@@ -705,35 +869,35 @@ async def submit_code(
         {"passed": passed_tests, "total": total_tests}
     )
     
-    # Guardar submission con el usuario autenticado
-    new_submission = UserExerciseSubmission(
-        user_id=current_user.id,
-        exercise_id=exercise.id,
-        submitted_code=submission.code,
-        passed_tests=passed_tests,
-        total_tests=total_tests,
-        execution_time_ms=total_execution_time,
-        ai_score=ai_evaluation.get("overall_score"),
-        ai_feedback=json.dumps(ai_evaluation.get("feedback", "")),
-        code_quality_score=ai_evaluation.get("code_quality"),
-        readability_score=ai_evaluation.get("readability"),
-        efficiency_score=ai_evaluation.get("efficiency"),
-        best_practices_score=ai_evaluation.get("best_practices"),
-        is_correct="true" if passed_tests == total_tests else "false"
-    )
-    
-    db.add(new_submission)
-    db.commit()
-    db.refresh(new_submission)
+    # Guardar submission con el usuario autenticado.
+    # El ID se genera aquí para que la respuesta coincida con la fila que
+    # se escribe en segundo plano después de enviar el response.
+    submission_id = str(uuid.uuid4())
+    background_tasks.add_task(_persist_submission, {
+        "id": submission_id,
+        "user_id": current_user.id,
+        "exercise_id": exercise.id,
+        "submitted_code": submission.code,
+        "passed_tests": passed_tests,
+        "total_tests": total_tests,
+        "execution_time_ms": total_execution_time,
+        "ai_score": ai_evaluation.get("overall_score"),
+        "ai_feedback": ai_evaluation,
+        "code_quality_score": ai_evaluation.get("code_quality"),
+        "readability_score": ai_evaluation.get("readability"),
+        "efficiency_score": ai_evaluation.get("efficiency"),
+        "best_practices_score": ai_evaluation.get("best_practices"),
+        "is_correct": "true" if passed_tests == total_tests else "false",
+    })
     
     return {
-        "id": new_submission.id,
+        "id": submission_id,
         "passed_tests": passed_tests,
         "total_tests": total_tests,
         "is_correct": passed_tests == total_tests,
         "execution_time_ms": total_execution_time,
         "ai_score": ai_evaluation.get("overall_score"),
-        "ai_feedback": json.dumps(ai_evaluation, ensure_ascii=False),
+        "ai_feedback": ai_evaluation,
         "code_quality_score": ai_evaluation.get("code_quality"),
         "readability_score": ai_evaluation.get("readability"),
         "efficiency_score": ai_evaluation.get("efficiency"),
@@ -742,18 +906,59 @@ async def submit_code(
     }
 
 
+def _submissions_cursor(submission: UserExerciseSubmission) -> str:
+    """Cursor keyset de una submission: "<submitted_at ISO>|<id>"."""
+    return f"{submission.submitted_at.isoformat()}|{submission.id}"
+
+
+def _parse_submissions_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Parsea un cursor de _submissions_cursor (400 si es inválido)."""
+    submitted_at, sep, submission_id = cursor.partition("|")
+    try:
+        if not sep or not submission_id:
+            raise ValueError(cursor)
+        return datetime.fromisoformat(submitted_at), submission_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
 @router.get("/user/submissions")
 async def get_user_submissions(
+    limit: int = Query(50, ge=1, le=200, description="Cantidad máxima de submissions a devolver"),
+    before: Optional[str] = Query(None, description="Cursor: `next_cursor` de la página anterior"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Obtiene todas las submissions del usuario actual"""
-    submissions = db.query(UserExerciseSubmission).filter(
-        UserExerciseSubmission.user_id == current_user.id
-    ).order_by(UserExerciseSubmission.submitted_at.desc()).all()
+    """
+    Obtiene las submissions del usuario actual, más recientes primero.
+
+    Paginación keyset sobre (submitted_at, id) (usa idx_submission_user_submitted):
+    para la página siguiente, pasar `next_cursor` como `before`. El id desempata
+    submissions con el mismo timestamp, así ninguna se saltea entre páginas.
+    `total` es la cantidad de submissions del usuario, no la de la página.
+    """
+    user_filter = UserExerciseSubmission.user_id == current_user.id
+    query = db.query(UserExerciseSubmission).filter(user_filter)
+    if before is not None:
+        query = query.filter(
+            tuple_(UserExerciseSubmission.submitted_at, UserExerciseSubmission.id)
+            < tuple_(*_parse_submissions_cursor(before))
+        )
+    
+    submissions = query.order_by(
+        UserExerciseSubmission.submitted_at.desc(),
+        UserExerciseSubmission.id.desc(),
+    ).limit(limit).all()
+    total = db.query(func.count(UserExerciseSubmission.id)).filter(user_filter).scalar()
+    
+    # Solo hay página siguiente si esta vino completa
+    next_cursor = None
+    if len(submissions) == limit and submissions[-1].submitted_at:
+        next_cursor = _submissions_cursor(submissions[-1])
     
     return {
-        "total": len(submissions),
+        "total": total,
+        "next_cursor": next_cursor,
         "submissions": [
             {
                 "id": s.id,
@@ -29,7 +29,7 @@ from sqlalchemy import text
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
 from ...database.repositories import SessionRepository
-from ..deps import get_db, get_session_repository
+from ..deps import get_db, get_session_repository, is_llm_warming_up
 from ..schemas.common import HealthStatus, APIResponse
 
 logger = logging.getLogger(__name__)
@@ -238,7 +238,7 @@ async def liveness_probe() -> APIResponse[dict]:
     Verifica:
     - PostgreSQL está accesible
     - Redis está accesible (si configurado)
-    - LLM provider está accesible (opcional)
+    - LLM provider está accesible (opcional) y terminó el warm-up del arranque
 
     **Uso en Kubernetes**:
     ```yaml
@@ -331,7 +331,14 @@ async def readiness_probe(
         import os
         llm_provider = os.getenv("LLM_PROVIDER", "mock")
 
-        if llm_provider == "mock":
+        if is_llm_warming_up():
+            # Warm-up del arranque en curso: no recibir tráfico todavía
+            checks["llm_provider"] = {
+                "status": "warming_up",
+                "provider": llm_provider,
+            }
+            is_ready = False
+        elif llm_provider == "mock":
             checks["llm_provider"] = {
                 "status": "ready",
                 "provider": "mock",
@@ -363,15 +370,19 @@ async def readiness_probe(
             message="Service is ready"
         )
     else:
-        # Note: For 503, we still need to indicate failure but return valid response
-        return APIResponse(
-            success=False,
-            data={
-                "status": "not_ready",
-                "checks": checks,
-                "timestamp": utc_now().isoformat(),
-            },
-            message="Service is not ready"
+        # 503 para que el readinessProbe (que solo mira el status code) saque
+        # al pod del load balancer; el body mantiene el formato APIResponse
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=APIResponse(
+                success=False,
+                data={
+                    "status": "not_ready",
+                    "checks": checks,
+                    "timestamp": utc_now().isoformat(),
+                },
+                message="Service is not ready"
+            ).model_dump(mode="json"),
         )
 
 
@@ -14,8 +14,11 @@ Referencias:
 - FastAPI + Prometheus: https://github.com/trallnag/prometheus-fastapi-instrumentator
 """
 
+import asyncio
+import gzip
 import logging
-from fastapi import APIRouter, Response
+import time
+from fastapi import APIRouter, Request, Response
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 from ...core.metrics import (
@@ -30,6 +33,37 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Monitoring"])
 
+# Cache de la exposición: scrapes concurrentes dentro del mismo tick comparten
+# una sola serialización del registry
+METRICS_CACHE_TTL_SECONDS = 1.0
+_metrics_cache = {"t": 0.0, "body": b"", "gzip": None}
+_metrics_lock = asyncio.Lock()
+
+# Nivel bajo: el texto de Prometheus comprime muy bien incluso con nivel 1
+METRICS_GZIP_LEVEL = 1
+
+
+async def _get_metrics_output() -> bytes:
+    """Devuelve la salida de generate_latest(), regenerándola como mucho una vez por TTL."""
+    if time.monotonic() - _metrics_cache["t"] < METRICS_CACHE_TTL_SECONDS:
+        return _metrics_cache["body"]
+
+    async with _metrics_lock:
+        # Re-check: otro scrape pudo regenerarla mientras esperábamos el lock
+        now = time.monotonic()
+        if now - _metrics_cache["t"] >= METRICS_CACHE_TTL_SECONDS:
+            _metrics_cache["body"] = generate_latest()
+            _metrics_cache["gzip"] = None
+            _metrics_cache["t"] = now
+        return _metrics_cache["body"]
+
+
+def _get_gzipped_output(metrics_output: bytes) -> bytes:
+    """Comprime la salida cacheada (como mucho una vez por TTL)."""
+    if _metrics_cache["gzip"] is None or _metrics_cache["body"] is not metrics_output:
+        _metrics_cache["gzip"] = gzip.compress(metrics_output, compresslevel=METRICS_GZIP_LEVEL)
+    return _metrics_cache["gzip"]
+
 
 @router.get(
     "/metrics",
@@ -87,18 +121,36 @@ ai_native_llm_call_duration_seconds_count{model="gpt-4",provider="openai",status
         }
     }
 )
-async def get_metrics() -> Response:
+async def get_metrics(request: Request) -> Response:
     """
     Expone métricas de Prometheus para scraping.
 
+    Si el scraper acepta gzip, la respuesta va comprimida (el GZipMiddleware
+    no la vuelve a comprimir porque ya lleva Content-Encoding).
+
+    Args:
+        request: Request HTTP (para leer Accept-Encoding)
+
     Returns:
         Response con métricas en formato text/plain
     """
     try:
-        metrics_output = generate_latest()
+        metrics_output = await _get_metrics_output()
         
         logger.debug("Exported Prometheus metrics", extra={"size_bytes": len(metrics_output)})
 
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            body = _get_gzipped_output(metrics_output)
+            return Response(
+                content=body,
+                media_type=CONTENT_TYPE_LATEST,
+                headers={
+                    "Content-Encoding": "gzip",
+                    "Content-Length": str(len(body)),
+                    "Vary": "Accept-Encoding",
+                },
+            )
+
         return Response(
             content=metrics_output,
             media_type=CONTENT_TYPE_LATEST,
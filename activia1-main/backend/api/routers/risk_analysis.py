@@ -3,14 +3,28 @@ Router para análisis de riesgos 5D
 
 FIX Cortez21 DEFECTO 2.3: Added typed response schema
 """
-import json
+import asyncio
+import bisect
+import hashlib
 import logging
+import os
+import re
+import string
+from dataclasses import dataclass
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from pydantic import AfterValidator, BaseModel, Field, TypeAdapter, ValidationError
 import httpx
+import orjson
+from sqlalchemy.exc import SQLAlchemyError
 
+from ...core.redis_cache import RedisCache
+from ...llm.base import LLMMessage, LLMRole
+from ...llm.batcher import LLMRequestBatcher
 from ...llm.factory import LLMProviderFactory
+from ...database import get_db_session
 from ...database.repositories import SessionRepository, TraceRepository
 from ..deps import get_session_repository, get_trace_repository, get_current_user, get_llm_provider
 from ..schemas.common import APIResponse
@@ -18,7 +32,11 @@ from fastapi import Depends
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/risk-analysis", tags=["Risk Analysis 5D"])
+router = APIRouter(
+    prefix="/risk-analysis",
+    tags=["Risk Analysis 5D"],
+    default_response_class=ORJSONResponse,
+)
 
 
 # FIX Cortez21 DEFECTO 2.3: Define typed response schemas
@@ -47,165 +65,11 @@ class RiskAnalysis5DResponse(BaseModel):
         from_attributes = True
 
 
-class RiskDimensionScore:
-    def __init__(self, score: int, level: str, indicators: List[str]):
-        self.score = score
-        self.level = level
-        self.indicators = indicators
-
-
-class RiskAnalysis5D:
-    def __init__(
-        self,
-        session_id: str,
-        overall_score: int,
-        risk_level: str,
-        dimensions: dict,
-        top_risks: List[dict],
-        recommendations: List[str]
-    ):
-        self.session_id = session_id
-        self.overall_score = overall_score
-        self.risk_level = risk_level
-        self.dimensions = dimensions
-        self.top_risks = top_risks
-        self.recommendations = recommendations
-
-
-@router.get(
-    "/{session_id}",
-    response_model=APIResponse[RiskAnalysis5DResponse],  # FIX Cortez21: Typed response_model
-    summary="Análisis de Riesgos 5D",
-    description="Analiza riesgos en 5 dimensiones usando Ollama: cognitiva, ética, epistémica, técnica, gobernanza"
-)
-async def analyze_risks_5d(
-    session_id: str,
-    session_repo: SessionRepository = Depends(get_session_repository),
-    trace_repo: TraceRepository = Depends(get_trace_repository),
-    llm_provider = Depends(get_llm_provider),
-    current_user: dict = Depends(get_current_user),
-):
-    """
-    Analiza riesgos en 5 dimensiones para una sesión específica:
-    - Cognitiva: Pérdida de habilidades de pensamiento crítico
-    - Ética: Plagio, falta de atribución, sesgos
-    - Epistémica: Erosión de fundamentos teóricos
-    - Técnica: Dependencia de herramientas, falta de debugging
-    - Gobernanza: Falta de policies, ausencia de auditoría
-    """
-    
-    # Obtener sesión (método síncrono)
-    session = session_repo.get_by_id(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Obtener interacciones de la sesión (método síncrono)
-    interactions = trace_repo.get_by_session(session_id)
-    
-    # Si no hay interacciones, retornar análisis por defecto en lugar de error
-    if not interactions or len(interactions) == 0:
-        logger.info(f"No interactions found for session {session_id}, returning default risk analysis")
-        return APIResponse(
-            success=True,
-            message="No interactions to analyze yet - default risk assessment provided",
-            data={
-                "session_id": session_id,
-                "overall_score": 0,
-                "risk_level": "info",
-                "dimensions": {
-                    "cognitive": {
-                        "score": 0,
-                        "level": "info",
-                        "indicators": ["Sin actividad aún - sesión iniciada pero sin interacciones"]
-                    },
-                    "ethical": {
-                        "score": 0,
-                        "level": "info",
-                        "indicators": ["Sin actividad para evaluar"]
-                    },
-                    "epistemic": {
-                        "score": 0,
-                        "level": "info",
-                        "indicators": ["Sin actividad para evaluar"]
-                    },
-                    "technical": {
-                        "score": 0,
-                        "level": "info",
-                        "indicators": ["Sin actividad para evaluar"]
-                    },
-                    "governance": {
-                        "score": 0,
-                        "level": "info",
-                        "indicators": ["Sin actividad para evaluar"]
-                    }
-                },
-                "top_risks": [],
-                "recommendations": [
-                    "Inicia la conversación con el tutor para comenzar el análisis de riesgos",
-                    "El sistema monitoreará automáticamente las 5 dimensiones de riesgo",
-                    "Se generará un reporte detallado después de las primeras interacciones"
-                ]
-            }
-        )
-    
-    # Preparar contexto detallado para análisis con Mistral AI
-    # Extraer prompts del usuario y respuestas de la IA
-    conversation_history = []
-    for i, interaction in enumerate(interactions[-10:], 1):  # Últimas 10 interacciones
-        # Extraer el prompt del usuario (puede estar en content o metadata)
-        user_prompt = ""
-        ai_response = ""
-        
-        if hasattr(interaction, 'metadata') and interaction.metadata:
-            if isinstance(interaction.metadata, str):
-                try:
-                    meta = json.loads(interaction.metadata)
-                    user_prompt = meta.get('prompt', '')
-                except:
-                    pass
-            elif isinstance(interaction.metadata, dict):
-                user_prompt = interaction.metadata.get('prompt', '')
-        
-        # El content suele ser la respuesta de la IA
-        if hasattr(interaction, 'content') and interaction.content:
-            ai_response = interaction.content[:300]  # Primeros 300 chars
-        
-        if not user_prompt and hasattr(interaction, 'prompt'):
-            user_prompt = interaction.prompt
-        
-        conversation_history.append({
-            "num": i,
-            "student_question": user_prompt[:200] if user_prompt else "[Sin prompt capturado]",
-            "ai_response_preview": ai_response[:150] if ai_response else "[Sin respuesta]",
-            "interaction_type": getattr(interaction, 'interaction_type', 'unknown')
-        })
-    
-    context = {
-        "session_id": session_id,
-        "student_id": session.student_id,
-        "activity_id": session.activity_id,
-        "total_interactions": len(interactions),
-        "conversation_history": conversation_history
-    }
-    
-    # Construir prompt mejorado para Mistral AI
-    conversation_text = "\n\n".join([
-        f"Interacción {conv['num']}:\n"
-        f"  Estudiante pregunta: {conv['student_question']}\n"
-        f"  Tipo: {conv['interaction_type']}\n"
-        f"  Vista previa respuesta IA: {conv['ai_response_preview']}"
-        for conv in conversation_history
-    ])
-
-    prompt = f"""Eres un experto analista de riesgos educativos. Analiza la siguiente sesión de tutoría con IA y evalúa los riesgos en 5 dimensiones.
-
-CONTEXTO DE LA SESIÓN:
-- Estudiante: {session.student_id}
-- Actividad: {session.activity_id}
-- Total de interacciones: {len(interactions)}
-
-CONVERSACIÓN ANALIZADA (últimas {len(conversation_history)} interacciones):
-{conversation_text}
+# Instrucciones estáticas del análisis 5D. Van primero y en un mensaje de
+# sistema propio, para que el prefijo del prompt sea idéntico entre requests
+# y aproveche el prompt caching del proveedor; los datos de la sesión van
+# después, en el mensaje de usuario.
+RISK_ANALYSIS_SYSTEM_PROMPT = """Eres un experto analista de riesgos educativos. Analizarás sesiones de tutoría con IA y evaluarás los riesgos en 5 dimensiones.
 
 INSTRUCCIONES DE ANÁLISIS:
 
@@ -243,51 +107,51 @@ Luego identifica los TOP 3 riesgos más importantes con estrategias concretas de
 
 FORMATO DE RESPUESTA (SOLO JSON, sin texto adicional):
 
-{{
-  "cognitive": {{
+{
+  "cognitive": {
     "score": [número 0-10],
     "level": "[low/medium/high/critical]",
     "indicators": ["[indicador específico 1]", "[indicador 2]", "[indicador 3]"]
-  }},
-  "ethical": {{
+  },
+  "ethical": {
     "score": [número 0-10],
     "level": "[low/medium/high/critical]",
     "indicators": ["[indicador específico 1]", "[indicador 2]", "[indicador 3]"]
-  }},
-  "epistemic": {{
+  },
+  "epistemic": {
     "score": [número 0-10],
     "level": "[low/medium/high/critical]",
     "indicators": ["[indicador específico 1]", "[indicador 2]", "[indicador 3]"]
-  }},
-  "technical": {{
+  },
+  "technical": {
     "score": [número 0-10],
     "level": "[low/medium/high/critical]",
     "indicators": ["[indicador específico 1]", "[indicador 2]", "[indicador 3]"]
-  }},
-  "governance": {{
+  },
+  "governance": {
     "score": [número 0-10],
     "level": "[low/medium/high/critical]",
     "indicators": ["[indicador específico 1]", "[indicador 2]", "[indicador 3]"]
-  }},
+  },
   "top_risks": [
-    {{
+    {
       "dimension": "[cognitive/ethical/epistemic/technical/governance]",
       "description": "[descripción del riesgo detectado]",
       "severity": "[low/medium/high/critical]",
       "mitigation": "[estrategia concreta de mitigación]"
-    }},
-    {{
+    },
+    {
       "dimension": "[cognitive/ethical/epistemic/technical/governance]",
       "description": "[descripción del riesgo detectado]",
       "severity": "[low/medium/high/critical]",
       "mitigation": "[estrategia concreta de mitigación]"
-    }},
-    {{
+    },
+    {
       "dimension": "[cognitive/ethical/epistemic/technical/governance]",
       "description": "[descripción del riesgo detectado]",
       "severity": "[low/medium/high/critical]",
       "mitigation": "[estrategia concreta de mitigación]"
-    }}
+    }
   ],
   "recommendations": [
     "[recomendación práctica 1]",
@@ -296,17 +160,670 @@ FORMATO DE RESPUESTA (SOLO JSON, sin texto adicional):
     "[recomendación práctica 4]",
     "[recomendación práctica 5]"
   ]
-}}
+}
 
 Responde ÚNICAMENTE con el JSON, sin explicaciones adicionales."""
+
+
+# El mensaje de sistema no cambia entre requests: se construye una sola vez
+# (los providers solo lo leen al convertirlo a su formato)
+_RISK_ANALYSIS_SYSTEM_MESSAGE = LLMMessage(role=LLMRole.SYSTEM, content=RISK_ANALYSIS_SYSTEM_PROMPT)
+
+
+# Parámetros de generación del análisis. La salida es un JSON acotado (5
+# dimensiones + 3 riesgos + 5 recomendaciones, ~500-700 tokens en español):
+# temperatura baja para JSON consistente, tope de tokens con margen y JSON
+# mode en los providers que lo soportan (Ollama format="json", Mistral
+# response_format, Gemini responseMimeType).
+RISK_ANALYSIS_LLM_PARAMS: Dict[str, Any] = {
+    "temperature": 0.2,
+    "max_tokens": 1000,
+    "json_mode": True,
+}
+
+
+# Parte dinámica del prompt (mensaje de usuario). Plantillas a nivel de
+# módulo: por request solo se sustituyen los valores de la sesión.
+_SESSION_PROMPT_TEMPLATE = string.Template("""CONTEXTO DE LA SESIÓN:
+- Estudiante: $student_id
+- Actividad: $activity_id
+- Total de interacciones: $total_interactions
+
+CONVERSACIÓN ANALIZADA (últimas $analyzed interacciones):
+$conversation_text""")
+
+# Claves = las de cada item de _collapse_repeated_interactions()
+_INTERACTION_PROMPT_FORMAT = (
+    "Interacción {num}{repetition}:\n"
+    "  Estudiante pregunta: {student_question}\n"
+    "  Tipo: {interaction_type}\n"
+    "  Vista previa respuesta IA: {ai_response_preview}"
+)
+
+
+# Análisis de respaldo cuando el LLM falla o no devuelve JSON válido.
+# Se construye una sola vez; el handler solo agrega el session_id (merge
+# superficial: los dicts/listas internos nunca se modifican).
+_FALLBACK_ANALYSIS_TEMPLATE: Dict[str, Any] = {
+    "overall_score": 15,
+    "risk_level": "medium",
+    "dimensions": {
+        "cognitive": {
+            "score": 3,
+            "level": "medium",
+            "indicators": ["Múltiples consultas similares", "Dependencia de respuestas IA"]
+        },
+        "ethical": {
+            "score": 2,
+            "level": "low",
+            "indicators": ["Sin indicadores de plagio detectados"]
+        },
+        "epistemic": {
+            "score": 4,
+            "level": "medium",
+            "indicators": ["Consultas superficiales", "Falta de profundización"]
+        },
+        "technical": {
+            "score": 3,
+            "level": "medium",
+            "indicators": ["Uso de código sin modificación"]
+        },
+        "governance": {
+            "score": 3,
+            "level": "medium",
+            "indicators": ["Uso extensivo de IA no justificado"]
+        }
+    },
+    "top_risks": [
+        {
+            "dimension": "epistemic",
+            "description": "Conocimiento superficial detectado",
+            "severity": "medium",
+            "mitigation": "Solicitar explicaciones conceptuales detalladas"
+        },
+        {
+            "dimension": "cognitive",
+            "description": "Alta dependencia de IA",
+            "severity": "medium",
+            "mitigation": "Reducir asistencia y promover pensamiento autónomo"
+        },
+        {
+            "dimension": "technical",
+            "description": "Código sin personalización",
+            "severity": "low",
+            "mitigation": "Solicitar adaptación del código a contexto específico"
+        }
+    ],
+    "recommendations": [
+        "Reducir gradualmente el nivel de ayuda de IA",
+        "Solicitar justificaciones conceptuales antes de proporcionar soluciones",
+        "Fomentar debugging manual antes de consultar IA",
+        "Implementar checkpoints de comprensión conceptual",
+        "Documentar el proceso de razonamiento explícitamente"
+    ]
+}
+
+
+# Cache de análisis completados: la clave incluye la última interacción y el
+# total, así que una interacción nueva invalida la entrada automáticamente
+RISK_ANALYSIS_CACHE_TTL_SECONDS = 300
+_analysis_cache: Optional[RedisCache] = None
+
+
+def _get_analysis_cache() -> RedisCache:
+    """Cache de análisis 5D (Redis con fallback a memoria), creado lazy."""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = RedisCache(
+            ttl_seconds=RISK_ANALYSIS_CACHE_TTL_SECONDS,
+            prefix="risk_analysis_5d:",
+        )
+    return _analysis_cache
+
+
+def _analysis_fingerprint(last_interaction_id: str, total_interactions: int) -> str:
+    """Fingerprint de las interacciones analizadas: (última interacción, total)."""
+    return f"{last_interaction_id}:{total_interactions}"
+
+
+def _analysis_cache_key(session_id: str, last_interaction_id: str, total_interactions: int) -> str:
+    """Clave del estado de la sesión: (session_id, última interacción, total)."""
+    return f"{session_id}:{_analysis_fingerprint(last_interaction_id, total_interactions)}"
+
+
+_risk_batcher: Optional[LLMRequestBatcher] = None
+
+
+def _get_risk_batcher(llm_provider) -> LLMRequestBatcher:
+    """
+    Batcher compartido para los análisis 5D.
+
+    Los análisis de distintas sesiones que llegan dentro de la misma ventana
+    se despachan juntos contra el provider (aprovecha OLLAMA_NUM_PARALLEL en
+    el servidor). Se recrea si cambia el provider inyectado.
+    """
+    global _risk_batcher
+    if _risk_batcher is None or _risk_batcher.provider is not llm_provider:
+        _risk_batcher = LLMRequestBatcher(
+            llm_provider,
+            window_ms=float(os.getenv("RISK_ANALYSIS_BATCH_WINDOW_MS", "50")),
+            max_batch=int(os.getenv("RISK_ANALYSIS_BATCH_MAX", "8")),
+        )
+    return _risk_batcher
+
+
+async def close_risk_batcher() -> None:
+    """Cierra el batcher de los análisis 5D (llamar al apagar la aplicación)."""
+    global _risk_batcher
+    if _risk_batcher is not None:
+        await _risk_batcher.close()
+        _risk_batcher = None
+
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _canonical_conversation_key(
+    activity_id: Optional[str],
+    total_interactions: int,
+    conversation_history: List[Dict[str, Any]],
+) -> str:
+    """
+    Clave de contenido de la conversación, independiente de la sesión.
+
+    Normaliza (minúsculas, sin puntuación, espacios colapsados) lo que el LLM
+    efectivamente analiza, para que sesiones con conversaciones casi idénticas
+    sobre la misma actividad compartan el análisis.
+    """
+    def normalize(text: Any) -> str:
+        text = _NON_WORD_RE.sub(" ", str(text).lower())
+        return _WHITESPACE_RE.sub(" ", text).strip()
+
+    parts = [str(activity_id), str(total_interactions)]
+    for conv in conversation_history:
+        parts.append(normalize(conv["student_question"]))
+        parts.append(normalize(conv["ai_response_preview"]))
+        parts.append(normalize(conv["interaction_type"]))
+    digest = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f"canonical:{digest}"
+
+
+def _summarize_interaction(num: int, interaction) -> Dict[str, Any]:
+    """
+    Resume una traza (CognitiveTraceDB) para el prompt de análisis.
+
+    Acceso directo a las columnas del modelo: el prompt del estudiante vive en
+    trace_metadata (dict, o string JSON en filas antiguas) y el content suele
+    ser la respuesta de la IA.
+    """
+    user_prompt = ""
+    meta = interaction.trace_metadata
+    if isinstance(meta, str):
+        try:
+            meta = orjson.loads(meta)
+        except orjson.JSONDecodeError:
+            meta = None
+    if isinstance(meta, dict):
+        user_prompt = meta.get("prompt") or ""
+
+    ai_response = interaction.content or ""
+
+    return {
+        "num": num,
+        "student_question": str(user_prompt)[:200] or "[Sin prompt capturado]",
+        "ai_response_preview": ai_response[:150] or "[Sin respuesta]",
+        "interaction_type": interaction.interaction_type or "unknown",
+    }
+
+
+def _collapse_repeated_interactions(
+    conversation_history: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Agrupa las interacciones repetidas (misma pregunta y misma respuesta) en
+    una sola entrada con su cantidad, para no gastar tokens de entrada en
+    contenido duplicado. Se conserva la primera aparición de cada una.
+    """
+    unique: Dict[bytes, Dict[str, Any]] = {}
+    for conv in conversation_history:
+        digest = hashlib.blake2b(
+            f"{conv['student_question']}\x1f{conv['ai_response_preview']}".encode("utf-8"),
+            digest_size=8,
+        ).digest()
+        entry = unique.get(digest)
+        if entry is None:
+            unique[digest] = {**conv, "count": 1}
+        else:
+            entry["count"] += 1
+
+    for entry in unique.values():
+        count = entry["count"]
+        entry["repetition"] = f" (repetida {count} veces)" if count > 1 else ""
+    return list(unique.values())
+
+
+def _load_session_state(
+    session_repo: SessionRepository,
+    trace_repo: TraceRepository,
+    session_id: str,
+    limit: int = 10,
+):
+    """
+    Carga la sesión, el total de interacciones, las últimas `limit` (las que
+    se analizan) y el análisis persistido si sigue vigente, en una sola pasada.
+
+    Se ejecuta con asyncio.to_thread. Las consultas van en secuencia dentro
+    del mismo thread porque ambos repositorios comparten la misma Session de
+    SQLAlchemy, que no es thread-safe (y risk_analysis_json es una columna
+    diferida: su carga también es una consulta).
+    """
+    session = session_repo.get_by_id(session_id)
+    if not session:
+        return None, 0, [], None
+    total_interactions = trace_repo.count_by_session(session_id)
+    interactions = trace_repo.get_recent_by_session(session_id, limit=limit)
+
+    stored_analysis = None
+    if interactions:
+        fingerprint = _analysis_fingerprint(interactions[-1].id, total_interactions)
+        if session.risk_analysis_fingerprint == fingerprint:
+            stored_analysis = session.risk_analysis_json
+    return session, total_interactions, interactions, stored_analysis
+
+
+def _risk_analysis_response(message: str, analysis: Dict[str, Any]) -> ORJSONResponse:
+    """
+    Envuelve el análisis en el formato de APIResponse y lo serializa con orjson,
+    sin pasar por jsonable_encoder ni revalidar el response_model.
+    """
+    return ORJSONResponse({
+        "success": True,
+        "data": analysis,
+        "message": message,
+        "timestamp": datetime.utcnow(),
+    })
+
+
+_RISK_DIMENSIONS = ("cognitive", "ethical", "epistemic", "technical", "governance")
+
+# Nivel de riesgo global según overall_score (suma de 5 dimensiones, 0-50):
+# < 15 low, 15-29 medium, 30-39 high, >= 40 critical
+_RISK_THRESHOLDS = (15, 30, 40)
+_RISK_LEVELS = ("low", "medium", "high", "critical")
+
+
+def _clamp_score(score: float) -> int:
+    """Score entero en rango 0-10."""
+    return max(0, min(10, int(score)))
+
+
+class _LLMDimension(BaseModel):
+    """Dimensión tal como la devuelve el LLM, con defaults seguros."""
+    score: Annotated[float, AfterValidator(_clamp_score)] = 3
+    level: str = "medium"
+    indicators: List[str] = Field(default_factory=lambda: ["No indicators available"])
+
+
+def _missing_dimension() -> _LLMDimension:
+    return _LLMDimension(indicators=["No data available"])
+
+
+class _LLMAnalysis(BaseModel):
+    """
+    JSON del análisis generado por el LLM. Las claves faltantes toman
+    defaults; un tipo inválido produce ValidationError (-> fallback).
+    """
+    cognitive: _LLMDimension = Field(default_factory=_missing_dimension)
+    ethical: _LLMDimension = Field(default_factory=_missing_dimension)
+    epistemic: _LLMDimension = Field(default_factory=_missing_dimension)
+    technical: _LLMDimension = Field(default_factory=_missing_dimension)
+    governance: _LLMDimension = Field(default_factory=_missing_dimension)
+    top_risks: List[Dict[str, Any]] = Field(default_factory=list)
+    recommendations: List[str] = Field(
+        default_factory=lambda: ["Continue monitoring session activity"]
+    )
+
+
+# Validación + parseo en una sola pasada (pydantic-core), creados una vez
+_LLM_ANALYSIS_ADAPTER = TypeAdapter(_LLMAnalysis)
+_LLM_DIMENSION_ADAPTER = TypeAdapter(_LLMDimension)
+
+# Análisis por defecto para sesiones sin interacciones todavía
+_NO_INTERACTIONS_ANALYSIS_TEMPLATE: Dict[str, Any] = {
+    "overall_score": 0,
+    "risk_level": "info",
+    "dimensions": {
+        "cognitive": {
+            "score": 0,
+            "level": "info",
+            "indicators": ["Sin actividad aún - sesión iniciada pero sin interacciones"]
+        },
+        "ethical": {
+            "score": 0,
+            "level": "info",
+            "indicators": ["Sin actividad para evaluar"]
+        },
+        "epistemic": {
+            "score": 0,
+            "level": "info",
+            "indicators": ["Sin actividad para evaluar"]
+        },
+        "technical": {
+            "score": 0,
+            "level": "info",
+            "indicators": ["Sin actividad para evaluar"]
+        },
+        "governance": {
+            "score": 0,
+            "level": "info",
+            "indicators": ["Sin actividad para evaluar"]
+        }
+    },
+    "top_risks": [],
+    "recommendations": [
+        "Inicia la conversación con el tutor para comenzar el análisis de riesgos",
+        "El sistema monitoreará automáticamente las 5 dimensiones de riesgo",
+        "Se generará un reporte detallado después de las primeras interacciones"
+    ]
+}
+
+
+@dataclass
+class _ReadyAnalysis:
+    """Análisis que se responde sin llamar al LLM (sin interacciones o cache hit)."""
+    message: str
+    analysis: Dict[str, Any]
+
+
+@dataclass
+class _PendingAnalysis:
+    """Análisis que requiere al LLM: claves de cache y prompt ya armados."""
+    session_id: str
+    fingerprint: str
+    cache_key: str
+    canonical_key: str
+    prompt: str
+
+
+def _resolve_risk_analysis(
+    session_id: str,
+    session_repo: SessionRepository,
+    trace_repo: TraceRepository,
+) -> Optional[Union[_ReadyAnalysis, _PendingAnalysis]]:
+    """
+    Carga el estado de la sesión y resuelve todo lo que no necesita al LLM.
+
+    Se ejecuta con asyncio.to_thread: las consultas a la base de datos y las
+    lecturas/escrituras del cache de Redis son síncronas.
+
+    Returns:
+        None si la sesión no existe, _ReadyAnalysis si hay respuesta
+        inmediata, o _PendingAnalysis con el prompt a enviar.
+    """
+    session, total_interactions, interactions, stored_analysis = _load_session_state(
+        session_repo, trace_repo, session_id
+    )
+    if not session:
+        return None
+    
+    # Si no hay interacciones, retornar análisis por defecto en lugar de error
+    if total_interactions == 0 or not interactions:
+        logger.info(f"No interactions found for session {session_id}, returning default risk analysis")
+        return _ReadyAnalysis(
+            "No interactions to analyze yet - default risk assessment provided",
+            {"session_id": session_id, **_NO_INTERACTIONS_ANALYSIS_TEMPLATE},
+        )
     
+    # Análisis persistido en la sesión para estas mismas interacciones
+    # (sobrevive a reinicios y no depende de Redis)
+    if stored_analysis is not None:
+        logger.info(f"Stored risk analysis is fresh for session {session_id}")
+        return _ReadyAnalysis("Risk analysis completed", orjson.loads(stored_analysis))
+    
+    # Reutilizar el análisis si no hubo interacciones nuevas desde el último
+    analysis_cache = _get_analysis_cache()
+    cache_key = _analysis_cache_key(session_id, interactions[-1].id, total_interactions)
+    cached_analysis = analysis_cache.get(cache_key, mode="RISK_5D")
+    if cached_analysis is not None:
+        logger.info(f"Risk analysis cache hit for session {session_id}")
+        return _ReadyAnalysis("Risk analysis completed", orjson.loads(cached_analysis))
+    
+    # Preparar contexto detallado para análisis con Mistral AI
+    # Extraer prompts del usuario y respuestas de la IA (últimas 10 interacciones)
+    conversation_history = [
+        _summarize_interaction(num, interaction)
+        for num, interaction in enumerate(interactions, 1)
+    ]
+    
+    # Cache por contenido: otra sesión de la misma actividad con una
+    # conversación casi idéntica ya pudo haber sido analizada
+    canonical_key = _canonical_conversation_key(
+        session.activity_id, total_interactions, conversation_history
+    )
+    cached_analysis = analysis_cache.get(canonical_key, mode="RISK_5D")
+    if cached_analysis is not None:
+        logger.info(f"Risk analysis content cache hit for session {session_id}")
+        analysis = {**orjson.loads(cached_analysis), "session_id": session_id}
+        analysis_cache.set(cache_key, orjson.dumps(analysis).decode(), mode="RISK_5D")
+        return _ReadyAnalysis("Risk analysis completed", analysis)
+    
+    # Solo se interpolan los campos dinámicos sobre las plantillas precompiladas
+    conversation_text = "\n\n".join(
+        _INTERACTION_PROMPT_FORMAT.format_map(conv)
+        for conv in _collapse_repeated_interactions(conversation_history)
+    )
+    prompt = _SESSION_PROMPT_TEMPLATE.substitute(
+        student_id=session.student_id,
+        activity_id=session.activity_id,
+        total_interactions=total_interactions,
+        analyzed=len(conversation_history),
+        conversation_text=conversation_text,
+    )
+
+    return _PendingAnalysis(
+        session_id=session_id,
+        fingerprint=_analysis_fingerprint(interactions[-1].id, total_interactions),
+        cache_key=cache_key,
+        canonical_key=canonical_key,
+        prompt=prompt,
+    )
+
+
+async def _prepare_risk_analysis(
+    session_id: str,
+    session_repo: SessionRepository,
+    trace_repo: TraceRepository,
+) -> Union[_ReadyAnalysis, _PendingAnalysis]:
+    """
+    Resuelve el análisis sin LLM en un thread, sin bloquear el event loop.
+
+    Raises:
+        HTTPException 404 si la sesión no existe
+    """
+    prepared = await asyncio.to_thread(
+        _resolve_risk_analysis, session_id, session_repo, trace_repo
+    )
+    if prepared is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return prepared
+
+
+def _risk_analysis_messages(prompt: str) -> List[LLMMessage]:
+    """Mensajes para el LLM: instrucciones estáticas primero, datos de la sesión después."""
+    return [
+        _RISK_ANALYSIS_SYSTEM_MESSAGE,
+        LLMMessage(role=LLMRole.USER, content=prompt),
+    ]
+
+
+def _build_analysis(session_id: str, validated: _LLMAnalysis) -> Dict[str, Any]:
+    """Arma el análisis final a partir del JSON del LLM ya validado."""
+    dimensions = validated.model_dump(include=set(_RISK_DIMENSIONS))
+    overall_score = sum(dim["score"] for dim in dimensions.values())
+
+    return {
+        "session_id": session_id,
+        "overall_score": overall_score,
+        "risk_level": _RISK_LEVELS[bisect.bisect_right(_RISK_THRESHOLDS, overall_score)],
+        "dimensions": dimensions,
+        "top_risks": validated.top_risks,
+        "recommendations": validated.recommendations
+    }
+
+
+def _cache_analysis(pending: _PendingAnalysis, analysis_json: str) -> None:
+    """Escribe el análisis en el cache por sesión y por contenido (Redis, síncrono)."""
+    analysis_cache = _get_analysis_cache()
+    analysis_cache.set(pending.cache_key, analysis_json, mode="RISK_5D")
+    analysis_cache.set(pending.canonical_key, analysis_json, mode="RISK_5D")
+
+
+def _save_risk_analysis_in_own_session(session_id: str, fingerprint: str, analysis_json: str) -> bool:
+    """
+    Persiste el análisis en una sesión de DB propia: dentro del generador de
+    un StreamingResponse la sesión de Depends(get_db) ya está cerrada.
+    """
+    with get_db_session() as db:
+        return SessionRepository(db).save_risk_analysis(session_id, fingerprint, analysis_json)
+
+
+async def _store_analysis(
+    save_risk_analysis: Callable[[str, str, str], bool],
+    pending: _PendingAnalysis,
+    analysis: Dict[str, Any],
+) -> None:
+    """
+    Guarda un análisis real del LLM (nunca el fallback): en el cache por
+    sesión y por contenido, y persistido en la sesión con su fingerprint
+    mediante `save_risk_analysis` (síncrono, corre en un thread).
+    """
+    analysis_json = orjson.dumps(analysis).decode()
+    await asyncio.to_thread(_cache_analysis, pending, analysis_json)
+
+    try:
+        await asyncio.to_thread(
+            save_risk_analysis,
+            pending.session_id, pending.fingerprint, analysis_json,
+        )
+    except SQLAlchemyError as e:
+        # El análisis ya se calculó: no persistirlo no debe romper la respuesta
+        logger.warning(f"Could not persist risk analysis for session {pending.session_id}: {e}")
+
+
+_JSON_STRUCTURAL_RE = re.compile(r'[\\"{}\[\],]')
+
+
+class _TopLevelMemberParser:
+    """
+    Parser incremental de los miembros de primer nivel de un objeto JSON.
+
+    Recibe el texto del LLM en chunks arbitrarios y devuelve cada par
+    (clave, valor) apenas se cierra, sin esperar al final de la respuesta.
+    Ignora el texto previo a la primera '{' y todo lo posterior al cierre del
+    objeto. Solo recorre los caracteres estructurales (regex), no char a char.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape_pending = False
+        self._member: List[str] = []
+
+    def feed(self, chunk: str) -> List[tuple]:
+        """Procesa un chunk y devuelve los miembros completados en él."""
+        completed: List[tuple] = []
+        if self._done or not chunk:
+            return completed
+
+        pos = 0
+        if not self._started:
+            pos = chunk.find("{")
+            if pos == -1:
+                return completed
+            self._started = True
+            self._depth = 1
+            pos += 1
+
+        # Un '\' al final del chunk anterior escapa el primer carácter de éste
+        skip_until = pos + 1 if self._escape_pending else pos
+        self._escape_pending = False
+        segment_start = pos
+
+        for match in _JSON_STRUCTURAL_RE.finditer(chunk, pos):
+            index = match.start()
+            if index < skip_until:
+                continue
+            char = chunk[index]
+
+            if self._in_string:
+                if char == "\\":
+                    skip_until = index + 2
+                    self._escape_pending = skip_until > len(chunk)
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._member.append(chunk[segment_start:index])
+                    completed.extend(self._flush())
+                    self._done = True
+                    return completed
+            elif char == "," and self._depth == 1:
+                self._member.append(chunk[segment_start:index])
+                completed.extend(self._flush())
+                segment_start = index + 1
+
+        self._member.append(chunk[segment_start:])
+        return completed
+
+    def close(self) -> List[tuple]:
+        """Fin del stream: intenta recuperar el último miembro si quedó abierto."""
+        if self._done:
+            return []
+        self._done = True
+        return self._flush()
+
+    def _flush(self) -> List[tuple]:
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return []
+        try:
+            return list(orjson.loads("{" + text + "}").items())
+        except orjson.JSONDecodeError:
+            return []
+
+
+def _ndjson_line(payload: Dict[str, Any]) -> bytes:
+    return orjson.dumps(payload) + b"\n"
+
+
+async def _compute_analysis(
+    session_id: str,
+    session_repo: SessionRepository,
+    llm_provider,
+    prepared: _PendingAnalysis,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Llama al LLM y arma el análisis (o el de respaldo si falla).
+
+    Returns:
+        (mensaje de la respuesta, análisis)
+    """
     try:
         # FIX 3.1: Use injected llm_provider with proper async interface
-        from ...llm.base import LLMMessage, LLMRole
-        llm_response_obj = await llm_provider.generate(
-            messages=[LLMMessage(role=LLMRole.USER, content=prompt)],
-            temperature=0.3,  # Más bajo para respuestas más consistentes
-            max_tokens=3000   # Aumentado para análisis detallado
+        llm_response_obj = await _get_risk_batcher(llm_provider).submit(
+            _risk_analysis_messages(prepared.prompt),
+            **RISK_ANALYSIS_LLM_PARAMS
         )
         response_text = llm_response_obj.content
         
@@ -322,202 +839,176 @@ Responde ÚNICAMENTE con el JSON, sin explicaciones adicionales."""
         
         json_str = response_text[json_start:json_end + 1]
         
-        # Parse JSON response with validation
-        analysis_data = json.loads(json_str)
+        # Parseo + validación en un solo paso (ValidationError es un ValueError)
+        validated = _LLM_ANALYSIS_ADAPTER.validate_json(json_str)
         
         logger.info(f"Successfully parsed JSON from Mistral AI for session {session_id}")
 
-        # Validate required keys exist with safe access
-        required_dimensions = ["cognitive", "ethical", "epistemic", "technical", "governance"]
-        default_dimension = {"score": 3, "level": "medium", "indicators": ["No data available"]}
-
-        # Safely extract dimension scores with defaults
-        dimension_scores = []
-        validated_dimensions = {}
-        for dim in required_dimensions:
-            dim_data = analysis_data.get(dim, default_dimension)
-            if not isinstance(dim_data, dict):
-                dim_data = default_dimension
-            score = dim_data.get("score", 3)
-            if not isinstance(score, (int, float)):
-                score = 3
-            # Asegurar que score esté en rango 0-10
-            score = max(0, min(10, int(score)))
-            dimension_scores.append(score)
-            validated_dimensions[dim] = {
-                "score": score,
-                "level": dim_data.get("level", "medium"),
-                "indicators": dim_data.get("indicators", ["No indicators available"])
-            }
-
-        overall_score = sum(dimension_scores)
-
-        # Determinar nivel de riesgo global
-        if overall_score >= 40:
-            risk_level = "critical"
-        elif overall_score >= 30:
-            risk_level = "high"
-        elif overall_score >= 15:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-
-        # Safely extract top_risks and recommendations
-        top_risks = analysis_data.get("top_risks", [])
-        if not isinstance(top_risks, list):
-            top_risks = []
-        recommendations = analysis_data.get("recommendations", ["Continue monitoring session activity"])
-        if not isinstance(recommendations, list):
-            recommendations = [str(recommendations)]
-
-        analysis = {
-            "session_id": session_id,
-            "overall_score": overall_score,
-            "risk_level": risk_level,
-            "dimensions": validated_dimensions,
-            "top_risks": top_risks,
-            "recommendations": recommendations
-        }
+        analysis = _build_analysis(session_id, validated)
+        await _store_analysis(session_repo.save_risk_analysis, prepared, analysis)
 
-        return APIResponse(
-            success=True,
-            message="Risk analysis completed",
-            data=analysis
-        )
+        return "Risk analysis completed", analysis
 
     except (ValueError, httpx.HTTPError) as e:
+        # ValueError cubre también orjson.JSONDecodeError y pydantic.ValidationError
         logger.warning(f"LLM risk analysis failed; returning fallback analysis: {e}")
-        analysis = {
-            "session_id": session_id,
-            "overall_score": 15,
-            "risk_level": "medium",
-            "dimensions": {
-                "cognitive": {
-                    "score": 3,
-                    "level": "medium",
-                    "indicators": ["Múltiples consultas similares", "Dependencia de respuestas IA"]
-                },
-                "ethical": {
-                    "score": 2,
-                    "level": "low",
-                    "indicators": ["Sin indicadores de plagio detectados"]
-                },
-                "epistemic": {
-                    "score": 4,
-                    "level": "medium",
-                    "indicators": ["Consultas superficiales", "Falta de profundización"]
-                },
-                "technical": {
-                    "score": 3,
-                    "level": "medium",
-                    "indicators": ["Uso de código sin modificación"]
-                },
-                "governance": {
-                    "score": 3,
-                    "level": "medium",
-                    "indicators": ["Uso extensivo de IA no justificado"]
-                }
-            },
-            "top_risks": [
-                {
-                    "dimension": "epistemic",
-                    "description": "Conocimiento superficial detectado",
-                    "severity": "medium",
-                    "mitigation": "Solicitar explicaciones conceptuales detalladas"
-                },
-                {
-                    "dimension": "cognitive",
-                    "description": "Alta dependencia de IA",
-                    "severity": "medium",
-                    "mitigation": "Reducir asistencia y promover pensamiento autónomo"
-                },
-                {
-                    "dimension": "technical",
-                    "description": "Código sin personalización",
-                    "severity": "low",
-                    "mitigation": "Solicitar adaptación del código a contexto específico"
-                }
-            ],
-            "recommendations": [
-                "Reducir gradualmente el nivel de ayuda de IA",
-                "Solicitar justificaciones conceptuales antes de proporcionar soluciones",
-                "Fomentar debugging manual antes de consultar IA",
-                "Implementar checkpoints de comprensión conceptual",
-                "Documentar el proceso de razonamiento explícitamente"
-            ]
-        }
+        analysis = {"session_id": session_id, **_FALLBACK_ANALYSIS_TEMPLATE}
 
-        return APIResponse(
-            success=True,
-            message="Risk analysis completed (fallback mode)",
-            data=analysis
-        )
+        return "Risk analysis completed (fallback mode)", analysis
 
-    except json.JSONDecodeError as e:
-        logger.warning(f"Failed to parse LLM risk analysis response: {e}")
-        # Fallback: crear análisis básico
-        analysis = {
-            "session_id": session_id,
-            "overall_score": 15,
-            "risk_level": "medium",
-            "dimensions": {
-                "cognitive": {
-                    "score": 3,
-                    "level": "medium",
-                    "indicators": ["Múltiples consultas similares", "Dependencia de respuestas IA"]
-                },
-                "ethical": {
-                    "score": 2,
-                    "level": "low",
-                    "indicators": ["Sin indicadores de plagio detectados"]
-                },
-                "epistemic": {
-                    "score": 4,
-                    "level": "medium",
-                    "indicators": ["Consultas superficiales", "Falta de profundización"]
-                },
-                "technical": {
-                    "score": 3,
-                    "level": "medium",
-                    "indicators": ["Uso de código sin modificación"]
-                },
-                "governance": {
-                    "score": 3,
-                    "level": "medium",
-                    "indicators": ["Uso extensivo de IA no justificado"]
-                }
-            },
-            "top_risks": [
-                {
-                    "dimension": "epistemic",
-                    "description": "Conocimiento superficial detectado",
-                    "severity": "medium",
-                    "mitigation": "Solicitar explicaciones conceptuales detalladas"
-                },
-                {
-                    "dimension": "cognitive",
-                    "description": "Alta dependencia de IA",
-                    "severity": "medium",
-                    "mitigation": "Reducir asistencia y promover pensamiento autónomo"
-                },
-                {
-                    "dimension": "technical",
-                    "description": "Código sin personalización",
-                    "severity": "low",
-                    "mitigation": "Solicitar adaptación del código a contexto específico"
-                }
-            ],
-            "recommendations": [
-                "Reducir gradualmente el nivel de ayuda de IA",
-                "Solicitar justificaciones conceptuales antes de proporcionar soluciones",
-                "Fomentar debugging manual antes de consultar IA",
-                "Implementar checkpoints de comprensión conceptual",
-                "Documentar el proceso de razonamiento explícitamente"
-            ]
-        }
-        
-        return APIResponse(
-            success=True,
-            message="Risk analysis completed (fallback mode)",
-            data=analysis
-        )
+
+# Análisis en curso por estado de sesión (clave = _analysis_cache_key)
+_inflight_analyses: Dict[str, asyncio.Future] = {}
+
+
+async def _coalesce_analysis(
+    key: str,
+    compute: Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]],
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Single-flight: si ya hay un análisis en curso para `key`, espera su
+    resultado en lugar de llamar otra vez al LLM.
+
+    Si el request que calculaba es cancelado (p.ej. el cliente se desconectó)
+    o falla, los que esperaban calculan por su cuenta.
+    """
+    inflight = _inflight_analyses.get(key)
+    if inflight is not None:
+        try:
+            # shield: cancelar a este request no cancela el cálculo compartido
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight_analyses[key] = future
+    try:
+        result = await compute()
+    except BaseException:
+        future.cancel()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        if _inflight_analyses.get(key) is future:
+            del _inflight_analyses[key]
+
+
+@router.get(
+    "/{session_id}",
+    # FIX Cortez21: Typed response (solo para OpenAPI; se devuelve ORJSONResponse directo)
+    responses={200: {"model": APIResponse[RiskAnalysis5DResponse]}},
+    summary="Análisis de Riesgos 5D",
+    description="Analiza riesgos en 5 dimensiones usando Ollama: cognitiva, ética, epistémica, técnica, gobernanza"
+)
+async def analyze_risks_5d(
+    session_id: str,
+    session_repo: SessionRepository = Depends(get_session_repository),
+    trace_repo: TraceRepository = Depends(get_trace_repository),
+    llm_provider = Depends(get_llm_provider),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Analiza riesgos en 5 dimensiones para una sesión específica:
+    - Cognitiva: Pérdida de habilidades de pensamiento crítico
+    - Ética: Plagio, falta de atribución, sesgos
+    - Epistémica: Erosión de fundamentos teóricos
+    - Técnica: Dependencia de herramientas, falta de debugging
+    - Gobernanza: Falta de policies, ausencia de auditoría
+    """
+    prepared = await _prepare_risk_analysis(session_id, session_repo, trace_repo)
+    if isinstance(prepared, _ReadyAnalysis):
+        return _risk_analysis_response(prepared.message, prepared.analysis)
+
+    # Requests simultáneos para el mismo estado de la sesión (p.ej. un
+    # dashboard que hace polling) comparten una sola llamada al LLM
+    message, analysis = await _coalesce_analysis(
+        prepared.cache_key,
+        lambda: _compute_analysis(session_id, session_repo, llm_provider, prepared),
+    )
+    return _risk_analysis_response(message, analysis)
+
+
+@router.get(
+    "/{session_id}/stream",
+    summary="Análisis de Riesgos 5D (streaming)",
+    description=(
+        "Igual que GET /risk-analysis/{session_id}, pero devuelve NDJSON: una línea "
+        '{"type": "dimension"} por cada dimensión apenas el LLM la termina de generar '
+        'y una línea final {"type": "analysis"} con el análisis completo.'
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_risks_5d(
+    session_id: str,
+    session_repo: SessionRepository = Depends(get_session_repository),
+    trace_repo: TraceRepository = Depends(get_trace_repository),
+    llm_provider = Depends(get_llm_provider),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Análisis 5D en streaming: el cliente puede mostrar cada dimensión a medida
+    que llega en lugar de esperar la generación completa.
+
+    Sin interacciones o con cache hit se emite directamente la línea final.
+    Si el provider no soporta streaming se usa la llamada normal.
+    """
+    # Fuera del generador: el 404 debe salir como respuesta HTTP normal
+    prepared = await _prepare_risk_analysis(session_id, session_repo, trace_repo)
+
+    async def generate():
+        if isinstance(prepared, _ReadyAnalysis):
+            yield _ndjson_line({"type": "analysis", "message": prepared.message, "data": prepared.analysis})
+            return
+
+        messages = _risk_analysis_messages(prepared.prompt)
+        parser = _TopLevelMemberParser()
+        analysis_data: Dict[str, Any] = {}
+        try:
+            try:
+                async for chunk in llm_provider.generate_stream(
+                    messages, **RISK_ANALYSIS_LLM_PARAMS
+                ):
+                    for key, value in parser.feed(chunk):
+                        analysis_data[key] = value
+                        if key in _RISK_DIMENSIONS:
+                            try:
+                                dimension = _LLM_DIMENSION_ADAPTER.validate_python(value)
+                            except ValidationError:
+                                continue  # La línea final resuelve el fallback
+                            yield _ndjson_line({
+                                "type": "dimension",
+                                "dimension": key,
+                                "data": dimension.model_dump(),
+                            })
+                analysis_data.update(parser.close())
+            except NotImplementedError:
+                llm_response_obj = await _get_risk_batcher(llm_provider).submit(
+                    messages, **RISK_ANALYSIS_LLM_PARAMS
+                )
+                analysis_data.update(parser.feed(llm_response_obj.content))
+                analysis_data.update(parser.close())
+
+            if not analysis_data:
+                raise ValueError("No JSON found in LLM response")
+
+            validated = _LLM_ANALYSIS_ADAPTER.validate_python(analysis_data)
+            analysis = _build_analysis(session_id, validated)
+            await _store_analysis(_save_risk_analysis_in_own_session, prepared, analysis)
+            message = "Risk analysis completed"
+        except (ValueError, httpx.HTTPError) as e:
+            logger.warning(f"LLM risk analysis stream failed; returning fallback analysis: {e}")
+            analysis = {"session_id": session_id, **_FALLBACK_ANALYSIS_TEMPLATE}
+            message = "Risk analysis completed (fallback mode)"
+
+        yield _ndjson_line({"type": "analysis", "message": message, "data": analysis})
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        # Content-Encoding explícito: GZipMiddleware no comprime (ni bufferiza)
+        # respuestas que ya lo traen, así cada línea llega apenas se genera
+        headers={"Content-Encoding": "identity", "Cache-Control": "no-cache"},
+    )
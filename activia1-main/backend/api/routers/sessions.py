@@ -13,7 +13,16 @@ import logging
 from ...database.repositories import SessionRepository, TraceRepository, RiskRepository, EvaluationRepository
 from ...database.models import SessionDB, CognitiveTraceDB, RiskDB, EvaluationDB
 from ...database.transaction import transaction
-from ..deps import get_db, get_session_repository, get_trace_repository, get_risk_repository, get_current_user
+from ...llm.base import LLMProvider
+from ..deps import (
+    get_current_user,
+    get_db,
+    get_llm_provider,
+    get_risk_repository,
+    get_session_repository,
+    get_trace_repository,
+    invalidate_session_state,
+)
 from ..schemas.session import (
     SessionCreate,
     SessionResponse,
@@ -350,6 +359,7 @@ async def update_session(
             updated_session = session_repo.update_status(session_id, status_value)
             if updated_session:
                 db_session = updated_session
+        invalidate_session_state(session_id)
 
     # Obtener conteos usando repositorios para asegurar datos correctos
     traces = trace_repo.get_by_session(session_id)
@@ -422,6 +432,7 @@ async def end_session(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Could not end session '{session_id}'. It may already be completed."
         )
+    invalidate_session_state(session_id)
 
     # Recargar sesión actualizada
     db_session = session_repo.get_by_id(session_id)
@@ -500,6 +511,7 @@ async def delete_session(
             operation=f"delete session '{session_id}'",
             details=str(e)
         )
+    invalidate_session_state(session_id)
 
     # No retornar contenido (204 No Content)
     return None
@@ -856,6 +868,7 @@ async def interact_with_tutor(
     session_id: str,
     request_data: Dict[str, Any] = Body(...),
     session_repo: SessionRepository = Depends(get_session_repository),
+    llm_provider: LLMProvider = Depends(get_llm_provider),
 ) -> APIResponse[Dict[str, Any]]:
     """
     Procesa la interacción del estudiante con el Tutor Socrático V2.0.
@@ -868,7 +881,6 @@ async def interact_with_tutor(
         Dict con response y metadata V2.0
     """
     from ...agents.tutor import TutorCognitivoAgent
-    from ...llm import LLMProviderFactory
     
     message = request_data.get("message", "")
     student_profile = request_data.get("student_profile", {})
@@ -881,9 +893,8 @@ async def interact_with_tutor(
             detail=f"Session {session_id} not found"
         )
     
-    # Inicializar LLM provider (Ollama) usando variables de entorno
-    llm_provider = LLMProviderFactory.create_from_env()
-    
+    # El LLM provider es el singleton de deps (antes se creaba uno por request,
+    # con su propio cliente HTTP que nunca se cerraba)
     # Inicializar tutor con LLM
     try:
         tutor = TutorCognitivoAgent(llm_provider=llm_provider)
@@ -3,17 +3,32 @@ Router para simuladores profesionales (S-IA-X)
 
 Sprint 3 - HU-EST-009, HU-SYS-006
 """
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, Final, List, Mapping, Optional, Tuple
+import asyncio
 import logging
+import os
 import time
 from uuid import uuid4
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
-from ..deps import get_db, get_session_repository, get_trace_repository, get_llm_provider, get_current_user
+from ..deps import (
+    SessionState,
+    get_current_user,
+    get_db,
+    get_llm_provider,
+    get_session_state,
+)
 from ..schemas.common import APIResponse
+from ..schemas.enums import SessionStatus
 from ..schemas.simulator import (
     SimulatorInteractionRequest,
     SimulatorInteractionResponse,
@@ -32,23 +47,191 @@ from ..schemas.simulators import (
     SecurityVulnerability
 )
 from ...agents.simulators import SimuladorProfesionalAgent, SimuladorType as AgentSimulatorType
+from ...core.constants import utc_now, uuid7
+from ...core.redis_cache import RedisCache
+from ...database import get_db_session
 from ...database.repositories import SessionRepository, TraceRepository
 from ...models.trace import CognitiveTrace, TraceLevel, InteractionType
 from ...llm.base import LLMProvider
-from ...llm.factory import LLMProviderFactory
+from ...llm.batcher import LLMRequestBatcher
 
 router = APIRouter(prefix="/simulators", tags=["Simulators"])
 
 
+# ============================================================================
+# CATÁLOGO DE SIMULADORES
+# ============================================================================
+# El catálogo es estático e inmutable: se valida y serializa a JSON una sola
+# vez al importar el módulo, y los endpoints de consulta solo copian los bytes.
+
+_SIMULATORS_LIST: Final[Tuple[SimulatorInfoResponse, ...]] = (
+    SimulatorInfoResponse(
+        type=SimulatorType.PRODUCT_OWNER,
+        name="Product Owner (PO-IA)",
+        description="Simula un Product Owner que revisa requisitos, prioriza backlog y cuestiona decisiones técnicas",
+        competencies=["comunicacion_tecnica", "analisis_requisitos", "priorizacion"],
+        status="active"
+    ),
+    SimulatorInfoResponse(
+        type=SimulatorType.SCRUM_MASTER,
+        name="Scrum Master (SM-IA)",
+        description="Simula un Scrum Master que facilita daily standups y gestiona impedimentos",
+        competencies=["gestion_tiempo", "comunicacion", "identificacion_impedimentos"],
+        status="active"
+    ),
+    SimulatorInfoResponse(
+        type=SimulatorType.TECH_INTERVIEWER,
+        name="Technical Interviewer (IT-IA)",
+        description="Simula un entrevistador técnico que evalúa conocimientos conceptuales y algorítmicos",
+        competencies=["dominio_conceptual", "analisis_algoritmico", "comunicacion_tecnica"],
+        status="active"
+    ),
+    SimulatorInfoResponse(
+        type=SimulatorType.INCIDENT_RESPONDER,
+        name="Incident Responder (IR-IA)",
+        description="Simula un ingeniero DevOps que gestiona incidentes en producción",
+        competencies=["diagnostico_sistematico", "priorizacion", "documentacion"],
+        status="development"
+    ),
+    SimulatorInfoResponse(
+        type=SimulatorType.CLIENT,
+        name="Client (CX-IA)",
+        description="Simula un cliente con requisitos ambiguos que requiere elicitación y negociación",
+        competencies=["elicitacion_requisitos", "negociacion", "empatia"],
+        status="development"
+    ),
+    SimulatorInfoResponse(
+        type=SimulatorType.DEVSECOPS,
+        name="DevSecOps (DSO-IA)",
+        description="Simula un analista de seguridad que audita código y detecta vulnerabilidades",
+        competencies=["seguridad", "analisis_vulnerabilidades", "gestion_riesgo"],
+        status="active"
+    ),
+)
+
+_SIMULATORS_MAP: Final[Mapping[SimulatorType, SimulatorInfoResponse]] = MappingProxyType({
+    SimulatorType.PRODUCT_OWNER: SimulatorInfoResponse(
+        type=SimulatorType.PRODUCT_OWNER,
+        name="Product Owner (PO-IA)",
+        description="Simula un Product Owner que revisa requisitos, prioriza backlog y cuestiona decisiones técnicas. Evalúa la capacidad del estudiante para comunicar ideas técnicas en lenguaje de negocio y justificar decisiones arquitectónicas.",
+        competencies=["comunicacion_tecnica", "analisis_requisitos", "priorizacion", "justificacion_decisiones"],
+        status="active",
+        example_questions=[
+            "¿Cuáles son los criterios de aceptación?",
+            "¿Cómo agrega valor al usuario final?",
+            "¿Qué alternativas consideraste?",
+            "¿Cuál es el impacto si lo postergamos?"
+        ]
+    ),
+    SimulatorType.SCRUM_MASTER: SimulatorInfoResponse(
+        type=SimulatorType.SCRUM_MASTER,
+        name="Scrum Master (SM-IA)",
+        description="Simula un Scrum Master que facilita daily standups, gestiona impedimentos y ayuda al equipo a mejorar procesos ágiles.",
+        competencies=["gestion_tiempo", "comunicacion", "identificacion_impedimentos", "auto_organizacion"],
+        status="active",
+        example_questions=[
+            "¿Qué lograste ayer?",
+            "¿Qué vas a hacer hoy?",
+            "¿Hay algún impedimento?",
+            "¿Por qué llevás más tiempo del estimado?"
+        ]
+    ),
+    SimulatorType.TECH_INTERVIEWER: SimulatorInfoResponse(
+        type=SimulatorType.TECH_INTERVIEWER,
+        name="Technical Interviewer (IT-IA)",
+        description="Simula un entrevistador técnico que evalúa conocimientos conceptuales, algorítmicos y de diseño de sistemas.",
+        competencies=["dominio_conceptual", "analisis_algoritmico", "comunicacion_tecnica", "razonamiento_en_voz_alta"],
+        status="active",
+        example_questions=[
+            "Explicá la diferencia entre O(n) y O(log n)",
+            "¿Cómo invertirías una lista enlazada?",
+            "¿Cómo diseñarías un sistema de caché?"
+        ]
+    ),
+    SimulatorType.INCIDENT_RESPONDER: SimulatorInfoResponse(
+        type=SimulatorType.INCIDENT_RESPONDER,
+        name="Incident Responder (IR-IA)",
+        description="Simula un ingeniero DevOps que gestiona incidentes en producción bajo presión.",
+        competencies=["diagnostico_sistematico", "priorizacion", "documentacion", "manejo_presion"],
+        status="development"
+    ),
+    SimulatorType.CLIENT: SimulatorInfoResponse(
+        type=SimulatorType.CLIENT,
+        name="Client (CX-IA)",
+        description="Simula un cliente con requisitos ambiguos que requiere elicitación, negociación y gestión de expectativas.",
+        competencies=["elicitacion_requisitos", "negociacion", "empatia", "gestion_expectativas"],
+        status="development"
+    ),
+    SimulatorType.DEVSECOPS: SimulatorInfoResponse(
+        type=SimulatorType.DEVSECOPS,
+        name="DevSecOps (DSO-IA)",
+        description="Simula un analista de seguridad que audita código, detecta vulnerabilidades y exige planes de remediación.",
+        competencies=["seguridad", "analisis_vulnerabilidades", "gestion_riesgo", "cumplimiento"],
+        status="active",
+        example_questions=[
+            "¿Cómo vas a remediar esta SQL injection?",
+            "¿Por qué hardcodeaste credenciales?",
+            "¿Cuál es tu plan de actualización de dependencias?"
+        ]
+    ),
+})
+
+_SIMULATORS_LIST_JSON: Final[bytes] = orjson.dumps([info.model_dump(mode="json") for info in _SIMULATORS_LIST])
+_SIMULATORS_MAP_JSON: Final[Mapping[SimulatorType, bytes]] = MappingProxyType({
+    simulator_type: orjson.dumps(info.model_dump(mode="json"))
+    for simulator_type, info in _SIMULATORS_MAP.items()
+})
+_SIMULATORS_LIST_MESSAGE = f"Se encontraron {len(_SIMULATORS_LIST)} simuladores"
+
+# Tipo de la API -> tipo del agente. Inmutable y armado una sola vez (antes se
+# reconstruía el dict en cada interacción).
+_SIM_TYPE_TO_AGENT: Final[Mapping[SimulatorType, AgentSimulatorType]] = MappingProxyType({
+    SimulatorType.PRODUCT_OWNER: AgentSimulatorType.PRODUCT_OWNER,
+    SimulatorType.SCRUM_MASTER: AgentSimulatorType.SCRUM_MASTER,
+    SimulatorType.TECH_INTERVIEWER: AgentSimulatorType.TECH_INTERVIEWER,
+    SimulatorType.INCIDENT_RESPONDER: AgentSimulatorType.INCIDENT_RESPONDER,
+    SimulatorType.CLIENT: AgentSimulatorType.CLIENT,
+    SimulatorType.DEVSECOPS: AgentSimulatorType.DEVSECOPS,
+})
+
+
+def _api_response(data: Any, message: str) -> ORJSONResponse:
+    """
+    Envuelve data en el formato de APIResponse y lo serializa con orjson, sin
+    pasar por jsonable_encoder ni revalidar el response_model (el modelo tipado
+    de cada endpoint se declara en responses= solo para OpenAPI).
+    """
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    return ORJSONResponse({
+        "success": True,
+        "data": data,
+        "message": message,
+        "timestamp": datetime.utcnow(),
+    })
+
+
+def _prebuilt_api_response(data_json: bytes, message: str) -> Response:
+    """Igual que _api_response, con data ya serializada a JSON (catálogo estático)"""
+    return Response(
+        content=(
+            b'{"success":true,"data":' + data_json
+            + b',"message":' + orjson.dumps(message)
+            + b',"timestamp":' + orjson.dumps(datetime.utcnow()) + b"}"
+        ),
+        media_type="application/json",
+    )
+
+
 @router.get(
     "",
-    response_model=APIResponse[List[SimulatorInfoResponse]],
+    responses={200: {"model": APIResponse[List[SimulatorInfoResponse]]}},
     summary="Listar simuladores disponibles",
     description="Obtiene la lista de todos los simuladores profesionales disponibles"
 )
 async def list_simulators(
     _current_user: dict = Depends(get_current_user),  # FIX Cortez22 DEFECTO 2.1: Require auth
-) -> APIResponse[List[SimulatorInfoResponse]]:
+) -> Response:
     """
     Lista todos los simuladores profesionales disponibles en el sistema.
 
@@ -60,72 +243,282 @@ async def list_simulators(
     - CX-IA: Client
     - DSO-IA: DevSecOps
     """
-    simulators = [
-        SimulatorInfoResponse(
-            type=SimulatorType.PRODUCT_OWNER,
-            name="Product Owner (PO-IA)",
-            description="Simula un Product Owner que revisa requisitos, prioriza backlog y cuestiona decisiones técnicas",
-            competencies=["comunicacion_tecnica", "analisis_requisitos", "priorizacion"],
-            status="active"
-        ),
-        SimulatorInfoResponse(
-            type=SimulatorType.SCRUM_MASTER,
-            name="Scrum Master (SM-IA)",
-            description="Simula un Scrum Master que facilita daily standups y gestiona impedimentos",
-            competencies=["gestion_tiempo", "comunicacion", "identificacion_impedimentos"],
-            status="active"
-        ),
-        SimulatorInfoResponse(
-            type=SimulatorType.TECH_INTERVIEWER,
-            name="Technical Interviewer (IT-IA)",
-            description="Simula un entrevistador técnico que evalúa conocimientos conceptuales y algorítmicos",
-            competencies=["dominio_conceptual", "analisis_algoritmico", "comunicacion_tecnica"],
-            status="active"
-        ),
-        SimulatorInfoResponse(
-            type=SimulatorType.INCIDENT_RESPONDER,
-            name="Incident Responder (IR-IA)",
-            description="Simula un ingeniero DevOps que gestiona incidentes en producción",
-            competencies=["diagnostico_sistematico", "priorizacion", "documentacion"],
-            status="development"
-        ),
-        SimulatorInfoResponse(
-            type=SimulatorType.CLIENT,
-            name="Client (CX-IA)",
-            description="Simula un cliente con requisitos ambiguos que requiere elicitación y negociación",
-            competencies=["elicitacion_requisitos", "negociacion", "empatia"],
-            status="development"
-        ),
-        SimulatorInfoResponse(
-            type=SimulatorType.DEVSECOPS,
-            name="DevSecOps (DSO-IA)",
-            description="Simula un analista de seguridad que audita código y detecta vulnerabilidades",
-            competencies=["seguridad", "analisis_vulnerabilidades", "gestion_riesgo"],
-            status="active"
-        ),
-    ]
+    return _prebuilt_api_response(_SIMULATORS_LIST_JSON, _SIMULATORS_LIST_MESSAGE)
+
+
+_simulator_batcher: Optional[LLMRequestBatcher] = None
+
+
+def _get_simulator_batcher(llm_provider: LLMProvider) -> LLMRequestBatcher:
+    """
+    Batcher compartido para las llamadas no-streaming de los simuladores.
+
+    Las interacciones de distintos estudiantes que llegan dentro de la misma
+    ventana (corta: son conversacionales) se despachan juntas contra el
+    provider, los prompts más cortos primero (daily standup, aclaraciones
+    del cliente) para que no esperen detrás de los largos. Se recrea si
+    cambia el provider inyectado.
+    """
+    global _simulator_batcher
+    if _simulator_batcher is None or _simulator_batcher.provider is not llm_provider:
+        _simulator_batcher = LLMRequestBatcher(
+            llm_provider,
+            window_ms=float(os.getenv("SIMULATOR_BATCH_WINDOW_MS", "20")),
+            max_batch=int(os.getenv("SIMULATOR_BATCH_MAX", "8")),
+            shortest_first=True,
+        )
+    return _simulator_batcher
+
+
+async def close_simulator_batcher() -> None:
+    """Cierra el batcher de los simuladores (llamar al apagar la aplicación)."""
+    global _simulator_batcher
+    if _simulator_batcher is not None:
+        await _simulator_batcher.close()
+        _simulator_batcher = None
+
+
+# Respuestas del LLM reutilizables entre requests con los mismos parámetros
+# (hoy: escenarios de incidente por tipo + severidad)
+SIMULATOR_RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("SIMULATOR_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+_simulator_response_cache: Optional[RedisCache] = None
+
+
+def _get_simulator_response_cache() -> RedisCache:
+    """Cache de respuestas de los simuladores (Redis con fallback a memoria), creado lazy."""
+    global _simulator_response_cache
+    if _simulator_response_cache is None:
+        _simulator_response_cache = RedisCache(
+            ttl_seconds=SIMULATOR_RESPONSE_CACHE_TTL_SECONDS,
+            prefix="simulator_response:",
+        )
+    return _simulator_response_cache
+
+
+_shared_simulator: Optional[SimuladorProfesionalAgent] = None
+
+
+def _get_shared_simulator(llm_provider: LLMProvider) -> SimuladorProfesionalAgent:
+    """
+    Agente sin tipo compartido por los endpoints de Sprint 6 (entrevista,
+    incidente, daily, cliente, auditoría). Sus métodos no guardan estado en
+    la instancia, así que no hace falta construir uno por request. Se recrea
+    si cambia el provider inyectado.
+    """
+    global _shared_simulator
+    if _shared_simulator is None or _shared_simulator.llm_provider is not llm_provider:
+        _shared_simulator = SimuladorProfesionalAgent(
+            llm_provider=llm_provider,
+            llm_batcher=_get_simulator_batcher(llm_provider),
+            response_cache=_get_simulator_response_cache(),
+        )
+    return _shared_simulator
+
+
+def _resolve_interaction(
+    request: SimulatorInteractionRequest,
+    session_repo: SessionRepository,
+    flow_id: str,
+) -> Tuple[SessionState, AgentSimulatorType]:
+    """
+    Valida el request de interacción y la sesión asociada.
+
+    Returns:
+        Tupla (sesión activa, tipo de simulador del agente)
+
+    Raises:
+        HTTPException: 400 si el request o el tipo son inválidos o la sesión no
+        está activa, 404 si la sesión no existe
+    """
+    # ============================================================
+    # VALIDACIÓN DE ENTRADA
+    # ============================================================
+    if not request or not request.session_id:
+        logger.error("Missing or invalid request data")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request data is required with a valid session_id"
+        )
+
+    if not request.prompt or request.prompt.strip() == "":
+        logger.warning("Empty prompt for session %s", request.session_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El prompt no puede estar vacío"
+        )
+
+    logger.info(
+        "HTTP simulator interaction received",
+        extra={
+            "flow_id": flow_id,
+            "session_id": request.session_id,
+            "simulator_type": str(request.simulator_type),
+        },
+    )
+
+    # ============================================================
+    # VALIDAR SESIÓN
+    # ============================================================
+    try:
+        db_session = get_session_state(session_repo, request.session_id)
+    except Exception as e:
+        logger.error(
+            "Error fetching session %s: %s: %s", request.session_id, type(e).__name__, e,
+            extra={"flow_id": flow_id, "session_id": request.session_id},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener la sesión: {str(e)}"
+        )
+
+    if not db_session:
+        logger.warning("Session not found: %s", request.session_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session '{request.session_id}' not found"
+        )
+
+    if db_session.status != SessionStatus.ACTIVE:
+        logger.warning("Session %s is not active: %s", request.session_id, db_session.status)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Session '{request.session_id}' is not active (status: {db_session.status})"
+        )
+
+    if request.simulator_type not in _SIM_TYPE_TO_AGENT:
+        logger.error("Unknown simulator type: %s", request.simulator_type)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Simulator type '{request.simulator_type}' is not supported"
+        )
+
+    return db_session, _SIM_TYPE_TO_AGENT[request.simulator_type]
+
+
+def _prepare_simulator(
+    request: SimulatorInteractionRequest,
+    llm_provider: LLMProvider,
+    flow_id: str,
+    llm_batcher: Optional[LLMRequestBatcher] = None,
+) -> Tuple[SessionState, SimuladorProfesionalAgent]:
+    """
+    Valida la sesión, crea el simulador y le carga el historial de la
+    conversación con una sesión de DB de vida corta. La conexión vuelve al
+    pool antes de la llamada al LLM en lugar de quedar retenida durante todo
+    el request (con requests concurrentes eso agota el QueuePool).
+    Bloqueante: se ejecuta con asyncio.to_thread.
+    """
+    with get_db_session() as db:
+        db_session, agent_simulator_type = _resolve_interaction(request, SessionRepository(db), flow_id)
+
+        try:
+            simulator = SimuladorProfesionalAgent(
+                simulator_type=agent_simulator_type,
+                llm_provider=llm_provider,
+                config={"context": request.context or {}, "flow_id": flow_id},
+                llm_batcher=llm_batcher
+            )
+        except Exception as e:
+            logger.error("Error creating simulator: %s: %s", type(e).__name__, e, exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al crear el simulador: {str(e)}"
+            )
+
+        simulator.preload_conversation_history(request.session_id, TraceRepository(db))
+
+    return db_session, simulator
 
-    return APIResponse(
-        success=True,
-        data=simulators,
-        message=f"Se encontraron {len(simulators)} simuladores"
+
+def _build_trace_pair(
+    request: SimulatorInteractionRequest,
+    db_session: SessionState,
+    response: Dict[str, Any],
+) -> Tuple[CognitiveTrace, CognitiveTrace]:
+    """
+    Arma las trazas N4 (input del estudiante, output del simulador) de una
+    interacción. Los IDs (UUIDv7, ordenados por tiempo) se generan acá, así la
+    respuesta no depende del INSERT.
+
+    Los modelos de salida se arman con model_construct: todos los valores los
+    produce el servidor (el request ya se validó al entrar), así que no se
+    paga una segunda validación por campo en cada interacción.
+    """
+    input_trace = CognitiveTrace.model_construct(
+        id=uuid7(),
+        session_id=request.session_id,
+        student_id=db_session.student_id,
+        activity_id=db_session.activity_id,
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=InteractionType.STUDENT_PROMPT,
+        content=request.prompt,
+        cognitive_state="exploracion",
+        cognitive_intent=f"Interactuar con simulador {request.simulator_type.value}",
+        ai_involvement=0.0,
+        trace_metadata={
+            "simulator_type": request.simulator_type.value,
+            "context": request.context or {}
+        }
+    )
+
+    output_trace = CognitiveTrace.model_construct(
+        id=uuid7(),
+        session_id=request.session_id,
+        student_id=db_session.student_id,
+        activity_id=db_session.activity_id,
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=InteractionType.AI_RESPONSE,
+        content=response.get("message", ""),
+        cognitive_state="reflexion",
+        cognitive_intent=f"Respuesta de simulador {request.simulator_type.value}",
+        ai_involvement=1.0,
+        trace_metadata={
+            "simulator_type": request.simulator_type.value,
+            "role": response.get("role"),
+            "expects": response.get("expects", []),
+            "competencies_evaluated": response.get("metadata", {}).get("competencies_evaluated", [])
+        }
+    )
+
+    return input_trace, output_trace
+
+
+def _build_interaction_response(
+    request: SimulatorInteractionRequest,
+    response: Dict[str, Any],
+    trace_id_input: str,
+    trace_id_output: str,
+) -> SimulatorInteractionResponse:
+    """Convierte la respuesta del agente en el SimulatorInteractionResponse del endpoint"""
+    return SimulatorInteractionResponse.model_construct(
+        interaction_id=f"{trace_id_input}_{trace_id_output}",
+        simulator_type=request.simulator_type,
+        response=response.get("message", "Error: No response generated"),
+        role=response.get("role", request.simulator_type.value),
+        expects=response.get("expects", []),
+        competencies_evaluated=response.get("metadata", {}).get("competencies_evaluated", []),
+        trace_id_input=trace_id_input,
+        trace_id_output=trace_id_output,
+        metadata={
+            "session_id": request.session_id,
+            "simulator_context": request.context or {},
+            "error": response.get("metadata", {}).get("error") if "error" in response.get("metadata", {}) else None
+        }
     )
 
 
 @router.post(
     "/interact",
-    response_model=APIResponse[SimulatorInteractionResponse],
+    responses={200: {"model": APIResponse[SimulatorInteractionResponse]}},
     summary="Interactuar con simulador",
     description="Procesa una interacción con un simulador profesional (HU-EST-009). SPRINT 4: Usa LLM real (Gemini/OpenAI) para respuestas dinámicas"
 )
 async def interact_with_simulator(
     request: SimulatorInteractionRequest,
-    db: Session = Depends(get_db),
-    session_repo: SessionRepository = Depends(get_session_repository),
-    trace_repo: TraceRepository = Depends(get_trace_repository),
+    background_tasks: BackgroundTasks,
     llm_provider: LLMProvider = Depends(get_llm_provider),
     x_flow_id: Optional[str] = Header(None, alias="X-Flow-Id"),
-) -> APIResponse[SimulatorInteractionResponse]:
+) -> ORJSONResponse:
     """
     Procesa una interacción entre el estudiante y un simulador profesional.
 
@@ -146,100 +539,9 @@ async def interact_with_simulator(
     flow_id = x_flow_id or f"flow_{uuid4()}"
     started_at = time.perf_counter()
     try:
-        # ============================================================
-        # VALIDACIÓN DE ENTRADA
-        # ============================================================
-        if not request or not request.session_id:
-            logger.error("Missing or invalid request data")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Request data is required with a valid session_id"
-            )
-        
-        if not request.prompt or request.prompt.strip() == "":
-            logger.warning(f"Empty prompt for session {request.session_id}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El prompt no puede estar vacío"
-            )
-        
-        logger.info(
-            "HTTP simulator interaction received",
-            extra={
-                "flow_id": flow_id,
-                "session_id": request.session_id,
-                "simulator_type": str(request.simulator_type),
-            },
+        db_session, simulator = await asyncio.to_thread(
+            _prepare_simulator, request, llm_provider, flow_id, _get_simulator_batcher(llm_provider)
         )
-        
-        # ============================================================
-        # VALIDAR SESIÓN
-        # ============================================================
-        try:
-            db_session = session_repo.get_by_id(request.session_id)
-        except Exception as e:
-            logger.error(
-                f"Error fetching session {request.session_id}: {type(e).__name__}: {e}",
-                extra={"flow_id": flow_id, "session_id": request.session_id},
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al obtener la sesión: {str(e)}"
-            )
-        
-        if not db_session:
-            logger.warning(f"Session not found: {request.session_id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Session '{request.session_id}' not found"
-            )
-
-        if db_session.status != "active":
-            logger.warning(f"Session {request.session_id} is not active: {db_session.status}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Session '{request.session_id}' is not active (status: {db_session.status})"
-            )
-
-        # ============================================================
-        # MAPEAR TIPO DE SIMULADOR
-        # ============================================================
-        simulator_type_map = {
-            SimulatorType.PRODUCT_OWNER: AgentSimulatorType.PRODUCT_OWNER,
-            SimulatorType.SCRUM_MASTER: AgentSimulatorType.SCRUM_MASTER,
-            SimulatorType.TECH_INTERVIEWER: AgentSimulatorType.TECH_INTERVIEWER,
-            SimulatorType.INCIDENT_RESPONDER: AgentSimulatorType.INCIDENT_RESPONDER,
-            SimulatorType.CLIENT: AgentSimulatorType.CLIENT,
-            SimulatorType.DEVSECOPS: AgentSimulatorType.DEVSECOPS,
-        }
-
-        if request.simulator_type not in simulator_type_map:
-            logger.error(f"Unknown simulator type: {request.simulator_type}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Simulator type '{request.simulator_type}' is not supported"
-            )
-        
-        agent_simulator_type = simulator_type_map[request.simulator_type]
-
-        # ============================================================
-        # CREAR SIMULADOR CON MANEJO DE ERRORES
-        # ============================================================
-        try:
-            simulator = SimuladorProfesionalAgent(
-                simulator_type=agent_simulator_type,
-                llm_provider=llm_provider,
-                trace_repo=trace_repo,
-                config={"context": request.context or {}, "flow_id": flow_id}
-            )
-        except Exception as e:
-            logger.error(f"Error creating simulator: {type(e).__name__}: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al crear el simulador: {str(e)}"
-            )
 
         # ============================================================
         # PROCESAR INTERACCIÓN CON MANEJO DE ERRORES
@@ -251,15 +553,13 @@ async def interact_with_simulator(
                 session_id=request.session_id
             )
         except ValueError as ve:
-            logger.error(f"Validation error in simulator interaction: {ve}")
+            logger.error("Validation error in simulator interaction: %s", ve)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Error de validación: {str(ve)}"
             )
         except Exception as e:
-            logger.error(f"Error in simulator interaction: {type(e).__name__}: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.error("Error in simulator interaction: %s: %s", type(e).__name__, e, exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error al procesar la interacción: {str(e)}"
@@ -268,70 +568,24 @@ async def interact_with_simulator(
         # ============================================================
         # CAPTURAR TRAZAS N4
         # ============================================================
+        # Las trazas se persisten en background, después de enviar la respuesta,
+        # con una sesión de DB propia (los IDs ya están generados). No se
+        # persisten en paralelo con el LLM: durante interact() el simulador lee
+        # el historial de la sesión y la traza de entrada duplicaría el prompt.
         try:
-            input_trace = CognitiveTrace(
-                session_id=request.session_id,
-                student_id=db_session.student_id,
-                activity_id=db_session.activity_id,
-                trace_level=TraceLevel.N4_COGNITIVO,
-                interaction_type=InteractionType.STUDENT_PROMPT,
-                content=request.prompt,
-                cognitive_state="exploracion",
-                cognitive_intent=f"Interactuar con simulador {request.simulator_type.value}",
-                ai_involvement=0.0,
-                metadata={
-                    "simulator_type": request.simulator_type.value,
-                    "context": request.context or {}
-                }
-            )
-
-            output_trace = CognitiveTrace(
-                session_id=request.session_id,
-                student_id=db_session.student_id,
-                activity_id=db_session.activity_id,
-                trace_level=TraceLevel.N4_COGNITIVO,
-                interaction_type=InteractionType.AI_RESPONSE,
-                content=response.get("message", ""),
-                cognitive_state="reflexion",
-                cognitive_intent=f"Respuesta de simulador {request.simulator_type.value}",
-                ai_involvement=1.0,
-                metadata={
-                    "simulator_type": request.simulator_type.value,
-                    "role": response.get("role"),
-                    "expects": response.get("expects", []),
-                    "competencies_evaluated": response.get("metadata", {}).get("competencies_evaluated", [])
-                }
-            )
-
-            # Persistir trazas
-            db_input_trace = trace_repo.create(input_trace)
-            db_output_trace = trace_repo.create(output_trace)
-            
+            input_trace, output_trace = _build_trace_pair(request, db_session, response)
+            background_tasks.add_task(_persist_trace_pair_in_background, input_trace, output_trace)
+            trace_ids = (input_trace.id, output_trace.id)
         except Exception as e:
-            logger.error(f"Error creating traces (non-critical): {type(e).__name__}: {e}")
+            logger.error("Error creating traces (non-critical): %s: %s", type(e).__name__, e)
             # Continuar sin trazas si falla (no es crítico)
-            db_input_trace = type('obj', (object,), {'id': 'trace_error_input'})()
-            db_output_trace = type('obj', (object,), {'id': 'trace_error_output'})()
+            trace_ids = ("trace_error_input", "trace_error_output")
 
         # ============================================================
         # PREPARAR RESPUESTA
         # ============================================================
         try:
-            simulator_response = SimulatorInteractionResponse(
-                interaction_id=f"{db_input_trace.id}_{db_output_trace.id}",
-                simulator_type=request.simulator_type,
-                response=response.get("message", "Error: No response generated"),
-                role=response.get("role", request.simulator_type.value),
-                expects=response.get("expects", []),
-                competencies_evaluated=response.get("metadata", {}).get("competencies_evaluated", []),
-                trace_id_input=db_input_trace.id,
-                trace_id_output=db_output_trace.id,
-                metadata={
-                    "session_id": request.session_id,
-                    "simulator_context": request.context or {},
-                    "error": response.get("metadata", {}).get("error") if "error" in response.get("metadata", {}) else None
-                }
-            )
+            simulator_response = _build_interaction_response(request, response, *trace_ids)
 
             logger.info(
                 "HTTP simulator interaction completed",
@@ -342,14 +596,13 @@ async def interact_with_simulator(
                     "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
                 },
             )
-            return APIResponse(
-                success=True,
+            return _api_response(
                 data=simulator_response,
                 message=f"Interacción procesada con simulador {request.simulator_type.value}"
             )
         
         except Exception as e:
-            logger.error(f"Error building simulator response: {type(e).__name__}: {e}")
+            logger.error("Error building simulator response: %s: %s", type(e).__name__, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error al construir la respuesta: {str(e)}"
@@ -359,106 +612,132 @@ async def interact_with_simulator(
         # Re-raise HTTPExceptions without wrapping
         raise
     except Exception as e:
-        logger.error(f"Unexpected critical error in interact_with_simulator: {type(e).__name__}: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error(
+            "Unexpected critical error in interact_with_simulator: %s: %s", type(e).__name__, e, exc_info=True
+        )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error crítico inesperado: {str(e)}"
         )
 
 
+def _persist_trace_pair(input_trace: CognitiveTrace, output_trace: CognitiveTrace) -> Tuple[str, str]:
+    """Persiste el par de trazas en una sesión de DB propia y devuelve sus IDs"""
+    with get_db_session() as db:
+        db_input_trace, db_output_trace = TraceRepository(db).create_many([input_trace, output_trace])
+        return db_input_trace.id, db_output_trace.id
+
+
+def _persist_trace_pair_in_background(input_trace: CognitiveTrace, output_trace: CognitiveTrace) -> None:
+    """BackgroundTask: persiste el par de trazas; un error no afecta la respuesta ya enviada"""
+    try:
+        _persist_trace_pair(input_trace, output_trace)
+    except Exception as e:
+        logger.error(
+            "Error persisting traces in background (non-critical): %s: %s", type(e).__name__, e,
+            extra={"session_id": input_trace.session_id, "trace_id_input": input_trace.id},
+        )
+
+
+# Content-Encoding explícito: GZipMiddleware no comprime (ni bufferiza)
+# respuestas que ya lo traen; X-Accel-Buffering desactiva el buffer de nginx
+_SSE_HEADERS: Final[Mapping[str, str]] = MappingProxyType({
+    "Content-Encoding": "identity",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+})
+
+
+def _sse_event(payload: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+@router.post(
+    "/interact/stream",
+    summary="Interactuar con simulador (streaming)",
+    description=(
+        "Igual que POST /simulators/interact, pero devuelve Server-Sent Events: un evento "
+        '{"type": "token"} por cada fragmento que genera el LLM y un evento final '
+        '{"type": "response"} con el SimulatorInteractionResponse completo.'
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_interaction_with_simulator(
+    request: SimulatorInteractionRequest,
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+    x_flow_id: Optional[str] = Header(None, alias="X-Flow-Id"),
+) -> StreamingResponse:
+    """
+    Variante streaming de interact_with_simulator (HU-EST-009).
+
+    El estudiante ve la respuesta a medida que el LLM la genera en lugar de
+    esperar la respuesta completa. Las validaciones (request, sesión, tipo de
+    simulador) se resuelven antes de abrir el stream y devuelven los mismos
+    errores HTTP que /interact. Las trazas N4 se persisten con el texto
+    completo al cerrar el stream, antes del evento final.
+    """
+    flow_id = x_flow_id or f"flow_{uuid4()}"
+    db_session, simulator = await asyncio.to_thread(_prepare_simulator, request, llm_provider, flow_id)
+
+    async def generate() -> AsyncIterator[bytes]:
+        started_at = time.perf_counter()
+        response: Dict[str, Any] = {}
+        async for kind, payload in simulator.stream_interact(
+            student_input=request.prompt,
+            context=request.context,
+            session_id=request.session_id
+        ):
+            if kind == "token":
+                yield _sse_event({"type": "token", "content": payload})
+            else:
+                response = payload
+
+        input_trace, output_trace = _build_trace_pair(request, db_session, response)
+        try:
+            trace_ids = await asyncio.to_thread(_persist_trace_pair, input_trace, output_trace)
+        except Exception as e:
+            logger.error("Error creating traces (non-critical): %s: %s", type(e).__name__, e)
+            trace_ids = ("trace_error_input", "trace_error_output")
+
+        simulator_response = _build_interaction_response(request, response, *trace_ids)
+        logger.info(
+            "HTTP simulator stream completed",
+            extra={
+                "flow_id": flow_id,
+                "session_id": request.session_id,
+                "simulator_type": str(request.simulator_type),
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+            },
+        )
+        yield _sse_event({"type": "response", "data": simulator_response.model_dump(mode="json")})
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
 @router.get(
     "/{simulator_type}",
-    response_model=APIResponse[SimulatorInfoResponse],
+    responses={200: {"model": APIResponse[SimulatorInfoResponse]}},
     summary="Obtener información de simulador",
     description="Obtiene información detallada de un simulador específico"
 )
 async def get_simulator_info(
     simulator_type: SimulatorType
-) -> APIResponse[SimulatorInfoResponse]:
+) -> Response:
     """
     Obtiene información detallada de un simulador profesional específico.
     """
-    simulators_map = {
-        SimulatorType.PRODUCT_OWNER: SimulatorInfoResponse(
-            type=SimulatorType.PRODUCT_OWNER,
-            name="Product Owner (PO-IA)",
-            description="Simula un Product Owner que revisa requisitos, prioriza backlog y cuestiona decisiones técnicas. Evalúa la capacidad del estudiante para comunicar ideas técnicas en lenguaje de negocio y justificar decisiones arquitectónicas.",
-            competencies=["comunicacion_tecnica", "analisis_requisitos", "priorizacion", "justificacion_decisiones"],
-            status="active",
-            example_questions=[
-                "¿Cuáles son los criterios de aceptación?",
-                "¿Cómo agrega valor al usuario final?",
-                "¿Qué alternativas consideraste?",
-                "¿Cuál es el impacto si lo postergamos?"
-            ]
-        ),
-        SimulatorType.SCRUM_MASTER: SimulatorInfoResponse(
-            type=SimulatorType.SCRUM_MASTER,
-            name="Scrum Master (SM-IA)",
-            description="Simula un Scrum Master que facilita daily standups, gestiona impedimentos y ayuda al equipo a mejorar procesos ágiles.",
-            competencies=["gestion_tiempo", "comunicacion", "identificacion_impedimentos", "auto_organizacion"],
-            status="active",
-            example_questions=[
-                "¿Qué lograste ayer?",
-                "¿Qué vas a hacer hoy?",
-                "¿Hay algún impedimento?",
-                "¿Por qué llevás más tiempo del estimado?"
-            ]
-        ),
-        SimulatorType.TECH_INTERVIEWER: SimulatorInfoResponse(
-            type=SimulatorType.TECH_INTERVIEWER,
-            name="Technical Interviewer (IT-IA)",
-            description="Simula un entrevistador técnico que evalúa conocimientos conceptuales, algorítmicos y de diseño de sistemas.",
-            competencies=["dominio_conceptual", "analisis_algoritmico", "comunicacion_tecnica", "razonamiento_en_voz_alta"],
-            status="active",
-            example_questions=[
-                "Explicá la diferencia entre O(n) y O(log n)",
-                "¿Cómo invertirías una lista enlazada?",
-                "¿Cómo diseñarías un sistema de caché?"
-            ]
-        ),
-        SimulatorType.INCIDENT_RESPONDER: SimulatorInfoResponse(
-            type=SimulatorType.INCIDENT_RESPONDER,
-            name="Incident Responder (IR-IA)",
-            description="Simula un ingeniero DevOps que gestiona incidentes en producción bajo presión.",
-            competencies=["diagnostico_sistematico", "priorizacion", "documentacion", "manejo_presion"],
-            status="development"
-        ),
-        SimulatorType.CLIENT: SimulatorInfoResponse(
-            type=SimulatorType.CLIENT,
-            name="Client (CX-IA)",
-            description="Simula un cliente con requisitos ambiguos que requiere elicitación, negociación y gestión de expectativas.",
-            competencies=["elicitacion_requisitos", "negociacion", "empatia", "gestion_expectativas"],
-            status="development"
-        ),
-        SimulatorType.DEVSECOPS: SimulatorInfoResponse(
-            type=SimulatorType.DEVSECOPS,
-            name="DevSecOps (DSO-IA)",
-            description="Simula un analista de seguridad que audita código, detecta vulnerabilidades y exige planes de remediación.",
-            competencies=["seguridad", "analisis_vulnerabilidades", "gestion_riesgo", "cumplimiento"],
-            status="active",
-            example_questions=[
-                "¿Cómo vas a remediar esta SQL injection?",
-                "¿Por qué hardcodeaste credenciales?",
-                "¿Cuál es tu plan de actualización de dependencias?"
-            ]
-        ),
-    }
-
-    simulator_info = simulators_map.get(simulator_type)
+    simulator_info = _SIMULATORS_MAP_JSON.get(simulator_type)
     if not simulator_info:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Simulator '{simulator_type}' not found"
         )
 
-    return APIResponse(
-        success=True,
-        data=simulator_info,
-        message=f"Información de simulador {simulator_type.value}"
-    )
+    return _prebuilt_api_response(simulator_info, f"Información de simulador {simulator_type.value}")
 
 
 # ============================================================================
@@ -491,18 +770,25 @@ logger_sprint6 = logging.getLogger(__name__)
 # ============================================================================
 # INTERVIEW SIMULATOR (IT-IA) - HU-EST-011 - SPRINT 6
 # ============================================================================
+# Los repositorios son síncronos: cada llamada a la base de datos corre con
+# asyncio.to_thread para no bloquear el event loop (que además atiende las
+# llamadas al LLM). Las llamadas son secuenciales: la Session de SQLAlchemy
+# no es thread-safe, pero puede usarse desde distintos threads de a uno.
+# Cada hop ocupa un thread del pool de AnyIO (40 por defecto, por worker de
+# uvicorn): con muchos requests concurrentes escalar con --workers.
 
 
 @router.post(
     "/interview/start",
-    response_model=APIResponse[InterviewResponse],
+    responses={200: {"model": APIResponse[InterviewResponse]}},
     summary="Start Technical Interview (Sprint 6)",
     description="Inicia una simulación de entrevista técnica con IT-IA (Technical Interviewer Agent)",
 )
 async def start_interview(
     request: InterviewStartRequest,
     db: Session = Depends(get_db),
-) -> APIResponse[InterviewResponse]:
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+) -> ORJSONResponse:
     """
     Inicia una sesión de entrevista técnica simulada (SPRINT 6).
 
@@ -517,7 +803,7 @@ async def start_interview(
     try:
         # Validate session exists
         session_repo = SessionRepository(db)
-        session_db = session_repo.get_by_id(request.session_id)
+        session_db = await asyncio.to_thread(get_session_state, session_repo, request.session_id)
         if not session_db:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -526,7 +812,8 @@ async def start_interview(
 
         # Create interview session
         interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.create(
+        interview = await asyncio.to_thread(
+            interview_repo.create,
             session_id=request.session_id,
             student_id=request.student_id,
             interview_type=request.interview_type,
@@ -535,8 +822,7 @@ async def start_interview(
         )
 
         # Initialize simulator and generate first question
-        llm_provider = LLMProviderFactory.create_from_env()
-        simulator = SimuladorProfesionalAgent(llm_provider=llm_provider)
+        simulator = _get_shared_simulator(llm_provider)
 
         first_question = await simulator.generar_pregunta_entrevista(
             tipo_entrevista=request.interview_type,
@@ -550,7 +836,7 @@ async def start_interview(
             "type": request.interview_type,
             "timestamp": interview.created_at.isoformat(),
         }
-        interview = interview_repo.add_question(interview.id, question_data)
+        interview = await asyncio.to_thread(interview_repo.add_question, interview.id, question_data)
 
         logger_sprint6.info(
             "Interview started",
@@ -561,8 +847,7 @@ async def start_interview(
             },
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=InterviewResponse(
                 interview_id=interview.id,
                 session_id=interview.session_id,
@@ -593,14 +878,15 @@ async def start_interview(
 
 @router.post(
     "/interview/respond",
-    response_model=APIResponse[InterviewResponse],
+    responses={200: {"model": APIResponse[InterviewResponse]}},
     summary="Submit Interview Response (Sprint 6)",
     description="Envía la respuesta del estudiante a una pregunta de entrevista",
 )
 async def submit_interview_response(
     request: InterviewResponseRequest,
     db: Session = Depends(get_db),
-) -> APIResponse[InterviewResponse]:
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+) -> ORJSONResponse:
     """
     Procesa la respuesta del estudiante y genera la siguiente pregunta (SPRINT 6).
 
@@ -612,56 +898,69 @@ async def submit_interview_response(
     """
     try:
         interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.get_by_id(request.interview_id)
+        # Solo la última pregunta y el conteo, sin cargar todo el historial
+        turn = await asyncio.to_thread(interview_repo.get_turn_state, request.interview_id)
 
-        if not interview:
+        if not turn:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Interview '{request.interview_id}' not found",
             )
 
         # Evaluate response with IT-IA
-        llm_provider = LLMProviderFactory.create_from_env()
-        simulator = SimuladorProfesionalAgent(llm_provider=llm_provider)
+        simulator = _get_shared_simulator(llm_provider)
 
-        last_question = interview.questions_asked[-1] if interview.questions_asked else {}
+        last_question = turn.last_question or {}
 
-        evaluation = await simulator.evaluar_respuesta_entrevista(
+        evaluation_call = simulator.evaluar_respuesta_entrevista(
             pregunta=last_question.get("question", ""),
             respuesta=request.response,
-            tipo_entrevista=interview.interview_type,
+            tipo_entrevista=turn.interview_type,
         )
 
-        # Add response with evaluation
+        # La próxima pregunta no depende de la evaluación de esta respuesta:
+        # ambas llamadas al LLM corren en paralelo (y entran en el mismo batch)
+        next_question = None
+        if turn.question_count < 5:  # Max 5 questions per interview
+            evaluation, next_question = await asyncio.gather(
+                evaluation_call,
+                simulator.generar_pregunta_entrevista(
+                    tipo_entrevista=turn.interview_type,
+                    dificultad=turn.difficulty_level,
+                    contexto=f"Preguntas previas: {turn.question_count}",
+                ),
+            )
+        else:
+            evaluation = await evaluation_call
+
+        # Respuesta evaluada + próxima pregunta: un solo commit
         response_data = {
             "response": request.response,
-            "timestamp": interview.updated_at.isoformat(),
+            "timestamp": turn.updated_at.isoformat(),
             "evaluation": evaluation,
         }
-        interview = interview_repo.add_response(interview.id, response_data)
-
-        # Generate next question if interview not complete
-        if len(interview.questions_asked) < 5:  # Max 5 questions per interview
-            next_question = await simulator.generar_pregunta_entrevista(
-                tipo_entrevista=interview.interview_type,
-                dificultad=interview.difficulty_level,
-                contexto=f"Preguntas previas: {len(interview.questions_asked)}",
-            )
-
+        question_data = None
+        if next_question is not None:
             question_data = {
                 "question": next_question,
-                "type": interview.interview_type,
-                "timestamp": interview.updated_at.isoformat(),
+                "type": turn.interview_type,
+                "timestamp": utc_now().isoformat(),
             }
-            interview = interview_repo.add_question(interview.id, question_data)
+        interview = await asyncio.to_thread(
+            interview_repo.append_turn, turn.id, response_data, question_data
+        )
+        if not interview:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Interview '{request.interview_id}' not found",
+            )
 
         logger_sprint6.info(
             "Interview response processed",
             extra={"interview_id": interview.id, "question_count": len(interview.questions_asked)},
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=InterviewResponse(
                 interview_id=interview.id,
                 session_id=interview.session_id,
@@ -688,14 +987,15 @@ async def submit_interview_response(
 
 @router.post(
     "/interview/complete",
-    response_model=APIResponse[InterviewResponse],
+    responses={200: {"model": APIResponse[InterviewResponse]}},
     summary="Complete Interview (Sprint 6)",
     description="Finaliza la entrevista y genera evaluación final",
 )
 async def complete_interview(
     request: InterviewCompleteRequest,
     db: Session = Depends(get_db),
-) -> APIResponse[InterviewResponse]:
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+) -> ORJSONResponse:
     """
     Completa la entrevista técnica y genera evaluación final (SPRINT 6).
 
@@ -706,7 +1006,7 @@ async def complete_interview(
     """
     try:
         interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.get_by_id(request.interview_id)
+        interview = await asyncio.to_thread(interview_repo.get_by_id, request.interview_id)
 
         if not interview:
             raise HTTPException(
@@ -715,8 +1015,7 @@ async def complete_interview(
             )
 
         # Generate final evaluation
-        llm_provider = LLMProviderFactory.create_from_env()
-        simulator = SimuladorProfesionalAgent(llm_provider=llm_provider)
+        simulator = _get_shared_simulator(llm_provider)
 
         final_evaluation = await simulator.generar_evaluacion_entrevista(
             preguntas=interview.questions_asked,
@@ -728,7 +1027,8 @@ async def complete_interview(
         duration = int((interview.updated_at - interview.created_at).total_seconds() / 60)
 
         # Complete interview with evaluation
-        interview = interview_repo.complete_interview(
+        interview = await asyncio.to_thread(
+            interview_repo.complete_interview,
             interview_id=interview.id,
             evaluation_score=final_evaluation.get("overall_score", 0.0),
             evaluation_breakdown=final_evaluation.get("breakdown", {}),
@@ -745,8 +1045,7 @@ async def complete_interview(
             },
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=InterviewResponse(
                 interview_id=interview.id,
                 session_id=interview.session_id,
@@ -777,18 +1076,18 @@ async def complete_interview(
 
 @router.get(
     "/interview/{interview_id}",
-    response_model=APIResponse[InterviewResponse],
+    responses={200: {"model": APIResponse[InterviewResponse]}},
     summary="Get Interview Details (Sprint 6)",
     description="Obtiene detalles completos de una sesión de entrevista",
 )
 async def get_interview(
     interview_id: str,
     db: Session = Depends(get_db),
-) -> APIResponse[InterviewResponse]:
+) -> ORJSONResponse:
     """Obtiene detalles completos de una entrevista técnica (SPRINT 6)"""
     try:
         interview_repo = InterviewSessionRepository(db)
-        interview = interview_repo.get_by_id(interview_id)
+        interview = await asyncio.to_thread(interview_repo.get_by_id, interview_id)
 
         if not interview:
             raise HTTPException(
@@ -796,8 +1095,7 @@ async def get_interview(
                 detail=f"Interview '{interview_id}' not found",
             )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=InterviewResponse(
                 interview_id=interview.id,
                 session_id=interview.session_id,
@@ -828,18 +1126,43 @@ async def get_interview(
 # ============================================================================
 # INCIDENT SIMULATOR (IR-IA) - HU-EST-012 - SPRINT 6
 # ============================================================================
+# Mismo criterio que las entrevistas: repositorios vía asyncio.to_thread.
+
+
+def _create_incident(
+    incident_repo: IncidentSimulationRepository,
+    request: IncidentStartRequest,
+    incident_scenario: Dict[str, Any],
+):
+    """Persiste el escenario generado por IR-IA como IncidentSimulationDB"""
+    return incident_repo.create(
+        session_id=request.session_id,
+        student_id=request.student_id,
+        incident_type=request.incident_type,
+        activity_id=request.activity_id,
+        severity=request.severity,
+        incident_description=incident_scenario.get("description", ""),
+        simulated_logs=incident_scenario.get("logs", ""),
+        simulated_metrics=incident_scenario.get("metrics", {}),
+    )
+
+
+def _to_incident_response(incident) -> IncidentResponse:
+    """Serializa un IncidentSimulationDB leyendo sus atributos (from_attributes)"""
+    return IncidentResponse.model_validate(incident, from_attributes=True)
 
 
 @router.post(
     "/incident/start",
-    response_model=APIResponse[IncidentResponse],
+    responses={200: {"model": APIResponse[IncidentResponse]}},
     summary="Start Incident Simulation (Sprint 6)",
     description="Inicia una simulación de incidente en producción con IR-IA",
 )
 async def start_incident(
     request: IncidentStartRequest,
     db: Session = Depends(get_db),
-) -> APIResponse[IncidentResponse]:
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+) -> ORJSONResponse:
     """
     Inicia una simulación de respuesta a incidentes (SPRINT 6).
 
@@ -851,7 +1174,7 @@ async def start_incident(
     try:
         # Validate session
         session_repo = SessionRepository(db)
-        session_db = session_repo.get_by_id(request.session_id)
+        session_db = await asyncio.to_thread(get_session_state, session_repo, request.session_id)
         if not session_db:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -859,8 +1182,7 @@ async def start_incident(
             )
 
         # Initialize simulator
-        llm_provider = LLMProviderFactory.create_from_env()
-        simulator = SimuladorProfesionalAgent(llm_provider=llm_provider)
+        simulator = _get_shared_simulator(llm_provider)
 
         # Generate incident scenario
         incident_scenario = await simulator.generar_incidente(
@@ -869,16 +1191,8 @@ async def start_incident(
         )
 
         # Create incident simulation
-        incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.create(
-            session_id=request.session_id,
-            student_id=request.student_id,
-            incident_type=request.incident_type,
-            activity_id=request.activity_id,
-            severity=request.severity,
-            incident_description=incident_scenario.get("description", ""),
-            simulated_logs=incident_scenario.get("logs", ""),
-            simulated_metrics=incident_scenario.get("metrics", {}),
+        incident = await asyncio.to_thread(
+            _create_incident, IncidentSimulationRepository(db), request, incident_scenario
         )
 
         logger_sprint6.info(
@@ -890,21 +1204,8 @@ async def start_incident(
             },
         )
 
-        return APIResponse(
-            success=True,
-            data=IncidentResponse(
-                incident_id=incident.id,
-                session_id=incident.session_id,
-                student_id=incident.student_id,
-                incident_type=incident.incident_type,
-                severity=incident.severity,
-                incident_description=incident.incident_description,
-                simulated_logs=incident.simulated_logs,
-                simulated_metrics=incident.simulated_metrics,
-                diagnosis_process=incident.diagnosis_process,
-                created_at=incident.created_at,
-                updated_at=incident.updated_at,
-            ),
+        return _api_response(
+            data=_to_incident_response(incident),
             message="Incident simulation started successfully",
         )
 
@@ -918,16 +1219,97 @@ async def start_incident(
         )
 
 
+def _lookup_session_state(session_id: str) -> Optional[SessionState]:
+    """get_session_state en una sesión de DB propia (para endpoints streaming)"""
+    with get_db_session() as db:
+        return get_session_state(SessionRepository(db), session_id)
+
+
+def _start_incident_in_own_session(
+    request: IncidentStartRequest, incident_scenario: Dict[str, Any]
+) -> IncidentResponse:
+    """
+    Persiste el incidente en una sesión de DB propia y arma la respuesta
+    dentro de la sesión (el commit de salida expira los atributos del ORM).
+    """
+    with get_db_session() as db:
+        incident = _create_incident(IncidentSimulationRepository(db), request, incident_scenario)
+        return _to_incident_response(incident)
+
+
+@router.post(
+    "/incident/start/stream",
+    summary="Start Incident Simulation (streaming)",
+    description=(
+        "Igual que POST /simulators/incident/start, pero devuelve Server-Sent Events: un "
+        'evento {"type": "token"} por cada fragmento del escenario que genera el LLM y un '
+        'evento final {"type": "incident"} con el IncidentResponse ya persistido.'
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_start_incident(
+    request: IncidentStartRequest,
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+) -> StreamingResponse:
+    """
+    Variante streaming de start_incident.
+
+    La sesión se valida antes de abrir el stream (mismo 404 que /incident/start).
+    Usa un agente propio por request: la cola de tokens es estado de la
+    instancia y no puede compartirse con el simulador singleton.
+    """
+    session_db = await asyncio.to_thread(_lookup_session_state, request.session_id)
+    if not session_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session '{request.session_id}' not found",
+        )
+
+    simulator = SimuladorProfesionalAgent(
+        llm_provider=llm_provider, response_cache=_get_simulator_response_cache()
+    )
+
+    async def generate() -> AsyncIterator[bytes]:
+        incident_scenario: Dict[str, Any] = {}
+        async for kind, payload in simulator.stream_incidente(
+            tipo_incidente=request.incident_type,
+            severidad=request.severity,
+        ):
+            if kind == "token":
+                yield _sse_event({"type": "token", "content": payload})
+            else:
+                incident_scenario = payload
+
+        try:
+            incident = await asyncio.to_thread(_start_incident_in_own_session, request, incident_scenario)
+        except Exception as e:
+            logger_sprint6.error("Error persisting streamed incident", exc_info=True)
+            yield _sse_event({"type": "error", "detail": f"Failed to start incident: {str(e)}"})
+            return
+
+        logger_sprint6.info(
+            "Incident simulation started (stream)",
+            extra={
+                "incident_id": incident.incident_id,
+                "incident_type": request.incident_type,
+                "severity": request.severity,
+            },
+        )
+        yield _sse_event({"type": "incident", "data": incident.model_dump(mode="json")})
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
 @router.post(
     "/incident/diagnose",
-    response_model=APIResponse[IncidentResponse],
+    responses={200: {"model": APIResponse[IncidentResponse]}},
     summary="Add Diagnosis Step (Sprint 6)",
     description="Agrega un paso de diagnóstico al proceso de resolución",
 )
 async def add_diagnosis_step(
     request: DiagnosisStepRequest,
     db: Session = Depends(get_db),
-) -> APIResponse[IncidentResponse]:
+) -> ORJSONResponse:
     """
     Registra un paso en el proceso de diagnóstico del incidente (SPRINT 6).
 
@@ -937,7 +1319,16 @@ async def add_diagnosis_step(
     """
     try:
         incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.get_by_id(request.incident_id)
+
+        # Un solo round trip: el repositorio devuelve None si el incidente no existe
+        diagnosis_step = {
+            "action": request.action,
+            "finding": request.finding,
+            "timestamp": utc_now().isoformat(),
+        }
+        incident = await asyncio.to_thread(
+            incident_repo.add_diagnosis_step, request.incident_id, diagnosis_step
+        )
 
         if not incident:
             raise HTTPException(
@@ -945,14 +1336,6 @@ async def add_diagnosis_step(
                 detail=f"Incident '{request.incident_id}' not found",
             )
 
-        # Add diagnosis step
-        diagnosis_step = {
-            "action": request.action,
-            "finding": request.finding,
-            "timestamp": incident.updated_at.isoformat(),
-        }
-        incident = incident_repo.add_diagnosis_step(incident.id, diagnosis_step)
-
         logger_sprint6.info(
             "Diagnosis step added",
             extra={
@@ -961,23 +1344,8 @@ async def add_diagnosis_step(
             },
         )
 
-        return APIResponse(
-            success=True,
-            data=IncidentResponse(
-                incident_id=incident.id,
-                session_id=incident.session_id,
-                student_id=incident.student_id,
-                incident_type=incident.incident_type,
-                severity=incident.severity,
-                incident_description=incident.incident_description,
-                simulated_logs=incident.simulated_logs,
-                simulated_metrics=incident.simulated_metrics,
-                diagnosis_process=incident.diagnosis_process,
-                solution_proposed=incident.solution_proposed,
-                root_cause_identified=incident.root_cause_identified,
-                created_at=incident.created_at,
-                updated_at=incident.updated_at,
-            ),
+        return _api_response(
+            data=_to_incident_response(incident),
             message="Diagnosis step added successfully",
         )
 
@@ -993,14 +1361,15 @@ async def add_diagnosis_step(
 
 @router.post(
     "/incident/resolve",
-    response_model=APIResponse[IncidentResponse],
+    responses={200: {"model": APIResponse[IncidentResponse]}},
     summary="Resolve Incident (Sprint 6)",
     description="Envía solución propuesta y finaliza el incidente",
 )
 async def resolve_incident(
     request: IncidentSolutionRequest,
     db: Session = Depends(get_db),
-) -> APIResponse[IncidentResponse]:
+    llm_provider: LLMProvider = Depends(get_llm_provider),
+) -> ORJSONResponse:
     """
     Completa la resolución del incidente (SPRINT 6).
 
@@ -1012,7 +1381,7 @@ async def resolve_incident(
     """
     try:
         incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.get_by_id(request.incident_id)
+        incident = await asyncio.to_thread(incident_repo.get_by_id, request.incident_id)
 
         if not incident:
             raise HTTPException(
@@ -1021,8 +1390,7 @@ async def resolve_incident(
             )
 
         # Evaluate resolution with IR-IA
-        llm_provider = LLMProviderFactory.create_from_env()
-        simulator = SimuladorProfesionalAgent(llm_provider=llm_provider)
+        simulator = _get_shared_simulator(llm_provider)
 
         evaluation = await simulator.evaluar_resolucion_incidente(
             proceso_diagnostico=incident.diagnosis_process,
@@ -1031,18 +1399,13 @@ async def resolve_incident(
             post_mortem=request.post_mortem,
         )
 
-        # Calculate time metrics
-        time_to_diagnose = len(incident.diagnosis_process) * 5  # Estimate 5 min per step
-        time_to_resolve = int((incident.updated_at - incident.created_at).total_seconds() / 60)
-
-        # Complete incident
-        incident = incident_repo.complete_incident(
+        # Complete incident (los tiempos se miden con los timestamps del incidente)
+        incident = await asyncio.to_thread(
+            incident_repo.complete_incident,
             incident_id=incident.id,
             solution_proposed=request.solution_proposed,
             root_cause_identified=request.root_cause_identified,
             post_mortem=request.post_mortem,
-            time_to_diagnose_minutes=time_to_diagnose,
-            time_to_resolve_minutes=time_to_resolve,
             evaluation=evaluation,
         )
 
@@ -1050,32 +1413,13 @@ async def resolve_incident(
             "Incident resolved",
             extra={
                 "incident_id": incident.id,
-                "time_to_resolve": time_to_resolve,
+                "time_to_resolve": incident.time_to_resolve_minutes,
                 "evaluation_score": evaluation.get("overall_score", 0.0),
             },
         )
 
-        return APIResponse(
-            success=True,
-            data=IncidentResponse(
-                incident_id=incident.id,
-                session_id=incident.session_id,
-                student_id=incident.student_id,
-                incident_type=incident.incident_type,
-                severity=incident.severity,
-                incident_description=incident.incident_description,
-                simulated_logs=incident.simulated_logs,
-                simulated_metrics=incident.simulated_metrics,
-                diagnosis_process=incident.diagnosis_process,
-                solution_proposed=incident.solution_proposed,
-                root_cause_identified=incident.root_cause_identified,
-                time_to_diagnose_minutes=incident.time_to_diagnose_minutes,
-                time_to_resolve_minutes=incident.time_to_resolve_minutes,
-                post_mortem=incident.post_mortem,
-                evaluation=incident.evaluation,
-                created_at=incident.created_at,
-                updated_at=incident.updated_at,
-            ),
+        return _api_response(
+            data=_to_incident_response(incident),
             message="Incident resolved successfully",
         )
 
@@ -1091,18 +1435,18 @@ async def resolve_incident(
 
 @router.get(
     "/incident/{incident_id}",
-    response_model=APIResponse[IncidentResponse],
+    responses={200: {"model": APIResponse[IncidentResponse]}},
     summary="Get Incident Details (Sprint 6)",
     description="Obtiene detalles completos de una simulación de incidente",
 )
 async def get_incident(
     incident_id: str,
     db: Session = Depends(get_db),
-) -> APIResponse[IncidentResponse]:
+) -> ORJSONResponse:
     """Obtiene detalles completos de un incidente simulado (SPRINT 6)"""
     try:
         incident_repo = IncidentSimulationRepository(db)
-        incident = incident_repo.get_by_id(incident_id)
+        incident = await asyncio.to_thread(incident_repo.get_by_id, incident_id)
 
         if not incident:
             raise HTTPException(
@@ -1110,27 +1454,8 @@ async def get_incident(
                 detail=f"Incident '{incident_id}' not found",
             )
 
-        return APIResponse(
-            success=True,
-            data=IncidentResponse(
-                incident_id=incident.id,
-                session_id=incident.session_id,
-                student_id=incident.student_id,
-                incident_type=incident.incident_type,
-                severity=incident.severity,
-                incident_description=incident.incident_description,
-                simulated_logs=incident.simulated_logs,
-                simulated_metrics=incident.simulated_metrics,
-                diagnosis_process=incident.diagnosis_process,
-                solution_proposed=incident.solution_proposed,
-                root_cause_identified=incident.root_cause_identified,
-                time_to_diagnose_minutes=incident.time_to_diagnose_minutes,
-                time_to_resolve_minutes=incident.time_to_resolve_minutes,
-                post_mortem=incident.post_mortem,
-                evaluation=incident.evaluation,
-                created_at=incident.created_at,
-                updated_at=incident.updated_at,
-            ),
+        return _api_response(
+            data=_to_incident_response(incident),
         )
 
     except HTTPException:
@@ -1146,18 +1471,57 @@ async def get_incident(
 # ============================================================================
 # SCRUM MASTER SIMULATOR (SM-IA) - HU-EST-010
 # ============================================================================
+# SM-IA, CX-IA y DSO-IA siguen el mismo criterio: repositorios vía
+# asyncio.to_thread. La traza de cada interacción no hace falta para armar la
+# respuesta, así que se persiste en una BackgroundTask (como en /interact).
+# Los métodos de estos agentes son reglas en memoria (sin LLM ni I/O): se
+# llaman inline, un salto a un thread costaría más que la llamada.
+
+
+def _build_simulator_trace(
+    session_db: SessionState,
+    student_id: str,
+    activity_id: str,
+    content: str,
+    ai_involvement: float,
+) -> CognitiveTrace:
+    """Arma la traza N3 de una interacción con SM-IA, CX-IA o DSO-IA"""
+    return CognitiveTrace.model_construct(
+        id=uuid7(),
+        session_id=session_db.id,
+        student_id=student_id,
+        activity_id=activity_id,
+        trace_level=TraceLevel.N3_INTERACCIONAL,
+        interaction_type=InteractionType.STUDENT_PROMPT,
+        content=content,
+        ai_involvement=ai_involvement,
+    )
+
+
+def _write_trace_in_background(trace: CognitiveTrace) -> None:
+    """BackgroundTask: persiste la traza en una sesión de DB propia; un error no afecta la respuesta"""
+    try:
+        with get_db_session() as db:
+            TraceRepository(db).create(trace)
+    except Exception as e:
+        logger.error(
+            "Error persisting trace in background (non-critical): %s: %s", type(e).__name__, e,
+            extra={"session_id": trace.session_id, "trace_id": trace.id},
+        )
+
 
 @router.post(
     "/scrum/daily-standup",
-    response_model=APIResponse[DailyStandupResponse],
+    responses={200: {"model": APIResponse[DailyStandupResponse]}},
     summary="Daily Standup with Scrum Master (SM-IA)",
     description="Participar en daily standup simulado con feedback del Scrum Master",
 )
 async def daily_standup(
     request: DailyStandupRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     llm_provider: LLMProvider = Depends(get_llm_provider),
-) -> APIResponse[DailyStandupResponse]:
+) -> ORJSONResponse:
     """
     Procesa la participación del estudiante en un daily standup simulado.
 
@@ -1176,7 +1540,7 @@ async def daily_standup(
         APIResponse con feedback del SM-IA
     """
     logger_sprint6.info(
-        f"Processing daily standup for student {request.student_id}",
+        "Processing daily standup for student %s", request.student_id,
         extra={
             "student_id": request.student_id,
             "session_id": request.session_id,
@@ -1187,7 +1551,7 @@ async def daily_standup(
     try:
         # Verificar que la sesión existe
         session_repo = SessionRepository(db)
-        session_db = session_repo.get_by_id(request.session_id)
+        session_db = await asyncio.to_thread(get_session_state, session_repo, request.session_id)
         if not session_db:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1195,31 +1559,29 @@ async def daily_standup(
             )
 
         # Crear agente SM-IA
-        sm_agent = SimuladorProfesionalAgent(
-            simulator_type=None,  # SM-IA no requiere tipo específico
-            llm_provider=llm_provider
-        )
+        sm_agent = _get_shared_simulator(llm_provider)
 
         # Procesar daily standup
         feedback_data = sm_agent.procesar_daily_standup(
-            ayer=request.what_did_yesterday,
-            hoy=request.what_will_do_today,
+            que_hizo_ayer=request.what_did_yesterday,
+            que_hara_hoy=request.what_will_do_today,
             impedimentos=request.impediments
         )
 
-        # Crear trace de la interacción
-        trace_repo = TraceRepository(db)
-        trace_repo.create(
-            student_id=request.student_id,
-            activity_id=request.activity_id or "daily_standup",
-            trace_level=TraceLevel.N3_INTERACCIONAL,
-            interaction_type=InteractionType.STUDENT_PROMPT,
-            content=f"Daily standup: {request.what_did_yesterday[:50]}...",
-            ai_involvement=0.5,  # Moderada participación del AI
+        # Traza de la interacción (se persiste después de responder)
+        background_tasks.add_task(
+            _write_trace_in_background,
+            _build_simulator_trace(
+                session_db,
+                student_id=request.student_id,
+                activity_id=request.activity_id or "daily_standup",
+                content=f"Daily standup: {request.what_did_yesterday[:50]}...",
+                ai_involvement=0.5,  # Moderada participación del AI
+            ),
         )
 
         logger_sprint6.info(
-            f"Daily standup processed successfully",
+            "Daily standup processed successfully",
             extra={
                 "student_id": request.student_id,
                 "issues_detected": len(feedback_data.get("detected_issues", []))
@@ -1234,8 +1596,7 @@ async def daily_standup(
             suggestions=feedback_data.get("suggestions", [])
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=response,
             message="Daily standup feedback generated successfully"
         )
@@ -1256,15 +1617,16 @@ async def daily_standup(
 
 @router.post(
     "/client/requirements",
-    response_model=APIResponse[ClientResponse],
+    responses={200: {"model": APIResponse[ClientResponse]}},
     summary="Get Client Requirements (CX-IA)",
     description="Obtener requisitos iniciales del cliente simulado",
 )
 async def get_client_requirements(
     request: ClientRequirementRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     llm_provider: LLMProvider = Depends(get_llm_provider),
-) -> APIResponse[ClientResponse]:
+) -> ORJSONResponse:
     """
     Obtiene los requisitos iniciales del cliente simulado (CX-IA).
 
@@ -1280,7 +1642,7 @@ async def get_client_requirements(
         APIResponse con requisitos del cliente
     """
     logger_sprint6.info(
-        f"Generating client requirements for student {request.student_id}",
+        "Generating client requirements for student %s", request.student_id,
         extra={
             "student_id": request.student_id,
             "project_type": request.project_type
@@ -1290,7 +1652,7 @@ async def get_client_requirements(
     try:
         # Verificar sesión
         session_repo = SessionRepository(db)
-        session_db = session_repo.get_by_id(request.session_id)
+        session_db = await asyncio.to_thread(get_session_state, session_repo, request.session_id)
         if not session_db:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1298,28 +1660,26 @@ async def get_client_requirements(
             )
 
         # Crear agente CX-IA
-        cx_agent = SimuladorProfesionalAgent(
-            simulator_type=None,
-            llm_provider=llm_provider
-        )
+        cx_agent = _get_shared_simulator(llm_provider)
 
         # Generar requisitos del cliente
         client_data = cx_agent.generar_requerimientos_cliente(
             tipo_proyecto=request.project_type
         )
 
-        # Crear trace
-        trace_repo = TraceRepository(db)
-        trace_repo.create(
-            student_id=request.student_id,
-            activity_id=request.activity_id or "client_requirements",
-            trace_level=TraceLevel.N3_INTERACCIONAL,
-            interaction_type=InteractionType.STUDENT_PROMPT,
-            content=f"Client requirements request: {request.project_type}",
-            ai_involvement=0.7,  # Alta participación del AI en generación
+        # Traza de la interacción (se persiste después de responder)
+        background_tasks.add_task(
+            _write_trace_in_background,
+            _build_simulator_trace(
+                session_db,
+                student_id=request.student_id,
+                activity_id=request.activity_id or "client_requirements",
+                content=f"Client requirements request: {request.project_type}",
+                ai_involvement=0.7,  # Alta participación del AI en generación
+            ),
         )
 
-        logger_sprint6.info(f"Client requirements generated successfully")
+        logger_sprint6.info("Client requirements generated successfully")
 
         # Construir response
         response = ClientResponse(
@@ -1328,8 +1688,7 @@ async def get_client_requirements(
             evaluation={"empathy": 0.0, "clarity": 0.0, "professionalism": 0.0}  # Aún no hay evaluación
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=response,
             message="Client requirements generated successfully"
         )
@@ -1346,15 +1705,16 @@ async def get_client_requirements(
 
 @router.post(
     "/client/clarify",
-    response_model=APIResponse[ClientResponse],
+    responses={200: {"model": APIResponse[ClientResponse]}},
     summary="Ask Client Clarification (CX-IA)",
     description="Hacer pregunta de clarificación al cliente",
 )
 async def ask_client_clarification(
     request: ClientClarificationRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     llm_provider: LLMProvider = Depends(get_llm_provider),
-) -> APIResponse[ClientResponse]:
+) -> ORJSONResponse:
     """
     Envía una pregunta de clarificación al cliente simulado (CX-IA).
 
@@ -1372,14 +1732,14 @@ async def ask_client_clarification(
         APIResponse con respuesta del cliente y evaluación de soft skills
     """
     logger_sprint6.info(
-        f"Processing client clarification question",
+        "Processing client clarification question",
         extra={"session_id": request.session_id}
     )
 
     try:
         # Verificar sesión
         session_repo = SessionRepository(db)
-        session_db = session_repo.get_by_id(request.session_id)
+        session_db = await asyncio.to_thread(get_session_state, session_repo, request.session_id)
         if not session_db:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1387,25 +1747,23 @@ async def ask_client_clarification(
             )
 
         # Crear agente CX-IA
-        cx_agent = SimuladorProfesionalAgent(
-            simulator_type=None,
-            llm_provider=llm_provider
-        )
+        cx_agent = _get_shared_simulator(llm_provider)
 
         # Responder clarificación
         client_data = cx_agent.responder_clarificacion(
             pregunta=request.question
         )
 
-        # Crear trace
-        trace_repo = TraceRepository(db)
-        trace_repo.create(
-            student_id=session_db.student_id,
-            activity_id=session_db.activity_id,
-            trace_level=TraceLevel.N3_INTERACCIONAL,
-            interaction_type=InteractionType.STUDENT_PROMPT,
-            content=f"Client clarification: {request.question[:100]}...",
-            ai_involvement=0.6,
+        # Traza de la interacción (se persiste después de responder)
+        background_tasks.add_task(
+            _write_trace_in_background,
+            _build_simulator_trace(
+                session_db,
+                student_id=session_db.student_id,
+                activity_id=session_db.activity_id,
+                content=f"Client clarification: {request.question[:100]}...",
+                ai_involvement=0.6,
+            ),
         )
 
         logger_sprint6.info("Client clarification processed successfully")
@@ -1421,8 +1779,7 @@ async def ask_client_clarification(
             })
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=response,
             message="Client clarification answered successfully"
         )
@@ -1441,17 +1798,30 @@ async def ask_client_clarification(
 # DEVSECOPS AUDITOR (DSO-IA) - HU-EST-014
 # ============================================================================
 
+# Lista de vulnerabilidades validada en una sola llamada a pydantic-core
+_VULNERABILITY_LIST_ADAPTER = TypeAdapter(List[SecurityVulnerability])
+
+# Valores por defecto para claves que DSO-IA no informe
+_VULNERABILITY_DEFAULTS: Final[Mapping[str, str]] = MappingProxyType({
+    "severity": "INFO",
+    "vulnerability_type": "UNKNOWN",
+    "description": "",
+    "recommendation": "",
+})
+
+
 @router.post(
     "/security/audit",
-    response_model=APIResponse[SecurityAuditResponse],
+    responses={200: {"model": APIResponse[SecurityAuditResponse]}},
     summary="Security Code Audit (DSO-IA)",
     description="Auditar código en busca de vulnerabilidades de seguridad (OWASP Top 10)",
 )
 async def security_audit(
     request: SecurityAuditRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     llm_provider: LLMProvider = Depends(get_llm_provider),
-) -> APIResponse[SecurityAuditResponse]:
+) -> ORJSONResponse:
     """
     Realiza una auditoría de seguridad del código proporcionado (DSO-IA).
 
@@ -1474,7 +1844,7 @@ async def security_audit(
         APIResponse con reporte completo de seguridad
     """
     logger_sprint6.info(
-        f"Starting security audit for student {request.student_id}",
+        "Starting security audit for student %s", request.student_id,
         extra={
             "student_id": request.student_id,
             "language": request.language,
@@ -1485,7 +1855,7 @@ async def security_audit(
     try:
         # Verificar sesión
         session_repo = SessionRepository(db)
-        session_db = session_repo.get_by_id(request.session_id)
+        session_db = await asyncio.to_thread(get_session_state, session_repo, request.session_id)
         if not session_db:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1493,10 +1863,7 @@ async def security_audit(
             )
 
         # Crear agente DSO-IA
-        dso_agent = SimuladorProfesionalAgent(
-            simulator_type=None,
-            llm_provider=llm_provider
-        )
+        dso_agent = _get_shared_simulator(llm_provider)
 
         # Realizar auditoría de seguridad
         audit_data = dso_agent.auditar_seguridad(
@@ -1504,32 +1871,24 @@ async def security_audit(
             lenguaje=request.language
         )
 
-        # Crear trace
-        trace_repo = TraceRepository(db)
-        trace_repo.create(
+        # Traza de la interacción (se persiste después de responder); su id
+        # es el audit_id, así la auditoría queda identificada en la DB
+        audit_trace = _build_simulator_trace(
+            session_db,
             student_id=request.student_id,
             activity_id=request.activity_id or "security_audit",
-            trace_level=TraceLevel.N3_INTERACCIONAL,
-            interaction_type=InteractionType.STUDENT_PROMPT,
             content=f"Security audit ({request.language}): {len(request.code)} chars",
             ai_involvement=0.8,  # Alta participación del AI en análisis
         )
+        background_tasks.add_task(_write_trace_in_background, audit_trace)
 
         # Convertir vulnerabilidades a SecurityVulnerability objects
-        vulnerabilities = []
-        for vuln in audit_data.get("vulnerabilities", []):
-            vulnerabilities.append(SecurityVulnerability(
-                severity=vuln.get("severity", "INFO"),
-                vulnerability_type=vuln.get("vulnerability_type", "UNKNOWN"),
-                line_number=vuln.get("line_number"),
-                description=vuln.get("description", ""),
-                recommendation=vuln.get("recommendation", ""),
-                cwe_id=vuln.get("cwe_id"),
-                owasp_category=vuln.get("owasp_category")
-            ))
+        vulnerabilities = _VULNERABILITY_LIST_ADAPTER.validate_python(
+            [{**_VULNERABILITY_DEFAULTS, **vuln} for vuln in audit_data.get("vulnerabilities", [])]
+        )
 
         logger_sprint6.info(
-            f"Security audit completed",
+            "Security audit completed",
             extra={
                 "total_vulnerabilities": audit_data.get("total_vulnerabilities", 0),
                 "critical_count": audit_data.get("critical_count", 0),
@@ -1539,7 +1898,7 @@ async def security_audit(
 
         # Construir response
         response = SecurityAuditResponse(
-            audit_id=f"audit_{session_db.id[:8]}",
+            audit_id=f"audit_{audit_trace.id}",
             total_vulnerabilities=audit_data.get("total_vulnerabilities", 0),
             critical_count=audit_data.get("critical_count", 0),
             high_count=audit_data.get("high_count", 0),
@@ -1551,8 +1910,7 @@ async def security_audit(
             compliant_with_owasp=audit_data.get("owasp_compliant", True)
         )
 
-        return APIResponse(
-            success=True,
+        return _api_response(
             data=response,
             message=f"Security audit completed: {len(vulnerabilities)} vulnerabilities found"
         )
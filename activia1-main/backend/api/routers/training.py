@@ -18,10 +18,12 @@ import json
 import logging
 from pathlib import Path
 import uuid
-import redis
 import os
 import re
 
+import orjson
+from redis.asyncio import ConnectionPool, Redis
+
 from backend.database.config import get_db
 from backend.api.routers.auth_new import get_current_user
 from backend.database.models import UserDB as User, ExerciseAttemptDB
@@ -43,17 +45,35 @@ router = APIRouter(prefix="/training", tags=["Digital Training"])
 # Cargar datos de materias y temas
 TRAINING_DATA_PATH = Path(__file__).parent.parent.parent / "data" / "training"
 
-# Configurar Redis para sesiones
+# Configurar Redis para sesiones: cliente async sobre un pool compartido, así
+# las lecturas/escrituras no bloquean el event loop. La conexión no se prueba
+# al importar: check_redis_connection() corre en el startup de la app y hasta
+# entonces (o si Redis no responde) las sesiones se guardan en memoria.
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-try:
-    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
-    redis_client.ping()
-    logger.info("✅ Redis conectado para sesiones de training")
-    USE_REDIS = True
-except Exception as e:
-    logger.warning(f"⚠️ Redis no disponible, usando memoria: {e}")
-    USE_REDIS = False
-    redis_client = None
+_redis_pool = ConnectionPool.from_url(
+    REDIS_URL,
+    max_connections=int(os.getenv("TRAINING_REDIS_MAX_CONNECTIONS", "50")),
+    decode_responses=True,
+)
+redis_client = Redis(connection_pool=_redis_pool)
+USE_REDIS = False
+
+
+async def check_redis_connection() -> None:
+    """Startup: habilita Redis para las sesiones de training si responde al ping"""
+    global USE_REDIS
+    try:
+        await redis_client.ping()
+        USE_REDIS = True
+        logger.info("✅ Redis conectado para sesiones de training")
+    except Exception as e:
+        USE_REDIS = False
+        logger.warning(f"⚠️ Redis no disponible, usando memoria: {e}")
+
+
+async def close_redis_pool() -> None:
+    """Shutdown: cierra las conexiones del pool de Redis"""
+    await _redis_pool.disconnect()
 
 
 # ============================================================================
@@ -199,22 +219,16 @@ class CorreccionIAResponse(BaseModel):
 # Fallback en memoria si Redis no está disponible
 sesiones_memoria: Dict[str, Dict[str, Any]] = {}
 
-def guardar_sesion(session_id: str, datos: Dict[str, Any]) -> None:
+async def guardar_sesion(session_id: str, datos: Dict[str, Any]) -> None:
     """Guarda una sesión en Redis o memoria"""
-    # Convertir datetime a string para JSON
-    datos_serializables = datos.copy()
-    if 'inicio' in datos_serializables and isinstance(datos_serializables['inicio'], datetime):
-        datos_serializables['inicio'] = datos_serializables['inicio'].isoformat()
-    if 'fin_estimado' in datos_serializables and isinstance(datos_serializables['fin_estimado'], datetime):
-        datos_serializables['fin_estimado'] = datos_serializables['fin_estimado'].isoformat()
-    
     if USE_REDIS and redis_client:
         try:
-            # Guardar en Redis con TTL de 2 horas
-            redis_client.setex(
+            # Guardar en Redis con TTL de 2 horas. orjson serializa los datetime
+            # (naive, hora local) a ISO 8601 igual que isoformat()
+            await redis_client.setex(
                 f"training_session:{session_id}",
                 7200,  # 2 horas
-                json.dumps(datos_serializables)
+                orjson.dumps(datos, option=orjson.OPT_NON_STR_KEYS)
             )
             logger.info(f"✅ Sesión {session_id} guardada en Redis")
         except Exception as e:
@@ -223,13 +237,13 @@ def guardar_sesion(session_id: str, datos: Dict[str, Any]) -> None:
     else:
         sesiones_memoria[session_id] = datos
 
-def obtener_sesion(session_id: str) -> Optional[Dict[str, Any]]:
+async def obtener_sesion(session_id: str) -> Optional[Dict[str, Any]]:
     """Obtiene una sesión de Redis o memoria"""
     if USE_REDIS and redis_client:
         try:
-            datos_json = redis_client.get(f"training_session:{session_id}")
+            datos_json = await redis_client.get(f"training_session:{session_id}")
             if datos_json:
-                datos = json.loads(datos_json)
+                datos = orjson.loads(datos_json)
                 # Convertir strings de datetime de vuelta a datetime
                 if 'inicio' in datos and isinstance(datos['inicio'], str):
                     datos['inicio'] = datetime.fromisoformat(datos['inicio'])
@@ -242,12 +256,15 @@ def obtener_sesion(session_id: str) -> Optional[Dict[str, Any]]:
     
     return sesiones_memoria.get(session_id)
 
-def listar_sesiones_activas() -> List[str]:
+async def listar_sesiones_activas() -> List[str]:
     """Lista los IDs de sesiones activas"""
     if USE_REDIS and redis_client:
         try:
-            keys = redis_client.keys("training_session:*")
-            return [k.replace("training_session:", "") for k in keys]
+            # SCAN incremental en lugar de KEYS (que bloquea el servidor Redis)
+            return [
+                k.replace("training_session:", "")
+                async for k in redis_client.scan_iter(match="training_session:*", count=500)
+            ]
         except:
             pass
     return list(sesiones_memoria.keys())
@@ -603,7 +620,7 @@ async def iniciar_entrenamiento(
         }
 
         # Guardar sesión en Redis o memoria
-        guardar_sesion(session_id, datos_sesion)
+        await guardar_sesion(session_id, datos_sesion)
         logger.info(f"✅ Nueva sesión creada: {session_id} para {request.language} - Unidad {request.unit_number}")
 
         # Construir respuesta con el primer ejercicio
@@ -650,10 +667,10 @@ async def submit_ejercicio(
         # Verificar sesión con logging detallado
         logger.info(f"🔥🔥🔥 Submit ejercicio - Session ID: {request.session_id}")
         print(f"🔥🔥🔥 SUBMIT EJERCICIO LLAMADO - Session: {request.session_id}")
-        sesiones_activas = listar_sesiones_activas()
+        sesiones_activas = await listar_sesiones_activas()
         logger.info(f"Sesiones activas: {sesiones_activas}")
         
-        sesion = obtener_sesion(request.session_id)
+        sesion = await obtener_sesion(request.session_id)
         if not sesion:
             logger.error(f"Sesión {request.session_id} no encontrada. Sesiones disponibles: {len(sesiones_activas)}")
             raise HTTPException(
@@ -690,8 +707,8 @@ async def submit_ejercicio(
         logger.info(f"🧪🧪🧪 Ejecutando tests para ejercicio {index_actual + 1}")
         print(f"🧪🧪🧪 EJECUTANDO TESTS - Ejercicio {index_actual + 1}")
         
-        # Importar execute_python_code del router de exercises
-        from .exercises import execute_python_code
+        # Sandbox del router de exercises (corre en su pool de procesos)
+        from .exercises import run_in_sandbox
         
         # Obtener tests (pueden llamarse 'tests' o 'tests_ocultos')
         tests = ejercicio.get('tests', ejercicio.get('tests_ocultos', []))
@@ -709,7 +726,7 @@ async def submit_ejercicio(
             logger.info(f"Ejecutando test {i}/{tests_total}: input='{test_input}', expected='{expected}'")
             
             # Ejecutar código del estudiante
-            stdout, stderr, exec_time = execute_python_code(
+            stdout, stderr, exec_time = await run_in_sandbox(
                 request.codigo_usuario,
                 str(test_input),
                 timeout_seconds=30
@@ -923,7 +940,7 @@ async def submit_ejercicio(
         sesion['ejercicio_actual_index'] += 1
 
         # Guardar sesión actualizada
-        guardar_sesion(request.session_id, sesion)
+        await guardar_sesion(request.session_id, sesion)
         
         # Verificar si hay más ejercicios
         hay_mas = sesion['ejercicio_actual_index'] < sesion['total_ejercicios']
@@ -1003,7 +1020,7 @@ async def solicitar_pista(
     """
     try:
         # Verificar sesión
-        sesion = obtener_sesion(request.session_id)
+        sesion = await obtener_sesion(request.session_id)
         if not sesion:
             raise HTTPException(
                 status_code=404,
@@ -1042,7 +1059,7 @@ async def solicitar_pista(
         # Solo incrementar si es una pista nueva (no repetida)
         if request.numero_pista >= sesion['pistas_usadas']:
             sesion['pistas_usadas'] = request.numero_pista + 1
-            guardar_sesion(request.session_id, sesion)
+            await guardar_sesion(request.session_id, sesion)
             logger.info(f"💡 Pista {request.numero_pista + 1} solicitada. Total usadas: {sesion['pistas_usadas']}")
 
         pista = ejercicio['pistas'][request.numero_pista]
@@ -1077,7 +1094,7 @@ async def corregir_con_ia(
     """
     try:
         # Verificar sesión
-        sesion = obtener_sesion(request.session_id)
+        sesion = await obtener_sesion(request.session_id)
         if not sesion:
             raise HTTPException(
                 status_code=404,
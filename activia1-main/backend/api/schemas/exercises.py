@@ -173,6 +173,22 @@ class ExerciseResponse(BaseModel):
     max_score: float
     time_limit_seconds: int
 
+    class Config:
+        from_attributes = True
+
+
+class ExerciseListResponse(BaseModel):
+    """Item de listado del sistema legacy (sin starter_code ni hints)"""
+    id: str
+    title: str
+    description: str
+    difficulty_level: int
+    max_score: float
+    time_limit_seconds: int
+
+    class Config:
+        from_attributes = True
+
 
 class CodeSubmission(BaseModel):
     """Submission del sistema legacy"""
@@ -188,7 +204,7 @@ class SubmissionResult(BaseModel):
     is_correct: bool
     execution_time_ms: int
     ai_score: Optional[float]
-    ai_feedback: Optional[str]
+    ai_feedback: Optional[Dict[str, Any]]  # Evaluación completa de la IA
     code_quality_score: Optional[float]
     readability_score: Optional[float]
     efficiency_score: Optional[float]
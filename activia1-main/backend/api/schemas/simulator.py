@@ -82,6 +82,8 @@ class SimulatorInfoResponse(BaseModel):
     example_questions: Optional[List[str]] = Field(default=None, description="Preguntas ejemplo que hace el simulador")
 
     model_config = {
+        # Catálogo estático compartido entre requests (ver routers/simulators.py)
+        "frozen": True,
         "json_schema_extra": {
             "examples": [{
                 "type": "product_owner",
@@ -10,7 +10,7 @@ Provides request/response models for:
 """
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 
 from .common import validate_uuid_format
 
@@ -66,7 +66,7 @@ class InterviewResponseRequest(BaseModel):
     """Student's response to an interview question"""
 
     interview_id: str = Field(..., description="Interview session ID")
-    response: str = Field(..., min_length=10, description="Student's answer")
+    response: str = Field(..., min_length=10, max_length=5000, description="Student's answer")
 
 
 class InterviewEvaluation(BaseModel):
@@ -140,27 +140,28 @@ class DiagnosisStepRequest(BaseModel):
     """Student's diagnosis step"""
 
     incident_id: str = Field(..., description="Incident simulation ID")
-    action: str = Field(..., min_length=10, description="Action taken")
-    finding: Optional[str] = Field(None, description="Finding from this action")
+    action: str = Field(..., min_length=10, max_length=2000, description="Action taken")
+    finding: Optional[str] = Field(None, max_length=2000, description="Finding from this action")
 
 
 class IncidentSolutionRequest(BaseModel):
     """Student's proposed solution for the incident"""
 
     incident_id: str = Field(..., description="Incident simulation ID")
-    solution_proposed: str = Field(..., min_length=50, description="Proposed solution")
+    solution_proposed: str = Field(..., min_length=50, max_length=5000, description="Proposed solution")
     root_cause_identified: str = Field(
-        ..., min_length=20, description="Identified root cause"
+        ..., min_length=20, max_length=2000, description="Identified root cause"
     )
     post_mortem: str = Field(
-        ..., min_length=100, description="Post-mortem documentation"
+        ..., min_length=100, max_length=10000, description="Post-mortem documentation"
     )
 
 
 class IncidentResponse(BaseModel):
     """Response with incident details"""
 
-    incident_id: str
+    # ORM rows expose the primary key as "id"
+    incident_id: str = Field(..., validation_alias=AliasChoices("id", "incident_id"))
     session_id: str
     student_id: str
     incident_type: str
@@ -178,6 +179,9 @@ class IncidentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    class Config:
+        from_attributes = True
+
 
 # ============================================================================
 # SCRUM MASTER SIMULATOR (SM-IA) - HU-EST-010
@@ -190,9 +194,9 @@ class DailyStandupRequest(BaseModel):
     session_id: str = Field(..., description="AI-Native session ID")
     student_id: str = Field(..., description="Student ID")
     activity_id: Optional[str] = Field(None, description="Sprint activity ID")
-    what_did_yesterday: str = Field(..., min_length=10, description="Yesterday's work")
-    what_will_do_today: str = Field(..., min_length=10, description="Today's plan")
-    impediments: Optional[str] = Field(None, description="Any impediments")
+    what_did_yesterday: str = Field(..., min_length=10, max_length=2000, description="Yesterday's work")
+    what_will_do_today: str = Field(..., min_length=10, max_length=2000, description="Today's plan")
+    impediments: Optional[str] = Field(None, max_length=2000, description="Any impediments")
 
 
 class DailyStandupResponse(BaseModel):
@@ -228,7 +232,7 @@ class ClientClarificationRequest(BaseModel):
     """Student's clarification question to client"""
 
     session_id: str = Field(..., description="Session ID")
-    question: str = Field(..., min_length=10, description="Clarification question")
+    question: str = Field(..., min_length=10, max_length=2000, description="Clarification question")
 
 
 class ClientResponse(BaseModel):
@@ -254,7 +258,7 @@ class SecurityAuditRequest(BaseModel):
     session_id: str = Field(..., description="AI-Native session ID")
     student_id: str = Field(..., description="Student ID")
     activity_id: Optional[str] = Field(None, description="Activity ID")
-    code: str = Field(..., min_length=50, description="Code to audit")
+    code: str = Field(..., min_length=50, max_length=64_000, description="Code to audit")
     language: str = Field(
         "python", description="Programming language: python, javascript, java, etc."
     )
@@ -279,7 +283,7 @@ class SecurityVulnerability(BaseModel):
 class SecurityAuditResponse(BaseModel):
     """Security audit results"""
 
-    audit_id: str = Field(..., description="Audit session ID")
+    audit_id: str = Field(..., description="Audit ID (audit_ + id of the persisted trace)")
     total_vulnerabilities: int = Field(..., description="Total found")
     critical_count: int = Field(default=0)
     high_count: int = Field(default=0)
@@ -138,6 +138,16 @@ class LRUCache:
 
             self.cache[key] = value
 
+    def delete(self, key: str) -> bool:
+        """
+        Elimina una entrada del cache. Thread-safe.
+
+        Returns:
+            True si la clave existía
+        """
+        with self._lock:
+            return self.cache.pop(key, None) is not None
+
     def clear(self) -> None:
         """Limpia todo el cache. Thread-safe."""
         with self._lock:
@@ -5,6 +5,13 @@ Centraliza todos los números mágicos y configuraciones hardcodeadas
 para facilitar mantenimiento y prevenir errores.
 """
 
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+
 # =============================================================================
 # Cache Configuration
 # =============================================================================
@@ -167,8 +174,6 @@ GOVERNANCE_BLOCK_CONSECUTIVE_DELEGATIONS = 5
 # Datetime Utilities
 # =============================================================================
 
-from datetime import datetime, timezone
-
 
 def utc_now() -> datetime:
     """
@@ -187,6 +192,57 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# =============================================================================
+# ID Utilities
+# =============================================================================
+
+# Estado del contador monotónico de uuid7() (RFC 9562, sección 6.2, método 1)
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> str:
+    """
+    Genera un UUID versión 7 (RFC 9562) como string.
+
+    Los primeros 48 bits son el timestamp Unix en milisegundos, así los IDs
+    generados en la aplicación quedan ordenados por tiempo y los INSERT caen
+    al final del índice de la PK (a diferencia de uuid4, que es aleatorio).
+
+    Los 12 bits siguientes (rand_a) son un contador que se incrementa dentro
+    del mismo milisegundo: dos IDs generados en el proceso son siempre
+    crecientes, aunque coincida el timestamp o el reloj retroceda.
+
+    Returns:
+        str: UUID en formato canónico (36 caracteres)
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        unix_ms = time.time_ns() // 1_000_000
+        if unix_ms > _uuid7_last_ms:
+            _uuid7_last_ms = unix_ms
+            # Semilla aleatoria con el bit alto en 0: deja margen para incrementar
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        elif _uuid7_counter < 0xFFF:
+            _uuid7_counter += 1
+        else:
+            # Contador agotado: se adelanta el timestamp un milisegundo
+            _uuid7_last_ms += 1
+            _uuid7_counter = 0
+        unix_ms, counter = _uuid7_last_ms, _uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (
+        (unix_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76  # versión 7
+        | counter << 64
+        | 0x2 << 62  # variante RFC 4122
+        | rand_b
+    )
+    return str(uuid.UUID(int=value))
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -298,6 +298,42 @@ class RedisCache:
             logger.error(f"Unexpected error in cache SET: {e}")
             return False
 
+    def delete(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
+    ) -> bool:
+        """
+        Elimina una entrada del caché (misma clave que get/set).
+
+        Args:
+            prompt: Prompt del usuario
+            context: Contexto adicional
+            mode: Modo del agente
+
+        Returns:
+            True si la entrada existía y se eliminó
+        """
+        if not self.enabled:
+            return False
+
+        cache_key = self._generate_cache_key(prompt, context, mode)
+
+        try:
+            if self._using_redis and self._redis_client:
+                try:
+                    return self._redis_client.delete(cache_key) > 0
+                except (RedisConnectionError, RedisError) as e:
+                    logger.error(f"Redis error during DELETE: {e}")
+                    return self._fallback_cache.delete(cache_key)
+            else:
+                return self._fallback_cache.delete(cache_key)
+
+        except Exception as e:
+            logger.error(f"Unexpected error in cache DELETE: {e}")
+            return False
+
     def clear(self) -> bool:
         """
         Limpia todo el caché.
@@ -15,11 +15,56 @@ Uso:
     all_exercises = loader.get_all()
 """
 
+import ast
 import json
 from pathlib import Path
+from types import CodeType
 from typing import List, Dict, Optional, Any
 
 
+# Nodos permitidos en las expresiones `expected` de los tests ocultos
+# (ej: "len(activos) == 2 and pedido.calcular_total() > 0")
+_EXPECTED_ALLOWED_NODES = (
+    ast.Expression, ast.Compare, ast.BoolOp, ast.UnaryOp, ast.BinOp,
+    ast.Constant, ast.Name, ast.Load, ast.Call, ast.Attribute, ast.Subscript,
+    ast.Tuple, ast.List,
+    ast.cmpop, ast.boolop, ast.unaryop, ast.operator,
+)
+# El nodo raíz tiene que producir un booleano (comparación / and / or / not)
+_EXPECTED_ROOT_NODES = (ast.Compare, ast.BoolOp)
+
+
+def _is_boolean_root(node: ast.expr) -> bool:
+    """Raíz booleana: comparación, and/or o `not` (un '-1' es salida esperada)."""
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, ast.Not)
+    return isinstance(node, _EXPECTED_ROOT_NODES)
+
+
+def _compile_expected_expression(expected: Any, exercise_id: str) -> Optional[CodeType]:
+    """
+    Compila `expected` si es una expresión de test válida; si no, None.
+    
+    Se valida el AST contra una lista blanca de nodos y se rechaza el
+    acceso a nombres/atributos dunder (ej: `x.__class__`).
+    """
+    if not isinstance(expected, str) or not expected:
+        return None
+    try:
+        tree = ast.parse(expected, mode='eval')
+    except SyntaxError:
+        return None
+    if not _is_boolean_root(tree.body):
+        return None
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPECTED_ALLOWED_NODES):
+            return None
+        name = node.id if isinstance(node, ast.Name) else getattr(node, 'attr', '')
+        if name.startswith('__'):
+            return None
+    return compile(tree, f"<expected:{exercise_id}>", 'eval')
+
+
 class ExerciseLoader:
     """Carga y gestiona ejercicios desde archivos JSON."""
     
@@ -38,6 +83,9 @@ class ExerciseLoader:
         """Inicializa el loader."""
         self._cache: Dict[str, Any] = {}
         self._load_all_exercises()
+        self._prepare_hidden_tests()
+        self._build_search_index()
+        self._stats = self._compute_stats()
     
     def _load_all_exercises(self) -> None:
         """Carga todos los ejercicios en el caché."""
@@ -49,6 +97,55 @@ class ExerciseLoader:
                     for exercise in exercises:
                         self._cache[exercise['id']] = exercise
     
+    def _prepare_hidden_tests(self) -> None:
+        """
+        Precalcula campos derivados de cada test oculto, para no repetir el
+        trabajo en cada submission:
+        - `_input_str`: input serializado (json.dumps si es dict/list)
+        - `_kind`: "expr" si expected es una expresión Python a evaluar sobre
+          el código del estudiante (ej: "total == 42600"), "stdout" si es un
+          output a comparar con la ejecución en sandbox
+        - `_expected_code`: la expresión ya validada y compilada (solo "expr")
+        """
+        for exercise in self._cache.values():
+            for test in exercise.get('hidden_tests', []):
+                # Adaptarse a la estructura real de los JSON (input/input_data)
+                test_input = test.get('input', test.get('input_data', ''))
+                if isinstance(test_input, (dict, list)):
+                    test_input = json.dumps(test_input)
+                test['_input_str'] = str(test_input)
+                
+                # Soportar tanto 'expected_output' (legacy) como 'expected' (nuevo)
+                expected = test.get('expected_output') or test.get('expected', '')
+                expected_code = _compile_expected_expression(expected, exercise['id'])
+                test['_expected_code'] = expected_code
+                test['_kind'] = "expr" if expected_code is not None else "stdout"
+    
+    def _build_search_index(self) -> None:
+        """
+        Precalcula columnas normalizadas (Structure of Arrays) para search().
+        
+        Los ejercicios son estáticos en runtime, así que la normalización
+        (minúsculas, prefijo de unidad, defaults) se hace una sola vez aquí
+        en lugar de en cada request.
+        """
+        self._exercises: List[Dict[str, Any]] = list(self._cache.values())
+        self._difficulties_lower: List[str] = []
+        self._tags_lower: List[frozenset] = []
+        self._unit_prefixes: List[str] = []
+        self._languages: List[str] = []
+        self._editor_languages: List[Optional[str]] = []
+        self._frameworks: List[Optional[str]] = []
+        
+        for ex in self._exercises:
+            meta = ex['meta']
+            self._difficulties_lower.append(meta['difficulty'].lower())
+            self._tags_lower.append(frozenset(tag.lower() for tag in meta['tags']))
+            self._unit_prefixes.append(ex['id'].split('-')[0])  # "U1-VAR-01" -> "U1"
+            self._languages.append(meta.get('language', 'python'))
+            self._editor_languages.append(ex.get('ui_config', {}).get('editor_language'))
+            self._frameworks.append(meta.get('framework'))
+    
     def get_by_id(self, exercise_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un ejercicio por su ID.
@@ -128,8 +225,8 @@ class ExerciseLoader:
         Búsqueda avanzada de ejercicios.
         
         Args:
-            difficulty: Filtrar por dificultad ("Easy", "Medium", "Hard")
-            tags: Lista de tags (OR logic)
+            difficulty: Filtrar por dificultad ("Easy", "Medium", "Hard"; sin distinguir mayúsculas)
+            tags: Lista de tags (OR logic, sin distinguir mayúsculas)
             unit: Filtrar por unidad (1-7)
             language: Filtrar por lenguaje ("python", "java")
             framework: Filtrar por framework ("spring-boot")
@@ -137,47 +234,38 @@ class ExerciseLoader:
         Returns:
             Lista de ejercicios que cumplen los criterios
         """
-        results = self.get_all()
-        
-        if difficulty:
-            results = [ex for ex in results if ex['meta']['difficulty'] == difficulty]
-        
-        if tags:
-            results = [
-                ex for ex in results
-                if any(tag in ex['meta']['tags'] for tag in tags)
-            ]
-        
-        if unit:
-            results = [ex for ex in results if ex['id'].startswith(f"U{unit}-")]
-        
-        if language:
-            results = [
-                ex for ex in results
-                if ex['meta'].get('language', 'python') == language
-            ]
+        # Normalizar los criterios una sola vez y filtrar en una única pasada
+        # sobre las columnas precalculadas en _build_search_index()
+        difficulty_l = difficulty.lower() if difficulty else None
+        tags_l = {tag.lower() for tag in tags} if tags else None
+        unit_prefix = f"U{unit}" if unit else None
         
-        if framework:
-            results = [
-                ex for ex in results
-                if ex['meta'].get('framework') == framework
-            ]
-        
-        if language:
-            results = [
-                ex for ex in results
-                if ex['ui_config']['editor_language'] == language
-            ]
-        
-        return results
+        return [
+            self._exercises[i] for i in range(len(self._exercises))
+            if (difficulty_l is None or self._difficulties_lower[i] == difficulty_l)
+            and (tags_l is None or not tags_l.isdisjoint(self._tags_lower[i]))
+            and (unit_prefix is None or self._unit_prefixes[i] == unit_prefix)
+            and (not language or (
+                self._languages[i] == language
+                and self._editor_languages[i] == language
+            ))
+            and (not framework or self._frameworks[i] == framework)
+        ]
     
     def get_stats(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas de los ejercicios.
         
+        Se calculan una sola vez al cargar (los ejercicios son estáticos en
+        runtime); el diccionario devuelto es compartido y no debe modificarse.
+        
         Returns:
             Diccionario con estadísticas
         """
+        return self._stats
+    
+    def _compute_stats(self) -> Dict[str, Any]:
+        """Calcula las estadísticas que devuelve get_stats()."""
         exercises = self.get_all()
         
         difficulty_counts = {
@@ -0,0 +1,131 @@
+"""
+Migración de Base de Datos: Optimizaciones de user_exercise_submissions
+
+Ejecutar con: python -m backend.database.migrations.add_exercise_submissions_fixes
+
+DATABASE CHANGES (require migration):
+- ai_feedback pasa de TEXT a JSON: se guarda la evaluación completa de la IA
+  como dict en lugar de un string serializado con json.dumps
+- Índice compuesto (user_id, submitted_at DESC) para el historial de envíos
+
+Cada sentencia DDL corre en su propio SAVEPOINT: en PostgreSQL un error
+aborta la transacción completa, y sin el savepoint las sentencias
+siguientes también fallarían.
+
+NOTA SQLite: el tipo JSON de SQLAlchemy se almacena como TEXT, y las filas
+existentes ya contienen JSON válido (json.dumps del feedback), por lo que no
+requiere cambios.
+"""
+import sys
+from sqlalchemy import text
+from backend.database import init_database, get_db_config
+
+
+def migrate_exercise_submissions_fixes():
+    """
+    Aplica las optimizaciones sobre user_exercise_submissions:
+    - Convierte ai_feedback a JSON (PostgreSQL)
+    - Crea el índice idx_submission_user_submitted
+    """
+    print("=" * 80)
+    print("Migración: Optimizaciones de user_exercise_submissions")
+    print("=" * 80)
+
+    # Inicializar base de datos
+    init_database()
+
+    # Obtener sesión usando la factory
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        # Detectar el tipo de base de datos
+        db_url = str(db.bind.url)
+        is_postgres = 'postgresql' in db_url
+
+        print(f"\nBase de datos detectada: {'PostgreSQL' if is_postgres else 'SQLite'}")
+
+        # ======================================================================
+        # ai_feedback: TEXT -> JSON
+        # ======================================================================
+
+        print("\n" + "=" * 60)
+        print("Convertir ai_feedback a JSON")
+        print("=" * 60)
+
+        if is_postgres:
+            result = db.execute(text("""
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = 'user_exercise_submissions' AND column_name = 'ai_feedback'
+            """))
+            row = result.fetchone()
+
+            if row is None:
+                print("  ⏭ Tabla user_exercise_submissions no existe (se crea con el ORM)")
+            elif row[0] == 'json':
+                print("  ⏭ Columna ai_feedback ya es JSON")
+            else:
+                try:
+                    with db.begin_nested():
+                        db.execute(text("""
+                            ALTER TABLE user_exercise_submissions
+                            ALTER COLUMN ai_feedback TYPE JSON USING ai_feedback::json
+                        """))
+                    print("  ✓ Columna ai_feedback convertida a JSON")
+                except Exception as e:
+                    print(f"  ⚠ Error convirtiendo columna: {e}")
+        else:
+            print("  ⏭ SQLite almacena JSON como TEXT, no requiere cambios")
+
+        # ======================================================================
+        # Índice compuesto para get_user_submissions
+        # ======================================================================
+
+        print("\n" + "=" * 60)
+        print("Índice (user_id, submitted_at DESC)")
+        print("=" * 60)
+
+        print("\n[INDEX] idx_submission_user_submitted en user_exercise_submissions...")
+        try:
+            with db.begin_nested():
+                db.execute(text("""
+                    CREATE INDEX IF NOT EXISTS idx_submission_user_submitted
+                    ON user_exercise_submissions (user_id, submitted_at DESC)
+                """))
+            print("  ✓ idx_submission_user_submitted creado")
+        except Exception as e:
+            if "does not exist" in str(e).lower() or "no such table" in str(e).lower():
+                print("  ⏭ Tabla user_exercise_submissions no existe (se crea con el ORM)")
+            else:
+                print(f"  ⚠ Error: {e}")
+
+        # ======================================================================
+        # Commit
+        # ======================================================================
+
+        print("\n" + "=" * 60)
+        print("APLICANDO CAMBIOS")
+        print("=" * 60)
+
+        db.commit()
+        print("\n✓ Cambios aplicados exitosamente")
+
+        print("\n" + "=" * 80)
+        print("✓ Migración de user_exercise_submissions completada exitosamente")
+        print("=" * 80)
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n✗ Error durante la migración: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        migrate_exercise_submissions_fixes()
+        sys.exit(0)
+    except Exception:
+        sys.exit(1)
@@ -0,0 +1,119 @@
+"""
+Migración de Base de Datos: Última pregunta de la entrevista (IT-IA)
+
+Ejecutar con: python -m backend.database.migrations.add_interview_last_question
+
+DATABASE CHANGES (require migration):
+- interview_sessions.last_question: copia de questions_asked[-1], escrita
+  junto con cada append. POST /simulators/interview/respond lee solo esta
+  columna (y el largo del array) en lugar de todo el historial
+- Backfill de last_question para las entrevistas existentes
+"""
+import sys
+from sqlalchemy import text
+from backend.database import init_database, get_db_config
+
+
+def migrate_interview_last_question():
+    """
+    Agrega interview_sessions.last_question y la completa con la última
+    pregunta de questions_asked
+    """
+    print("=" * 80)
+    print("Migración: Última pregunta de la entrevista (IT-IA)")
+    print("=" * 80)
+
+    # Inicializar base de datos
+    init_database()
+
+    # Obtener sesión usando la factory
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        # Detectar el tipo de base de datos
+        db_url = str(db.bind.url)
+        is_postgres = 'postgresql' in db_url
+
+        print(f"\nBase de datos detectada: {'PostgreSQL' if is_postgres else 'SQLite'}")
+
+        # ======================================================================
+        # Columna last_question
+        # ======================================================================
+
+        print("\n[1/2] interview_sessions.last_question...")
+        if is_postgres:
+            db.execute(text("""
+                ALTER TABLE interview_sessions
+                ADD COLUMN IF NOT EXISTS last_question JSON
+            """))
+            print("  ✓ last_question agregada")
+        else:
+            # SQLite no soporta ADD COLUMN IF NOT EXISTS
+            try:
+                db.execute(text("""
+                    ALTER TABLE interview_sessions
+                    ADD COLUMN last_question JSON
+                """))
+                print("  ✓ last_question agregada")
+            except Exception as e:
+                if 'duplicate column' in str(e).lower():
+                    print("  ⏭ last_question ya existe, saltando...")
+                else:
+                    raise
+
+        # ======================================================================
+        # Backfill
+        # ======================================================================
+
+        print("\n[2/2] Backfill de last_question...")
+        if is_postgres:
+            result = db.execute(text("""
+                UPDATE interview_sessions
+                SET last_question = questions_asked -> (json_array_length(questions_asked) - 1)
+                WHERE last_question IS NULL
+                  AND questions_asked IS NOT NULL
+                  AND json_array_length(questions_asked) > 0
+            """))
+        else:
+            result = db.execute(text("""
+                UPDATE interview_sessions
+                SET last_question = json_extract(
+                    questions_asked, '$[' || (json_array_length(questions_asked) - 1) || ']'
+                )
+                WHERE last_question IS NULL
+                  AND questions_asked IS NOT NULL
+                  AND json_array_length(questions_asked) > 0
+            """))
+        print(f"  ✓ {result.rowcount} entrevistas actualizadas")
+
+        # ======================================================================
+        # Commit
+        # ======================================================================
+
+        print("\n" + "=" * 60)
+        print("APLICANDO CAMBIOS")
+        print("=" * 60)
+
+        db.commit()
+        print("\n✓ Cambios aplicados exitosamente")
+
+        print("\n" + "=" * 80)
+        print("✓ Migración de last_question completada exitosamente")
+        print("=" * 80)
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n✗ Error durante la migración: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        migrate_interview_last_question()
+        sys.exit(0)
+    except Exception:
+        sys.exit(1)
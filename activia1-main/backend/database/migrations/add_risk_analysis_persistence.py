@@ -0,0 +1,95 @@
+"""
+Migración de Base de Datos: Persistencia del análisis de riesgos 5D
+
+Ejecutar con: python -m backend.database.migrations.add_risk_analysis_persistence
+
+DATABASE CHANGES (require migration):
+- sessions.risk_analysis_fingerprint: "<id última traza>:<total de trazas>"
+  con el que se calculó el último análisis 5D
+- sessions.risk_analysis_json: el análisis ya serializado, devuelto tal cual
+  mientras el fingerprint siga vigente (evita volver a llamar al LLM)
+"""
+import sys
+from sqlalchemy import text
+from backend.database import init_database, get_db_config
+
+
+def migrate_risk_analysis_persistence():
+    """
+    Agrega a sessions las columnas del análisis 5D persistido
+    """
+    print("=" * 80)
+    print("Migración: Persistencia del análisis de riesgos 5D")
+    print("=" * 80)
+
+    # Inicializar base de datos
+    init_database()
+
+    # Obtener sesión usando la factory
+    db_config = get_db_config()
+    session_factory = db_config.get_session_factory()
+    db = session_factory()
+
+    try:
+        # Detectar el tipo de base de datos
+        db_url = str(db.bind.url)
+        is_postgres = 'postgresql' in db_url
+
+        print(f"\nBase de datos detectada: {'PostgreSQL' if is_postgres else 'SQLite'}")
+
+        columns = [
+            ("risk_analysis_fingerprint", "VARCHAR(100)"),
+            ("risk_analysis_json", "TEXT"),
+        ]
+
+        for index, (column, column_type) in enumerate(columns, 1):
+            print(f"\n[{index}/{len(columns)}] sessions.{column}...")
+            if is_postgres:
+                db.execute(text(f"""
+                    ALTER TABLE sessions
+                    ADD COLUMN IF NOT EXISTS {column} {column_type}
+                """))
+                print(f"  ✓ {column} agregada")
+            else:
+                # SQLite no soporta ADD COLUMN IF NOT EXISTS
+                try:
+                    db.execute(text(f"""
+                        ALTER TABLE sessions
+                        ADD COLUMN {column} {column_type}
+                    """))
+                    print(f"  ✓ {column} agregada")
+                except Exception as e:
+                    if 'duplicate column' in str(e).lower():
+                        print(f"  ⏭ {column} ya existe, saltando...")
+                    else:
+                        raise
+
+        # ======================================================================
+        # Commit
+        # ======================================================================
+
+        print("\n" + "=" * 60)
+        print("APLICANDO CAMBIOS")
+        print("=" * 60)
+
+        db.commit()
+        print("\n✓ Cambios aplicados exitosamente")
+
+        print("\n" + "=" * 80)
+        print("✓ Migración de persistencia del análisis 5D completada exitosamente")
+        print("=" * 80)
+
+    except Exception as e:
+        db.rollback()
+        print(f"\n✗ Error durante la migración: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        migrate_risk_analysis_persistence()
+        sys.exit(0)
+    except Exception:
+        sys.exit(1)
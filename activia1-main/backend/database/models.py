@@ -12,7 +12,7 @@ from typing import Optional
 
 from sqlalchemy import Column, String, Text, Float, Integer, Boolean, ForeignKey, JSON, DateTime, Index, CheckConstraint, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.types import TypeDecorator
 
@@ -123,6 +123,12 @@ class SessionDB(Base, BaseModel):
     #   "competencies_demonstrated": ["abstraccion", "debugging"]
     # }
 
+    # Último análisis de riesgos 5D (GET /risk-analysis/{id}), ya serializado.
+    # Es válido mientras el fingerprint "<id última traza>:<total de trazas>"
+    # coincida. Diferido: solo se carga cuando el fingerprint coincide.
+    risk_analysis_fingerprint = Column(String(100), nullable=True)
+    risk_analysis_json = deferred(Column(Text, nullable=True))
+
     # Relationships
     user = relationship("UserDB", back_populates="sessions")  # NEW
     traces = relationship(
@@ -1144,6 +1150,10 @@ class InterviewSessionDB(Base, BaseModel):
     #   "timestamp": "2025-11-21T10:30:00Z"
     # }
 
+    # Copia de questions_asked[-1], escrita junto con cada append: el turno
+    # siguiente lee solo esta columna en lugar de todo el historial
+    last_question = Column(JSON, nullable=True)
+
     responses = Column(JSON, default=list)
     # List of:
     # {
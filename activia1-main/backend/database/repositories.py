@@ -37,10 +37,10 @@ from uuid import uuid4
 from enum import Enum
 
 from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import desc, select
+from sqlalchemy import desc, func, select, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from backend.core.constants import utc_now
+from backend.core.constants import utc_now, uuid7
 
 from .models import (
     SessionDB,
@@ -76,7 +76,7 @@ from ..models.trace import CognitiveTrace, TraceSequence, CognitiveState, TraceL
 from ..models.risk import Risk, RiskReport, RiskType, RiskLevel
 from ..models.evaluation import EvaluationReport, CompetencyLevel
 import logging
-from datetime import datetime  # FIX cortez14 DEFECTO 1.1
+from datetime import datetime, timezone  # FIX cortez14 DEFECTO 1.1
 
 logger = logging.getLogger(__name__)
 
@@ -126,6 +126,18 @@ def _safe_cognitive_state_to_str(cognitive_state: Optional[CognitiveState]) -> O
     )
 
 
+def _minutes_between(start: datetime, end: datetime) -> int:
+    """
+    Minutos completos entre dos timestamps. Las columnas DateTime sin zona
+    vuelven naive desde la DB: se interpretan como UTC.
+    """
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return max(0, int((end - start).total_seconds() // 60))
+
+
 def _safe_enum_to_str(value: Any, enum_class: Type[Enum]) -> Optional[str]:
     """
     Convierte un valor a string de forma defensiva con validación de enum.
@@ -748,6 +760,40 @@ class SessionRepository:
             self.db.rollback()
             raise
 
+    def save_risk_analysis(
+        self, session_id: str, fingerprint: str, analysis_json: str
+    ) -> bool:
+        """
+        Persist the latest 5D risk analysis of a session.
+
+        The analysis is stored already serialized so reads can return it
+        as-is. updated_at is not touched: the session itself did not change.
+
+        Args:
+            session_id: Session ID
+            fingerprint: "<last trace id>:<trace count>" the analysis was computed for
+            analysis_json: Serialized analysis
+
+        Returns:
+            True if the session exists and was updated
+        """
+        try:
+            result = self.db.execute(
+                update(SessionDB)
+                .where(SessionDB.id == session_id)
+                .values(
+                    risk_analysis_fingerprint=fingerprint,
+                    risk_analysis_json=analysis_json,
+                    # Explicit value so the column's onupdate does not fire
+                    updated_at=SessionDB.updated_at,
+                )
+            )
+            self.db.commit()
+            return result.rowcount > 0
+        except Exception:
+            self.db.rollback()
+            raise
+
 
 class TraceRepository:
     """Repository for cognitive trace operations"""
@@ -761,9 +807,29 @@ class TraceRepository:
 
         ✅ FIX: Removed commit/rollback - let transaction context manager handle it
         """
+        db_trace = self._to_db(trace)
+        self.db.add(db_trace)
+        self.db.flush()  # Flush to get the ID without committing
+        return db_trace
+
+    def create_many(self, traces: List[CognitiveTrace]) -> List[CognitiveTraceDB]:
+        """
+        Create several cognitive traces with a single flush.
+
+        IDs are assigned client-side, so SQLAlchemy emits one multi-row INSERT
+        instead of one round-trip per trace. Returns the rows in input order.
+        """
+        db_traces = [self._to_db(trace) for trace in traces]
+        self.db.add_all(db_traces)
+        self.db.flush()
+        return db_traces
+
+    @staticmethod
+    def _to_db(trace: CognitiveTrace) -> CognitiveTraceDB:
+        """Map a CognitiveTrace model to a CognitiveTraceDB row"""
         # ✅ FIXED (2025-11-22): Conversión defensiva de enums (C5)
-        db_trace = CognitiveTraceDB(
-            id=trace.id or str(uuid4()),
+        return CognitiveTraceDB(
+            id=trace.id or uuid7(),
             session_id=trace.session_id,
             student_id=trace.student_id,
             activity_id=trace.activity_id,
@@ -781,9 +847,6 @@ class TraceRepository:
             parent_trace_id=trace.parent_trace_id,
             agent_id=trace.agent_id,
         )
-        self.db.add(db_trace)
-        self.db.flush()  # Flush to get the ID without committing
-        return db_trace
 
     def get_by_id(self, trace_id: str) -> Optional[CognitiveTraceDB]:
         """Get trace by ID"""
@@ -826,6 +889,21 @@ class TraceRepository:
             .first()
         )
 
+    def get_recent_by_session(self, session_id: str, limit: int = 10) -> List[CognitiveTraceDB]:
+        """
+        Get the last `limit` traces of a session, in chronological order.
+        Uses ORDER BY DESC + LIMIT instead of loading the whole session.
+        """
+        traces = (
+            self.db.query(CognitiveTraceDB)
+            .filter(CognitiveTraceDB.session_id == session_id)
+            .order_by(desc(CognitiveTraceDB.created_at))
+            .limit(limit)
+            .all()
+        )
+        traces.reverse()
+        return traces
+
     def get_by_session_filtered(
         self,
         session_id: str,
@@ -3217,6 +3295,7 @@ class InterviewSessionRepository:
             interview_type=interview_type,
             difficulty_level=difficulty_level,
             questions_asked=questions_asked or [],
+            last_question=questions_asked[-1] if questions_asked else None,
             responses=[],
         )
         self.db.add(interview)
@@ -3242,6 +3321,7 @@ class InterviewSessionRepository:
             return None
 
         interview.questions_asked = interview.questions_asked + [question]
+        interview.last_question = question
         interview.updated_at = utc_now()
         self.db.commit()
         self.db.refresh(interview)
@@ -3261,6 +3341,38 @@ class InterviewSessionRepository:
         self.db.refresh(interview)
         return interview
 
+    def append_turn(
+        self, interview_id: str, response: dict, question: Optional[dict] = None
+    ) -> Optional[InterviewSessionDB]:
+        """
+        Append a student response and, optionally, the next question in one
+        transaction (instead of add_response + add_question, two commits).
+
+        Uses SELECT FOR UPDATE so two turns posted at the same time cannot
+        overwrite each other's JSON arrays (lost update).
+        """
+        try:
+            stmt = (
+                select(InterviewSessionDB)
+                .where(InterviewSessionDB.id == interview_id)
+                .with_for_update()
+            )
+            interview = self.db.execute(stmt).scalar_one_or_none()
+            if not interview:
+                return None
+
+            interview.responses = interview.responses + [response]
+            if question is not None:
+                interview.questions_asked = interview.questions_asked + [question]
+                interview.last_question = question
+            interview.updated_at = utc_now()
+            self.db.commit()
+            self.db.refresh(interview)
+            return interview
+        except Exception:
+            self.db.rollback()
+            raise
+
     def complete_interview(
         self,
         interview_id: str,
@@ -3291,6 +3403,24 @@ class InterviewSessionRepository:
         )
         return interview
 
+    def get_turn_state(self, interview_id: str):
+        """
+        Narrow read for submitting a turn: the last question and the question
+        count, without loading the questions_asked/responses JSON history.
+
+        Returns a Row (id, interview_type, difficulty_level, last_question,
+        question_count, updated_at) or None.
+        """
+        stmt = select(
+            InterviewSessionDB.id,
+            InterviewSessionDB.interview_type,
+            InterviewSessionDB.difficulty_level,
+            InterviewSessionDB.last_question,
+            func.coalesce(func.json_array_length(InterviewSessionDB.questions_asked), 0).label("question_count"),
+            InterviewSessionDB.updated_at,
+        ).where(InterviewSessionDB.id == interview_id)
+        return self.db.execute(stmt).first()
+
     def get_by_id(self, interview_id: str) -> Optional[InterviewSessionDB]:
         """Get interview by ID"""
         return (
@@ -3400,39 +3530,70 @@ class IncidentSimulationRepository:
     def add_diagnosis_step(
         self, incident_id: str, diagnosis_step: dict
     ) -> Optional[IncidentSimulationDB]:
-        """Add a diagnosis step to the incident"""
-        incident = self.get_by_id(incident_id)
-        if not incident:
-            return None
+        """
+        Add a diagnosis step to the incident.
 
-        incident.diagnosis_process = incident.diagnosis_process + [diagnosis_step]
-        incident.updated_at = utc_now()
-        self.db.commit()
-        self.db.refresh(incident)
-        return incident
+        Callers don't need to fetch the incident first: a missing incident
+        returns None. Uses SELECT FOR UPDATE so two steps posted at the same
+        time cannot overwrite each other's diagnosis_process (lost update).
+        """
+        try:
+            stmt = (
+                select(IncidentSimulationDB)
+                .where(IncidentSimulationDB.id == incident_id)
+                .with_for_update()
+            )
+            incident = self.db.execute(stmt).scalar_one_or_none()
+            if not incident:
+                return None
+
+            incident.diagnosis_process = incident.diagnosis_process + [diagnosis_step]
+            incident.updated_at = utc_now()
+            self.db.commit()
+            self.db.refresh(incident)
+            return incident
+        except Exception:
+            self.db.rollback()
+            raise
 
     def complete_incident(
         self,
         incident_id: str,
         solution_proposed: str,
         root_cause_identified: str,
-        time_to_diagnose_minutes: int,
-        time_to_resolve_minutes: int,
         post_mortem: str,
         evaluation: dict,
+        time_to_diagnose_minutes: Optional[int] = None,
+        time_to_resolve_minutes: Optional[int] = None,
     ) -> Optional[IncidentSimulationDB]:
-        """Complete an incident with solution and evaluation"""
+        """
+        Complete an incident with solution and evaluation.
+
+        Time metrics left as None are measured from created_at: diagnosis up
+        to the timestamp of the last diagnosis step (None if there are no
+        steps), resolution up to now.
+        """
         incident = self.get_by_id(incident_id)
         if not incident:
             return None
 
+        now = utc_now()
+        if time_to_diagnose_minutes is None and incident.diagnosis_process:
+            last_step_at = incident.diagnosis_process[-1].get("timestamp")
+            if last_step_at:
+                time_to_diagnose_minutes = _minutes_between(
+                    incident.created_at, datetime.fromisoformat(last_step_at)
+                )
+        if time_to_resolve_minutes is None:
+            time_to_resolve_minutes = _minutes_between(incident.created_at, now)
+
         incident.solution_proposed = solution_proposed
         incident.root_cause_identified = root_cause_identified
         incident.time_to_diagnose_minutes = time_to_diagnose_minutes
         incident.time_to_resolve_minutes = time_to_resolve_minutes
         incident.post_mortem = post_mortem
         incident.evaluation = evaluation
-        incident.updated_at = utc_now()
+        incident.updated_at = now
         self.db.commit()
         self.db.refresh(incident)
 
@@ -6,6 +6,7 @@ Provides unified interface for different LLM providers.
 from .base import LLMProvider, LLMMessage, LLMResponse, LLMRole
 from .mock import MockLLMProvider
 from .factory import LLMProviderFactory
+from .batcher import LLMRequestBatcher
 
 __all__ = [
     "LLMProvider",
@@ -14,4 +15,5 @@ __all__ = [
     "LLMRole",
     "MockLLMProvider",
     "LLMProviderFactory",
+    "LLMRequestBatcher",
 ]
\ No newline at end of file
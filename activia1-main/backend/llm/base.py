@@ -62,7 +62,9 @@ class LLMProvider(ABC):
             messages: List of conversation messages
             temperature: Sampling temperature (0.0 = deterministic, 1.0 = creative)
             max_tokens: Maximum tokens in response
-            **kwargs: Provider-specific parameters
+            **kwargs: Provider-specific parameters. All providers accept
+                json_mode=True to request JSON-only output when the backend
+                supports it (ignored otherwise)
 
         Returns:
             LLMResponse with generated content and metadata
@@ -0,0 +1,182 @@
+"""
+Micro-batching of concurrent LLM requests
+
+Collects generate() calls that arrive within a short window and dispatches
+them together against a single provider, so that a backend configured with
+parallel slots (e.g. Ollama with OLLAMA_NUM_PARALLEL=N) processes them in the
+same scheduling round instead of one after another.
+
+Dispatch is continuous: up to `max_inflight` requests run at once, and a new
+request is sent as soon as any running one finishes, instead of waiting for
+the whole previous batch (one long generation no longer holds back the
+requests queued behind it).
+
+With `shortest_first=True` each collected batch is started in order of
+prompt length, so when slots are scarce short conversational prompts are
+not queued behind long ones (HTTP backends batch server-side, so there is
+no client-side padding to bucket away; ordering is what the client controls).
+
+Usage:
+    batcher = LLMRequestBatcher(provider, window_ms=30, max_batch=8)
+    response = await batcher.submit(messages, temperature=0.3, max_tokens=1000)
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .base import LLMMessage, LLMProvider, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+_PendingRequest = Tuple[List[LLMMessage], Dict[str, Any], asyncio.Future]
+
+
+def _prompt_length(request: _PendingRequest) -> int:
+    """Characters across all messages of a request (cheap proxy for token count)."""
+    return sum(len(message.content) for message in request[0])
+
+
+class LLMRequestBatcher:
+    """
+    Coalesces concurrent LLM requests into batches.
+
+    Callers await submit(); a background worker drains the queue every
+    `window_ms` milliseconds (or as soon as `max_batch` requests are waiting)
+    and dispatches the batch concurrently against the provider, taking one
+    of `max_inflight` slots per request (defaults to `max_batch`, the number
+    of parallel slots of the backend), shortest prompt first if
+    `shortest_first` is set. Each caller gets back its own
+    LLMResponse, or the exception raised for its request.
+
+    The worker is bound to the running event loop and is (re)created lazily,
+    so the batcher can be instantiated at import time.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        window_ms: float = 30.0,
+        max_batch: int = 8,
+        max_inflight: Optional[int] = None,
+        shortest_first: bool = False,
+    ):
+        self.provider = provider
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight or max_batch
+        self.shortest_first = shortest_first
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Requests taken off the queue by the worker but not dispatched yet
+        self._collected: List[_PendingRequest] = []
+        self._inflight: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start the drain worker on the current loop if it is not running."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_inflight)
+            self._collected = []
+            self._inflight = set()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, messages: List[LLMMessage], **kwargs) -> LLMResponse:
+        """
+        Enqueue a request and wait for its response.
+
+        Args:
+            messages: Conversation messages for provider.generate()
+            **kwargs: Extra generate() arguments (temperature, max_tokens, ...)
+
+        Returns:
+            LLMResponse for this request
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((messages, kwargs, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Stop the drain worker and any running request (call on application shutdown).
+
+        Running requests are cancelled; requests still waiting to be
+        dispatched fail with RuntimeError so their callers do not hang.
+        """
+        tasks = list(self._inflight)
+        if self._worker is not None and not self._worker.done():
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        pending = self._collected
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("LLM request batcher closed"))
+
+        self._worker = None
+        self._queue = None
+        self._slots = None
+        self._collected = []
+        self._inflight = set()
+        self._loop = None
+
+    async def _collect_batch(self) -> List[_PendingRequest]:
+        """Wait for the first request, then gather more until window/size limit."""
+        batch = self._collected
+        batch.append(await self._queue.get())
+        deadline = self._loop.time() + self.window
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _dispatch_one(self, request: _PendingRequest) -> None:
+        """Run one request on a slot already held and resolve its future."""
+        messages, kwargs, future = request
+        try:
+            if future.done():
+                return  # Caller was cancelled while queued
+            result = await self.provider.generate(messages, **kwargs)
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._slots.release()
+
+    async def _run(self) -> None:
+        """Background worker: collect batches and start each request as soon as a slot is free."""
+        while True:
+            batch = await self._collect_batch()
+            if self.shortest_first:
+                batch.sort(key=_prompt_length)  # Stable: FIFO among equal lengths
+            logger.debug("Dispatching LLM batch", extra={"batch_size": len(batch)})
+            while batch:
+                await self._slots.acquire()
+                request = batch.pop(0)
+                task = self._loop.create_task(self._dispatch_one(request))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
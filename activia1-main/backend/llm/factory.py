@@ -23,11 +23,14 @@ Usage:
     >>> # Generar respuesta
     >>> response = await provider.generate(messages, temperature=0.7)
 """
+import logging
 from typing import Optional, Dict, Any
 
 from .base import LLMProvider
 from .mock import MockLLMProvider
 
+logger = logging.getLogger(__name__)
+
 
 class LLMProviderFactory:
     """
@@ -100,6 +103,27 @@ class LLMProviderFactory:
         """Get list of registered provider types"""
         return list(cls._providers.keys())
 
+    @staticmethod
+    def _with_quant_tag(model: str, quant: str) -> str:
+        """
+        Append a quantization suffix to an Ollama model tag
+
+        "mistral:7b-instruct" + "q4_K_M" -> "mistral:7b-instruct-q4_K_M".
+        Models without an explicit tag (or ":latest") are returned unchanged:
+        the variant names differ per model, and Ollama's default tags are
+        already 4-bit quantized.
+        """
+        name, _, tag = model.partition(":")
+        if not tag or tag == "latest":
+            logger.warning(
+                f"OLLAMA_QUANT={quant} ignored for '{model}': set an explicit tag "
+                f"in OLLAMA_MODEL (e.g. {name}:7b-instruct) to select a quantized variant"
+            )
+            return model
+        if tag.lower().endswith(quant.lower()):
+            return model
+        return f"{name}:{tag}-{quant}"
+
     @classmethod
     def create_from_env(cls, provider_type: str = None) -> LLMProvider:
         """
@@ -134,6 +158,13 @@ class LLMProviderFactory:
             # Ollama no requiere API key, solo base_url y model
             config["base_url"] = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
             config["model"] = os.getenv("OLLAMA_MODEL", "llama2")
+
+            # Quantized weights: decode is memory-bandwidth bound, so fewer bytes
+            # per weight means more tokens/sec and room for more parallel slots.
+            # OLLAMA_QUANT (q4_K_M, q5_K_M, q8_0, ...) picks that variant of the tag.
+            quant = os.getenv("OLLAMA_QUANT")
+            if quant:
+                config["model"] = cls._with_quant_tag(config["model"], quant)
             config["temperature"] = float(os.getenv("OLLAMA_TEMPERATURE", "0.7"))
             timeout = os.getenv("OLLAMA_TIMEOUT")
             if timeout:
@@ -183,6 +183,9 @@ class GeminiProvider(LLMProvider):
         
         if max_tokens:
             generation_config["maxOutputTokens"] = max_tokens
+
+        if kwargs.get("json_mode", False):
+            generation_config["responseMimeType"] = "application/json"
             
         payload["generationConfig"] = generation_config
         
@@ -360,6 +363,9 @@ class GeminiProvider(LLMProvider):
         
         if max_tokens:
             generation_config["maxOutputTokens"] = max_tokens
+
+        if kwargs.get("json_mode", False):
+            generation_config["responseMimeType"] = "application/json"
             
         payload["generationConfig"] = generation_config
         
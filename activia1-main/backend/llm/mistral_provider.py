@@ -143,6 +143,9 @@ class MistralProvider(LLMProvider):
         
         if max_tokens:
             payload["max_tokens"] = max_tokens
+
+        if kwargs.get("json_mode", False):
+            payload["response_format"] = {"type": "json_object"}
         
         # Make request with retries
         for attempt in range(self.max_retries):
@@ -272,6 +275,9 @@ class MistralProvider(LLMProvider):
         
         if max_tokens:
             payload["max_tokens"] = max_tokens
+
+        if kwargs.get("json_mode", False):
+            payload["response_format"] = {"type": "json_object"}
         
         async with httpx.AsyncClient(timeout=self.timeout) as client:
             url = f"{self.BASE_URL}/chat/completions"
@@ -316,6 +316,11 @@ class OllamaProvider(LLMProvider):
         if max_tokens is not None:
             payload["options"]["num_predict"] = max_tokens
 
+        # JSON mode: Ollama restringe la salida a JSON válido (campo top-level,
+        # no una option del modelo)
+        if kwargs.pop("json_mode", False):
+            payload["format"] = "json"
+
         # Add any additional Ollama-specific options
         if kwargs:
             payload["options"].update(kwargs)
@@ -494,6 +499,11 @@ class OllamaProvider(LLMProvider):
         if max_tokens is not None:
             payload["options"]["num_predict"] = max_tokens
 
+        # JSON mode: Ollama restringe la salida a JSON válido (campo top-level,
+        # no una option del modelo)
+        if kwargs.pop("json_mode", False):
+            payload["format"] = "json"
+
         # Add any additional Ollama-specific options
         if kwargs:
             payload["options"].update(kwargs)
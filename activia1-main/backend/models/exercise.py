@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, Float, JSON
+from sqlalchemy import Column, String, Integer, Text, DateTime, Float, JSON, Index
 from sqlalchemy.sql import func
 from backend.database.base import Base
 import uuid
@@ -24,7 +24,6 @@ class Exercise(Base):
 
 class UserExerciseSubmission(Base):
     __tablename__ = "user_exercise_submissions"
-    __table_args__ = {'extend_existing': True}
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, nullable=False, index=True)
@@ -39,7 +38,7 @@ class UserExerciseSubmission(Base):
     
     # Evaluación de IA
     ai_score = Column(Float, nullable=True)  # 0-10
-    ai_feedback = Column(Text, nullable=True)
+    ai_feedback = Column(JSON, nullable=True)  # Evaluación completa de la IA (dict)
     code_quality_score = Column(Float, nullable=True)
     readability_score = Column(Float, nullable=True)
     efficiency_score = Column(Float, nullable=True)
@@ -50,5 +49,11 @@ class UserExerciseSubmission(Base):
     attempts = Column(Integer, default=1)
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Query: Historial de envíos de un usuario, más recientes primero
+        Index('idx_submission_user_submitted', user_id, submitted_at.desc()),
+        {'extend_existing': True},
+    )
+
     def __repr__(self):
         return f"<Submission {self.user_id[:8]} - Exercise {self.exercise_id[:8]}>"
@@ -203,9 +203,9 @@ export const ExerciseDetailView: React.FC<{
             </div>
 
             {/* AI Feedback */}
-            {result.ai_feedback && (
+            {result.ai_feedback?.feedback && (
               <div className="text-sm text-gray-300">
-                <strong>Feedback:</strong> {result.ai_feedback}
+                <strong>Feedback:</strong> {result.ai_feedback.feedback}
               </div>
             )}
           </div>
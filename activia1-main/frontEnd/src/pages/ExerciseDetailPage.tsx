@@ -114,7 +114,9 @@ export default function ExerciseDetailPage() {
         is_correct: false,
         execution_time_ms: 45,
         ai_score: 75,
-        ai_feedback: 'Tu solución es casi correcta, pero hay un caso de borde que no maneja correctamente. Revisa qué sucede cuando uno de los números es negativo.',
+        ai_feedback: {
+          feedback: 'Tu solución es casi correcta, pero hay un caso de borde que no maneja correctamente. Revisa qué sucede cuando uno de los números es negativo.',
+        },
         code_quality_score: 80,
         readability_score: 85,
         efficiency_score: 70,
@@ -287,10 +289,10 @@ export default function ExerciseDetailPage() {
               </div>
 
               {/* AI Feedback */}
-              {result.ai_feedback && (
+              {result.ai_feedback?.feedback && (
                 <div className="p-4 rounded-lg bg-[var(--accent-primary)]/10 border border-[var(--accent-primary)]/20">
                   <h3 className="text-sm font-medium text-[var(--accent-primary)] mb-2">Feedback del Tutor IA</h3>
-                  <p className="text-sm text-[var(--text-secondary)]">{result.ai_feedback}</p>
+                  <p className="text-sm text-[var(--text-secondary)]">{result.ai_feedback.feedback}</p>
                 </div>
               )}
 
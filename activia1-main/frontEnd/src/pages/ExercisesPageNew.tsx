@@ -292,13 +292,13 @@ const ExercisesPageNew: React.FC = () => {
                     </div>
 
                     {/* AI Feedback */}
-                    {result.ai_feedback && (
+                    {result.ai_feedback?.feedback && (
                       <div className="bg-gradient-to-r from-purple-900/20 to-pink-900/20 border border-purple-500/30 rounded-xl p-6">
                         <div className="flex items-center gap-2 mb-3">
                           <Sparkles className="w-5 h-5 text-purple-400" />
                           <h4 className="font-semibold text-white">Feedback de IA</h4>
                         </div>
-                        <p className="text-gray-300 leading-relaxed">{result.ai_feedback}</p>
+                        <p className="text-gray-300 leading-relaxed">{result.ai_feedback.feedback}</p>
                       </div>
                     )}
 
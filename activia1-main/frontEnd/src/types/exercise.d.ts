@@ -6,6 +6,8 @@
  * @description Frontend-ready exercise types para componentes React
  */
 
+import type { AIEvaluationFeedback } from './index';
+
 /**
  * Nivel de dificultad del ejercicio
  */
@@ -173,8 +175,8 @@ export interface IExerciseSubmissionResult {
   /** Puntuación de la IA (0-100) */
   ai_score?: number;
   
-  /** Feedback de la IA */
-  ai_feedback?: string;
+  /** Evaluación de la IA (feedback, scores, fortalezas y mejoras) */
+  ai_feedback?: AIEvaluationFeedback;
 }
 
 /**
@@ -242,6 +242,17 @@ export interface ExerciseSubmission {
   code: string;
 }
 
+export interface AIEvaluationFeedback {
+  overall_score?: number;
+  code_quality?: number;
+  readability?: number;
+  efficiency?: number;
+  best_practices?: number;
+  feedback?: string;
+  strengths?: string[];
+  improvements?: string[];
+}
+
 export interface SubmissionResult {
   id: string;
   passed_tests: number;
@@ -249,7 +260,7 @@ export interface SubmissionResult {
   is_correct: boolean;
   execution_time_ms: number;
   ai_score?: number;
-  ai_feedback?: string;
+  ai_feedback?: AIEvaluationFeedback;
   code_quality_score?: number;
   readability_score?: number;
   efficiency_score?: number;
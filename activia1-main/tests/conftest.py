@@ -8,6 +8,7 @@ Provides reusable test fixtures for:
 - Test data builders
 """
 import os
+import sys
 
 # IMPORTANT: Set environment variables BEFORE importing any backend modules
 # This prevents RuntimeError from backend.api.config requiring SECRET_KEY
@@ -445,8 +446,37 @@ def test_config() -> Dict[str, Any]:
 # Clean up
 # ============================================================================
 
+# Shared LLM batchers created lazily by the routers: (module, attribute)
+_SHARED_LLM_BATCHERS = (
+    ("backend.api.routers.exercises", "_ai_eval_batcher"),
+    ("backend.api.routers.risk_analysis", "_risk_batcher"),
+    ("backend.api.routers.simulators", "_simulator_batcher"),
+)
+
+
 @pytest.fixture(autouse=True)
-def reset_singletons():
+def reset_singletons(request):
     """Reset any singleton instances between tests"""
+    # Requesting the event loop here makes this fixture tear down first, so
+    # the batcher workers are closed on a loop that is still open. A worker
+    # left pending on a closed loop is collected later and its warning
+    # shows up as an error in an unrelated test.
+    loop = None
+    if request.node.get_closest_marker("asyncio") is not None:
+        loop = request.getfixturevalue("event_loop")
+
     yield
-    # Add cleanup code here if needed
+
+    # Only modules a test already imported (importing the routers has side effects)
+    for module_name, attribute in _SHARED_LLM_BATCHERS:
+        module = sys.modules.get(module_name)
+        batcher = getattr(module, attribute, None)
+        if batcher is None:
+            continue
+        if loop is not None and batcher._loop is loop and not loop.is_closed():
+            loop.run_until_complete(batcher.close())
+        setattr(module, attribute, None)
+
+    deps = sys.modules.get("backend.api.deps")
+    if deps is not None:
+        deps._llm_warmup_pending = False
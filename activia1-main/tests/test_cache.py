@@ -164,6 +164,17 @@ class TestLRUCache:
 
         assert result == "new_value"
 
+    @pytest.mark.unit
+    def test_lru_cache_delete(self, lru_cache):
+        """LRU cache delete removes a single entry"""
+        lru_cache.set("key1", "value1")
+        lru_cache.set("key2", "value2")
+
+        assert lru_cache.delete("key1") is True
+        assert lru_cache.delete("key1") is False
+        assert lru_cache.get("key1") is None
+        assert lru_cache.get("key2") == "value2"
+
 
 # ============================================================================
 # LLM Response Cache Tests
@@ -387,6 +398,18 @@ class TestRedisCache:
         call_args = redis_cache_mock._mock_client.setex.call_args
         assert call_args[0][1] == 120
 
+    @pytest.mark.unit
+    def test_redis_cache_delete_uses_same_key(self, redis_cache_mock):
+        """Redis cache delete targets the key used by set"""
+        redis_cache_mock._mock_client.delete.return_value = 1
+
+        redis_cache_mock.set("test prompt", "test response", mode="X")
+        deleted = redis_cache_mock.delete("test prompt", mode="X")
+
+        set_key = redis_cache_mock._mock_client.setex.call_args[0][0]
+        assert deleted is True
+        redis_cache_mock._mock_client.delete.assert_called_once_with(set_key)
+
     @pytest.mark.unit
     def test_redis_cache_stats(self, redis_cache_mock):
         """Redis cache tracks statistics"""
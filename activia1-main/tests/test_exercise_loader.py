@@ -0,0 +1,127 @@
+"""
+Tests para backend/data/exercises/loader.py
+
+Verifica:
+1. Búsqueda con filtros combinados (una sola pasada)
+2. Filtros de dificultad y tags sin distinguir mayúsculas
+3. Preprocesamiento de los tests ocultos al cargar
+4. Estadísticas precalculadas
+"""
+import json
+
+import pytest
+
+from backend.data.exercises.loader import ExerciseLoader, _compile_expected_expression
+
+
+@pytest.fixture(scope="module")
+def loader():
+    return ExerciseLoader()
+
+
+class TestSearch:
+    """Tests de ExerciseLoader.search()"""
+
+    def test_search_without_filters_returns_all(self, loader):
+        assert len(loader.search()) == len(loader.get_all())
+
+    def test_search_difficulty_is_case_insensitive(self, loader):
+        upper = loader.search(difficulty="Easy")
+        lower = loader.search(difficulty="easy")
+
+        assert upper
+        assert [ex['id'] for ex in upper] == [ex['id'] for ex in lower]
+        assert all(ex['meta']['difficulty'] == "Easy" for ex in upper)
+
+    def test_search_tags_is_case_insensitive(self, loader):
+        results = loader.search(tags=["poo"])
+
+        assert results
+        assert all("POO" in ex['meta']['tags'] for ex in results)
+
+    def test_search_combines_filters(self, loader):
+        results = loader.search(difficulty="Medium", unit=2, language="python")
+
+        assert results
+        for ex in results:
+            assert ex['meta']['difficulty'] == "Medium"
+            assert ex['id'].startswith("U2-")
+            assert ex['ui_config']['editor_language'] == "python"
+
+    def test_search_by_framework(self, loader):
+        results = loader.search(language="java", framework="spring-boot")
+
+        assert results
+        assert all(ex['id'].startswith("U7-") for ex in results)
+
+
+class TestHiddenTestsPreprocessing:
+    """Tests de los campos derivados de hidden_tests"""
+
+    def test_input_str_is_precomputed(self, loader):
+        for ex in loader.get_all():
+            for test in ex.get('hidden_tests', []):
+                raw = test.get('input', test.get('input_data', ''))
+                expected = json.dumps(raw) if isinstance(raw, (dict, list)) else str(raw)
+                assert test['_input_str'] == expected
+
+    def test_tests_are_classified(self, loader):
+        for ex in loader.get_all():
+            for test in ex.get('hidden_tests', []):
+                if test['_kind'] == "expr":
+                    assert test['_expected_code'] is not None
+                else:
+                    assert test['_kind'] == "stdout"
+                    assert test['_expected_code'] is None
+
+    @pytest.mark.parametrize("expected", [
+        "total == 42600",
+        "len(activos) == 2 and 'Madrid' in grupos",
+        "exito == True and not libro1.disponible",
+        "abs(dist - 6.07) < 0.1",
+        "not lista",
+    ])
+    def test_expected_expression_is_compiled(self, expected):
+        code = _compile_expected_expression(expected, "U1-TEST-01")
+
+        assert code is not None
+        assert code.co_filename == "<expected:U1-TEST-01>"
+
+    @pytest.mark.parametrize("expected", [
+        "Normal",  # Output plano, aunque contenga 'or'
+        "total == 1 && promedio == 2",  # Sintaxis Java
+        "x.__class__ == int",
+        "__import__('os') == 1",
+        "[y for y in x] == []",
+        "(lambda: 1)() == 1",
+        "-1",  # Salida numérica: siempre truthy como expresión
+        "+5",
+        42,
+    ])
+    def test_rejected_expected_is_not_compiled(self, expected):
+        assert _compile_expected_expression(expected, "U1-TEST-01") is None
+
+    def test_numeric_expected_stays_stdout_test(self, loader):
+        tests = [
+            test
+            for ex in loader.get_all()
+            for test in ex.get('hidden_tests', [])
+            if test.get('expected') == "-1"
+        ]
+
+        assert tests
+        assert all(test['_kind'] == "stdout" for test in tests)
+
+
+class TestStats:
+    """Tests de ExerciseLoader.get_stats()"""
+
+    def test_stats_are_computed_once(self, loader):
+        assert loader.get_stats() is loader.get_stats()
+
+    def test_stats_match_exercises(self, loader):
+        stats = loader.get_stats()
+
+        assert stats['total_exercises'] == len(loader.get_all())
+        assert sum(stats['by_difficulty'].values()) == stats['total_exercises']
+        assert sum(stats['by_language'].values()) == stats['total_exercises']
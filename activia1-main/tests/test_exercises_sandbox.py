@@ -0,0 +1,62 @@
+"""
+Tests para el sandbox de ejecución de código de backend/api/routers/exercises.py
+
+Verifica:
+1. El prefiltro bloquea imports y patrones peligrosos (sin importar mayúsculas)
+2. El mensaje de error nombra el import/patrón detectado
+3. Código seguro se ejecuta normalmente
+4. run_in_sandbox ejecuta el código en el pool de procesos del sandbox
+"""
+import pytest
+
+from backend.api.routers import exercises as exercises_router
+from backend.api.routers.exercises import execute_python_code
+
+
+class TestDangerousCodePrefilter:
+    """Tests del prefiltro de seguridad previo a la ejecución"""
+
+    @pytest.mark.parametrize("code, name", [
+        ("import os", "os"),
+        ("IMPORT OS", "os"),
+        ("x = 1\nfrom subprocess import run", "subprocess"),
+        ("from codeop import compile_command", "codeop"),
+        ("__import__('socket')", "socket"),
+    ])
+    def test_blocks_dangerous_imports(self, code, name):
+        stdout, stderr, exec_time = execute_python_code(code, "")
+
+        assert stdout == ""
+        assert stderr == f"Error de seguridad: Import '{name}' no permitido"
+        assert exec_time == 0
+
+    @pytest.mark.parametrize("code, pattern", [
+        ("print(eval('1 + 1'))", "eval("),
+        ("x = Open('data.txt')", "open("),
+        ("print(().__class__)", "__class__"),
+    ])
+    def test_blocks_dangerous_patterns(self, code, pattern):
+        _, stderr, _ = execute_python_code(code, "")
+
+        assert stderr == f"Error de seguridad: Patrón '{pattern}' no permitido"
+
+    def test_allows_safe_code(self):
+        stdout, stderr, _ = execute_python_code("nombre = input()\nprint('Hola', nombre)", "Ana\n")
+
+        assert stderr == ""
+        assert stdout == "Hola Ana"
+
+
+class TestRunInSandbox:
+    """Tests del punto de entrada asíncrono al sandbox"""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_sandbox_pool(self):
+        try:
+            stdout, stderr, _ = await exercises_router.run_in_sandbox("print(input() * 2)", "ab\n")
+
+            assert exercises_router._sandbox_pool is not None
+            assert stderr == ""
+            assert stdout == "abab"
+        finally:
+            exercises_router.shutdown_sandbox_pool()
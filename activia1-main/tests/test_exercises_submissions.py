@@ -0,0 +1,62 @@
+"""
+Tests para GET /exercises/user/submissions (backend/api/routers/exercises.py)
+
+Verifica:
+1. La paginación keyset (submitted_at, id) no saltea submissions con el
+   mismo timestamp entre páginas
+2. `total` es la cantidad de submissions del usuario, no la de la página
+3. Un cursor inválido responde 400
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend.api.routers.exercises import get_user_submissions
+from backend.models.exercise import UserExerciseSubmission
+
+
+@pytest.fixture
+def submissions(db_session):
+    """5 submissions del usuario (3 con el mismo timestamp) y 1 de otro usuario"""
+    same_time = datetime(2026, 1, 10, 12, 0, 0)
+    rows = [
+        UserExerciseSubmission(id=f"sub_{i}", user_id="user_1", exercise_id="U1-VAR-01",
+                               submitted_code="print(1)", submitted_at=submitted_at)
+        for i, submitted_at in enumerate([
+            datetime(2026, 1, 9, 8, 0, 0), same_time, same_time, same_time, datetime(2026, 1, 11, 9, 0, 0),
+        ])
+    ]
+    rows.append(UserExerciseSubmission(id="sub_other", user_id="user_2", exercise_id="U1-VAR-01",
+                                       submitted_code="print(2)", submitted_at=same_time))
+    db_session.add_all(rows)
+    db_session.flush()
+    return rows
+
+
+class TestUserSubmissionsPagination:
+    """Tests de la paginación de get_user_submissions"""
+
+    @pytest.mark.asyncio
+    async def test_pages_do_not_skip_same_timestamp(self, db_session, submissions):
+        user = SimpleNamespace(id="user_1")
+        seen, cursor = [], None
+        while True:
+            page = await get_user_submissions(limit=2, before=cursor, db=db_session, current_user=user)
+            assert page["total"] == 5
+            seen.extend(item["id"] for item in page["submissions"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == ["sub_4", "sub_3", "sub_2", "sub_1", "sub_0"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_returns_400(self, db_session):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_user_submissions(
+                limit=2, before="ayer", db=db_session, current_user=SimpleNamespace(id="user_1")
+            )
+
+        assert exc_info.value.status_code == 400
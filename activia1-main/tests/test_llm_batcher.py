@@ -0,0 +1,159 @@
+"""
+Tests para backend/llm/batcher.py
+
+Verifica:
+1. Cada caller recibe su propia respuesta
+2. Requests concurrentes se agrupan en un mismo batch
+3. Errores del provider se propagan solo al caller afectado
+4. Un request lento no bloquea a los batches siguientes (despacho continuo)
+5. max_inflight limita las llamadas simultáneas al provider
+6. shortest_first despacha primero los prompts más cortos del batch
+7. close() resuelve a todos los callers en espera (ninguno queda colgado)
+"""
+import asyncio
+
+import pytest
+
+from backend.llm.base import LLMMessage, LLMResponse, LLMRole
+from backend.llm.batcher import LLMRequestBatcher
+from backend.llm.mock import MockLLMProvider
+
+
+class RecordingProvider(MockLLMProvider):
+    """Provider que registra cuántas llamadas están en vuelo a la vez"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        content = messages[-1].content
+        if content == "boom":
+            raise ValueError("provider failure")
+        return LLMResponse(content=f"echo:{content}", model="mock", usage={})
+
+
+def _msg(text: str):
+    return [LLMMessage(role=LLMRole.USER, content=text)]
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_response_per_caller():
+    batcher = LLMRequestBatcher(RecordingProvider(), window_ms=5, max_batch=4)
+
+    responses = await asyncio.gather(*(batcher.submit(_msg(f"p{i}")) for i in range(3)))
+    await batcher.close()
+
+    assert [r.content for r in responses] == ["echo:p0", "echo:p1", "echo:p2"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_dispatched_together():
+    provider = RecordingProvider()
+    batcher = LLMRequestBatcher(provider, window_ms=20, max_batch=8)
+
+    await asyncio.gather(*(batcher.submit(_msg(f"p{i}")) for i in range(5)))
+    await batcher.close()
+
+    assert provider.max_in_flight == 5
+
+
+@pytest.mark.asyncio
+async def test_provider_error_only_affects_its_caller():
+    batcher = LLMRequestBatcher(RecordingProvider(), window_ms=5)
+
+    ok, failed = await asyncio.gather(
+        batcher.submit(_msg("fine")),
+        batcher.submit(_msg("boom")),
+        return_exceptions=True,
+    )
+    await batcher.close()
+
+    assert ok.content == "echo:fine"
+    assert isinstance(failed, ValueError)
+
+
+class SlowFirstProvider(RecordingProvider):
+    """El primer request tarda mucho; el resto responde enseguida"""
+
+    async def generate(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        if messages[-1].content == "slow":
+            await asyncio.sleep(0.3)
+        return await super().generate(messages, temperature, max_tokens, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_slow_request_does_not_block_later_batches():
+    batcher = LLMRequestBatcher(SlowFirstProvider(), window_ms=5, max_batch=4)
+
+    slow = asyncio.ensure_future(batcher.submit(_msg("slow")))
+    await asyncio.sleep(0.05)  # Siguiente ventana: otro batch
+    fast = await asyncio.wait_for(batcher.submit(_msg("fast")), timeout=0.2)
+
+    assert fast.content == "echo:fast"
+    assert not slow.done()
+    assert (await slow).content == "echo:slow"
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_max_inflight_caps_concurrency():
+    provider = RecordingProvider()
+    batcher = LLMRequestBatcher(provider, window_ms=5, max_batch=8, max_inflight=2)
+
+    responses = await asyncio.gather(*(batcher.submit(_msg(f"p{i}")) for i in range(6)))
+    await batcher.close()
+
+    assert [r.content for r in responses] == [f"echo:p{i}" for i in range(6)]
+    assert provider.max_in_flight == 2
+
+
+class OrderRecordingProvider(RecordingProvider):
+    """Registra el orden en que el provider recibe los prompts"""
+
+    def __init__(self):
+        super().__init__()
+        self.order = []
+
+    async def generate(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        self.order.append(messages[-1].content)
+        return await super().generate(messages, temperature, max_tokens, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_shortest_first_starts_short_prompts_first():
+    provider = OrderRecordingProvider()
+    batcher = LLMRequestBatcher(provider, window_ms=20, max_batch=8, max_inflight=1, shortest_first=True)
+    prompts = ["x" * 300, "x" * 10, "x" * 120, "y" * 10]
+
+    responses = await asyncio.gather(*(batcher.submit(_msg(p)) for p in prompts))
+    await batcher.close()
+
+    assert [r.content for r in responses] == [f"echo:{p}" for p in prompts]
+    assert provider.order == ["x" * 10, "y" * 10, "x" * 120, "x" * 300]
+
+
+@pytest.mark.asyncio
+async def test_close_resolves_pending_callers():
+    batcher = LLMRequestBatcher(SlowFirstProvider(), window_ms=5, max_batch=8, max_inflight=1)
+
+    # "slow" ocupa el único slot; el resto espera en el batch o en la cola
+    running = asyncio.ensure_future(batcher.submit(_msg("slow")))
+    await asyncio.sleep(0.02)
+    waiting = [asyncio.ensure_future(batcher.submit(_msg(f"p{i}"))) for i in range(3)]
+    await asyncio.sleep(0.02)
+    queued = asyncio.ensure_future(batcher.submit(_msg("queued")))
+    await asyncio.sleep(0)
+
+    await batcher.close()
+    results = await asyncio.wait_for(
+        asyncio.gather(running, *waiting, queued, return_exceptions=True), timeout=1
+    )
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
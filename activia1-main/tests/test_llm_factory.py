@@ -113,6 +113,7 @@ class TestLLMProviderFactoryEnvironment:
             "ANTHROPIC_MODEL",
             "OLLAMA_BASE_URL",
             "OLLAMA_MODEL",
+            "OLLAMA_QUANT",
         ]
         original_values = {}
         for var in env_vars:
@@ -244,6 +245,25 @@ class TestLLMProviderFactoryEnvironment:
 
         assert provider is not None
 
+    @pytest.mark.skipif(
+        "ollama" not in LLMProviderFactory.get_available_providers(),
+        reason="Ollama provider not registered"
+    )
+    def test_create_from_env_ollama_quant_selects_tag_variant(self, clean_env):
+        """OLLAMA_QUANT agrega la variante cuantizada al tag explícito del modelo"""
+        os.environ["OLLAMA_MODEL"] = "mistral:7b-instruct"
+        os.environ["OLLAMA_QUANT"] = "q4_K_M"
+
+        provider = LLMProviderFactory.create_from_env("ollama")
+
+        assert provider.model == "mistral:7b-instruct-q4_K_M"
+
+    def test_with_quant_tag_keeps_untagged_and_already_quantized_models(self):
+        """Sin tag explícito (o ya cuantizado) el modelo no cambia"""
+        assert LLMProviderFactory._with_quant_tag("phi3", "q4_K_M") == "phi3"
+        assert LLMProviderFactory._with_quant_tag("phi3:latest", "q8_0") == "phi3:latest"
+        assert LLMProviderFactory._with_quant_tag("llama3.2:3b-instruct-q8_0", "q8_0") == "llama3.2:3b-instruct-q8_0"
+
 
 class TestBuildProviderConfig:
     """Tests para método privado _build_provider_config"""
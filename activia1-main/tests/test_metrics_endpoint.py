@@ -0,0 +1,77 @@
+"""
+Tests para el endpoint /metrics de backend/api/routers/metrics.py
+
+Verifica:
+1. Scrapes dentro del TTL reutilizan la misma serialización
+2. Vencido el TTL, se vuelve a llamar a generate_latest()
+3. Con Accept-Encoding: gzip la respuesta va comprimida
+"""
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from backend.api.routers import metrics as metrics_router
+
+
+@pytest.fixture
+def counted_generate_latest(monkeypatch):
+    """Reemplaza generate_latest() contando las llamadas y resetea el cache"""
+    calls = []
+
+    def fake_generate_latest():
+        calls.append(1)
+        return f"# scrape {len(calls)}\n".encode()
+
+    monkeypatch.setattr(metrics_router, "generate_latest", fake_generate_latest)
+    monkeypatch.setitem(metrics_router._metrics_cache, "t", 0.0)
+    monkeypatch.setitem(metrics_router._metrics_cache, "body", b"")
+    monkeypatch.setitem(metrics_router._metrics_cache, "gzip", None)
+    return calls
+
+
+def make_request(accept_encoding: str = "") -> Request:
+    """Request mínimo de scrape con el Accept-Encoding dado"""
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/metrics", "headers": headers})
+
+
+class TestMetricsCache:
+    """Tests del cache TTL de la exposición de Prometheus"""
+
+    @pytest.mark.asyncio
+    async def test_scrapes_within_ttl_share_output(self, counted_generate_latest):
+        first = await metrics_router.get_metrics(make_request())
+        second = await metrics_router.get_metrics(make_request())
+
+        assert first.body == second.body == b"# scrape 1\n"
+        assert len(counted_generate_latest) == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_ttl_regenerates(self, counted_generate_latest, monkeypatch):
+        monkeypatch.setattr(metrics_router, "METRICS_CACHE_TTL_SECONDS", 0.0)
+
+        await metrics_router.get_metrics(make_request())
+        response = await metrics_router.get_metrics(make_request())
+
+        assert response.body == b"# scrape 2\n"
+        assert len(counted_generate_latest) == 2
+
+
+class TestMetricsGzip:
+    """Tests de la compresión gzip de /metrics"""
+
+    @pytest.mark.asyncio
+    async def test_gzip_when_accepted(self, counted_generate_latest):
+        response = await metrics_router.get_metrics(make_request("gzip, deflate"))
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-length"] == str(len(response.body))
+        assert gzip.decompress(response.body) == b"# scrape 1\n"
+
+    @pytest.mark.asyncio
+    async def test_plain_when_not_accepted(self, counted_generate_latest):
+        response = await metrics_router.get_metrics(make_request())
+
+        assert "content-encoding" not in response.headers
+        assert response.body == b"# scrape 1\n"
@@ -215,6 +215,29 @@ class TestOllamaProviderGenerate:
             payload = call_args.kwargs["json"]
             assert payload["options"]["num_predict"] == 500
 
+    @pytest.mark.asyncio
+    async def test_generate_json_mode_sets_format(self):
+        """generate() con json_mode=True envía format="json" (no como option)"""
+        provider = OllamaProvider()
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "message": {"content": "{}"},
+            "prompt_eval_count": 5,
+            "eval_count": 10,
+        }
+
+        with patch.object(httpx.AsyncClient, 'post', new_callable=AsyncMock) as mock_post:
+            mock_post.return_value = mock_response
+
+            messages = [LLMMessage(role=LLMRole.USER, content="Test")]
+            await provider.generate(messages, json_mode=True)
+
+            payload = mock_post.call_args.kwargs["json"]
+            assert payload["format"] == "json"
+            assert "json_mode" not in payload["options"]
+
     @pytest.mark.asyncio
     async def test_generate_connect_error_raises_helpful_message(self):
         """generate() lanza ValueError con mensaje útil si Ollama no está disponible"""
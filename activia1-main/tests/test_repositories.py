@@ -9,7 +9,7 @@ Verifica:
 - Manejo de errores
 """
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import uuid4
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -230,6 +230,23 @@ def test_session_delete_not_found(session_repo):
     assert result is False
 
 
+def test_session_save_risk_analysis(session_repo, test_db):
+    """Test persisting the latest 5D risk analysis on the session row"""
+    session = session_repo.create("student_001", "prog2_tp1", "TUTOR")
+    test_db.expire_all()
+    updated_at = session_repo.get_by_id(session.id).updated_at
+
+    assert session_repo.save_risk_analysis(session.id, "trace_9:10", '{"overall_score": 17}')
+    assert not session_repo.save_risk_analysis("missing", "trace_9:10", "{}")
+
+    test_db.expire_all()
+    stored = session_repo.get_by_id(session.id)
+    assert stored.risk_analysis_fingerprint == "trace_9:10"
+    assert stored.risk_analysis_json == '{"overall_score": 17}'
+    # Storing an analysis is not session activity
+    assert stored.updated_at == updated_at
+
+
 # ============================================================================
 # TraceRepository Tests
 # ============================================================================
@@ -262,6 +279,30 @@ def test_trace_create(trace_repo, session_repo):
     assert db_trace.ai_involvement == 0.3
 
 
+def test_trace_create_many(trace_repo, session_repo):
+    """Test creating several traces with a single flush, keeping input order"""
+    session = session_repo.create("student_001", "prog2_tp1", "TUTOR")
+
+    traces = [
+        CognitiveTrace(
+            id=f"trace_pair_{i}",
+            session_id=session.id,
+            student_id="student_001",
+            activity_id="prog2_tp1",
+            trace_level=TraceLevel.N4_COGNITIVO,
+            interaction_type=interaction_type,
+            content=f"Test trace {i}",
+        )
+        for i, interaction_type in enumerate([InteractionType.STUDENT_PROMPT, InteractionType.AI_RESPONSE])
+    ]
+
+    db_traces = trace_repo.create_many(traces)
+
+    assert [t.id for t in db_traces] == ["trace_pair_0", "trace_pair_1"]
+    assert [t.interaction_type for t in db_traces] == ["student_prompt", "ai_response"]
+    assert len(trace_repo.get_by_session(session.id)) == 2
+
+
 def test_trace_get_by_session(trace_repo, session_repo):
     """Test retrieving traces by session"""
     # Create session
@@ -342,6 +383,31 @@ def test_trace_count_by_session(trace_repo, session_repo):
     assert count == 5
 
 
+def test_trace_get_recent_by_session(trace_repo, session_repo, test_db):
+    """Test retrieving only the latest traces of a session, oldest first"""
+    session = session_repo.create("student_001", "prog2_tp1", "TUTOR")
+
+    base_time = datetime(2025, 1, 1, 12, 0, 0)
+    for i in range(5):
+        trace = CognitiveTrace(
+            session_id=session.id,
+            student_id="student_001",
+            activity_id="prog2_tp1",
+            trace_level=TraceLevel.N4_COGNITIVO,
+            interaction_type=InteractionType.STUDENT_PROMPT,
+            cognitive_state=CognitiveState.PLANIFICACION,
+            content=f"Test {i}",
+            ai_involvement=0.3
+        )
+        db_trace = trace_repo.create(trace)
+        db_trace.created_at = base_time + timedelta(minutes=i)
+    test_db.flush()
+
+    traces = trace_repo.get_recent_by_session(session.id, limit=3)
+
+    assert [t.content for t in traces] == ["Test 2", "Test 3", "Test 4"]
+
+
 # ============================================================================
 # RiskRepository Tests
 # ============================================================================
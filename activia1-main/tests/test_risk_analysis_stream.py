@@ -0,0 +1,375 @@
+"""
+Tests para el streaming del análisis 5D (backend/api/routers/risk_analysis.py)
+
+Verifica:
+1. El parser incremental emite cada miembro apenas se cierra, con cualquier
+   partición en chunks
+2. El endpoint /stream emite una línea por dimensión y una línea final
+3. Si el LLM no devuelve JSON se emite el análisis de respaldo
+4. El análisis persistido en la sesión evita volver a llamar al LLM
+5. La validación del JSON del LLM aplica defaults y rango de scores
+6. Las interacciones repetidas se agrupan antes de armar el prompt
+7. Requests simultáneos para la misma sesión comparten una llamada al LLM
+8. El cache de Redis (síncrono) nunca se usa desde el event loop
+9. Sin generate_stream se usa la respuesta completa del LLM, y el stream
+   persiste el análisis en una sesión de DB propia
+"""
+import asyncio
+import contextlib
+import threading
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from backend.api.routers import risk_analysis as risk_router
+
+
+LLM_OUTPUT = (
+    'Aquí está el análisis:\n{"cognitive": {"score": 7, "level": "high", '
+    '"indicators": ["pide \\"soluciones\\" {completas}", "a,b"]}, '
+    '"ethical": {"score": 2, "level": "low", "indicators": []}, '
+    '"top_risks": [{"dimension": "cognitive", "description": "d", "severity": "high", "mitigation": "m"}], '
+    '"recommendations": ["r1", "r2"]}\nFin.'
+)
+
+
+def feed_in_chunks(text: str, size: int):
+    """Alimenta el parser con chunks de tamaño fijo y junta los miembros"""
+    parser = risk_router._TopLevelMemberParser()
+    members = []
+    for start in range(0, len(text), size):
+        members.extend(parser.feed(text[start:start + size]))
+    members.extend(parser.close())
+    return members
+
+
+class TestTopLevelMemberParser:
+    """Tests del parser incremental de miembros de primer nivel"""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+    def test_any_chunking_yields_same_members(self, size):
+        members = feed_in_chunks(LLM_OUTPUT, size)
+
+        start, end = LLM_OUTPUT.index("{"), LLM_OUTPUT.rindex("}")
+        assert dict(members) == orjson.loads(LLM_OUTPUT[start:end + 1])
+        assert [key for key, _ in members] == ["cognitive", "ethical", "top_risks", "recommendations"]
+
+    def test_member_emitted_before_object_closes(self):
+        parser = risk_router._TopLevelMemberParser()
+
+        assert parser.feed('{"cognitive": {"score": 5}') == []
+        assert parser.feed(', "ethi') == [("cognitive", {"score": 5})]
+
+    def test_truncated_member_is_dropped(self):
+        members = feed_in_chunks('{"cognitive": {"score": 5}, "ethical": {"sco', 4)
+
+        assert members == [("cognitive", {"score": 5})]
+
+    def test_no_json_yields_nothing(self):
+        assert feed_in_chunks("No puedo responder eso.", 5) == []
+
+
+class TestLLMAnalysisValidation:
+    """Tests del TypeAdapter que valida el JSON del LLM"""
+
+    def test_defaults_and_score_clamping(self):
+        validated = risk_router._LLM_ANALYSIS_ADAPTER.validate_json(
+            '{"cognitive": {"score": 12.7}, "ethical": {"score": "4"}}'
+        )
+        analysis = risk_router._build_analysis("session_1", validated)
+
+        assert analysis["dimensions"]["cognitive"]["score"] == 10
+        assert analysis["dimensions"]["ethical"]["score"] == 4
+        assert analysis["dimensions"]["epistemic"]["indicators"] == ["No data available"]
+        assert analysis["overall_score"] == 23
+        assert analysis["risk_level"] == "medium"
+        assert analysis["top_risks"] == []
+
+    def test_invalid_dimension_type_raises(self):
+        with pytest.raises(ValidationError):
+            risk_router._LLM_ANALYSIS_ADAPTER.validate_json('{"cognitive": "alto"}')
+
+
+class TestCollapseRepeatedInteractions:
+    """Tests de la deduplicación de interacciones del prompt"""
+
+    def test_repeated_content_is_grouped_with_count(self):
+        history = [
+            {"num": num, "student_question": question, "ai_response_preview": "r", "interaction_type": "t"}
+            for num, question in enumerate(["explicame", "otra", "explicame", "explicame"], 1)
+        ]
+
+        collapsed = risk_router._collapse_repeated_interactions(history)
+
+        assert [(conv["num"], conv["count"]) for conv in collapsed] == [(1, 3), (2, 1)]
+        assert collapsed[0]["repetition"] == " (repetida 3 veces)"
+        assert collapsed[1]["repetition"] == ""
+
+
+class FakeSessionRepo:
+    """Sesión en memoria que persiste el análisis como SessionDB"""
+
+    def __init__(self):
+        self.session = SimpleNamespace(
+            id="session_1", student_id="student_001", activity_id="prog2_tp1",
+            risk_analysis_fingerprint=None, risk_analysis_json=None,
+        )
+
+    def get_by_id(self, session_id):
+        return self.session
+
+    def save_risk_analysis(self, session_id, fingerprint, analysis_json):
+        self.session.risk_analysis_fingerprint = fingerprint
+        self.session.risk_analysis_json = analysis_json
+        return True
+
+
+class FakeTraceRepo:
+    def count_by_session(self, session_id):
+        return 2
+
+    def get_recent_by_session(self, session_id, limit=10):
+        return [
+            SimpleNamespace(
+                id=f"trace_{i}",
+                content=f"respuesta {i}",
+                trace_metadata={"prompt": f"pregunta {i}"},
+                interaction_type="student_prompt",
+            )
+            for i in range(2)
+        ]
+
+
+class StreamingLLM:
+    """Provider que emite la respuesta en chunks de 5 caracteres"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def generate_stream(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        for start in range(0, len(self.text), 5):
+            yield self.text[start:start + 5]
+
+
+class NonStreamingLLM:
+    """Provider sin streaming: generate_stream levanta NotImplementedError"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def generate_stream(self, messages, **kwargs):
+        raise NotImplementedError("streaming not supported")
+        yield  # pragma: no cover
+
+    async def generate(self, messages, **kwargs):
+        return SimpleNamespace(content=self.text)
+
+
+class CountingLLM:
+    """Provider no-streaming lento que cuenta las llamadas a generate()"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.calls = 0
+
+    async def generate(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(content=self.text)
+
+
+async def collect_lines(response):
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    return [orjson.loads(line) for line in body.splitlines()]
+
+
+class MemoryCache:
+    """Reemplazo en memoria del RedisCache del router"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key, mode=None):
+        return self.store.get(key)
+
+    def set(self, key, value, mode=None):
+        self.store[key] = value
+
+
+@pytest.fixture(autouse=True)
+def memory_analysis_cache(monkeypatch):
+    """Cache nuevo por test, sin Redis"""
+    monkeypatch.setattr(risk_router, "_analysis_cache", MemoryCache())
+
+
+class OwnDBSession:
+    """Reemplazo de get_db_session() que registra si la sesión está abierta"""
+
+    def __init__(self):
+        self.open = False
+        self.opened = 0
+
+    @contextlib.contextmanager
+    def __call__(self):
+        self.open = True
+        self.opened += 1
+        try:
+            yield None
+        finally:
+            self.open = False
+
+
+@pytest.fixture
+def session_repo(monkeypatch):
+    """Sesión en memoria, también la que abre el stream con get_db_session()"""
+    repo = FakeSessionRepo()
+    own_db_session = OwnDBSession()
+
+    def repository_for(db):
+        return repo
+
+    monkeypatch.setattr(risk_router, "get_db_session", own_db_session)
+    monkeypatch.setattr(risk_router, "SessionRepository", repository_for)
+    return repo
+
+
+class TestStreamEndpoint:
+    """Tests del endpoint GET /risk-analysis/{session_id}/stream"""
+
+    @pytest.mark.asyncio
+    async def test_streams_dimensions_then_analysis(self, session_repo):
+        response = await risk_router.stream_risks_5d(
+            "session_1", session_repo, FakeTraceRepo(), StreamingLLM(LLM_OUTPUT), {}
+        )
+        lines = await collect_lines(response)
+
+        assert response.media_type == "application/x-ndjson"
+        assert [line["type"] for line in lines] == ["dimension", "dimension", "analysis"]
+        assert [line["dimension"] for line in lines[:2]] == ["cognitive", "ethical"]
+
+        analysis = lines[-1]["data"]
+        assert analysis["session_id"] == "session_1"
+        assert analysis["dimensions"]["cognitive"]["score"] == 7
+        assert analysis["recommendations"] == ["r1", "r2"]
+        assert lines[-1]["message"] == "Risk analysis completed"
+
+    @pytest.mark.asyncio
+    async def test_invalid_output_falls_back(self, session_repo):
+        response = await risk_router.stream_risks_5d(
+            "session_1", session_repo, FakeTraceRepo(), StreamingLLM("sin json"), {}
+        )
+        lines = await collect_lines(response)
+
+        assert len(lines) == 1
+        assert lines[0]["message"] == "Risk analysis completed (fallback mode)"
+        assert lines[0]["data"]["session_id"] == "session_1"
+
+    @pytest.mark.asyncio
+    async def test_stored_analysis_skips_llm(self, monkeypatch, session_repo):
+        response = await risk_router.stream_risks_5d(
+            "session_1", session_repo, FakeTraceRepo(), StreamingLLM(LLM_OUTPUT), {}
+        )
+        computed = (await collect_lines(response))[-1]["data"]
+        assert session_repo.session.risk_analysis_fingerprint == "trace_1:2"
+
+        # Sin Redis/memoria: solo queda el análisis persistido en la sesión
+        monkeypatch.setattr(risk_router, "_analysis_cache", MemoryCache())
+        response = await risk_router.stream_risks_5d(
+            "session_1", session_repo, FakeTraceRepo(), StreamingLLM("sin json"), {}
+        )
+        lines = await collect_lines(response)
+
+        assert len(lines) == 1
+        assert lines[0]["data"] == computed
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_provider_uses_full_response(self, session_repo):
+        response = await risk_router.stream_risks_5d(
+            "session_1", session_repo, FakeTraceRepo(), NonStreamingLLM(LLM_OUTPUT), {}
+        )
+        lines = await collect_lines(response)
+
+        assert len(lines) == 1
+        assert lines[0]["message"] == "Risk analysis completed"
+        dimensions = lines[0]["data"]["dimensions"]
+        assert dimensions["cognitive"]["score"] == 7
+        assert dimensions["ethical"]["score"] == 2
+
+    @pytest.mark.asyncio
+    async def test_analysis_is_persisted_in_own_db_session(self):
+        saved_while_open = []
+
+        class RecordingSessionRepo(FakeSessionRepo):
+            def save_risk_analysis(self, session_id, fingerprint, analysis_json):
+                saved_while_open.append(own_db_session.open)
+                return super().save_risk_analysis(session_id, fingerprint, analysis_json)
+
+        request_repo = FakeSessionRepo()
+        own_repo = RecordingSessionRepo()
+        own_db_session = OwnDBSession()
+        with pytest.MonkeyPatch.context() as patcher:
+            patcher.setattr(risk_router, "get_db_session", own_db_session)
+            patcher.setattr(risk_router, "SessionRepository", lambda db: own_repo)
+            response = await risk_router.stream_risks_5d(
+                "session_1", request_repo, FakeTraceRepo(), StreamingLLM(LLM_OUTPUT), {}
+            )
+            await collect_lines(response)
+
+        assert saved_while_open == [True]
+        assert own_db_session.opened == 1
+        assert own_repo.session.risk_analysis_fingerprint == "trace_1:2"
+        assert request_repo.session.risk_analysis_fingerprint is None
+
+
+class TestAnalyzeEndpoint:
+    """Tests del endpoint GET /risk-analysis/{session_id}"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_llm_call(self):
+        llm = CountingLLM(LLM_OUTPUT)
+        session_repo = FakeSessionRepo()
+
+        responses = await asyncio.gather(*(
+            risk_router.analyze_risks_5d("session_1", session_repo, FakeTraceRepo(), llm, {})
+            for _ in range(3)
+        ))
+
+        assert llm.calls == 1
+        bodies = [orjson.loads(response.body) for response in responses]
+        assert all(body["data"] == bodies[0]["data"] for body in bodies)
+        assert risk_router._inflight_analyses == {}
+
+
+class ThreadRecordingCache(MemoryCache):
+    """MemoryCache que registra en qué thread se lo llama"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key, mode=None):
+        self.threads.add(threading.get_ident())
+        return super().get(key, mode)
+
+    def set(self, key, value, mode=None):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, mode)
+
+
+class TestCacheOffEventLoop:
+    """Tests de que el cache corre en threads y no bloquea el event loop"""
+
+    @pytest.mark.asyncio
+    async def test_cache_reads_and_writes_run_in_threads(self, monkeypatch):
+        cache = ThreadRecordingCache()
+        monkeypatch.setattr(risk_router, "_analysis_cache", cache)
+
+        await risk_router.analyze_risks_5d(
+            "session_1", FakeSessionRepo(), FakeTraceRepo(), CountingLLM(LLM_OUTPUT), {}
+        )
+
+        assert len(cache.store) == 2
+        assert cache.threads
+        assert threading.get_ident() not in cache.threads
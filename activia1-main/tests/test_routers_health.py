@@ -7,9 +7,13 @@ Verifies:
 - GET /health/live - Kubernetes liveness probe
 - GET /health/ready - Kubernetes readiness probe
 - GET /health/deep - Deep health check with metrics
+- LLM warm-up at startup (readiness 503 until it finishes)
 """
+import asyncio
+import json
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -274,6 +278,77 @@ class TestReadinessProbe:
         app.dependency_overrides.clear()
 
 
+class TestLLMWarmup:
+    """Tests del warm-up del LLM al arrancar y su efecto en /health/ready"""
+
+    @pytest.mark.asyncio
+    async def test_readiness_returns_503_while_llm_warms_up(self, monkeypatch):
+        from backend.api import deps
+        from backend.api.routers.health import readiness_probe
+
+        monkeypatch.setattr(deps, "_llm_warmup_pending", True)
+
+        response = await readiness_probe(db=Mock())
+
+        assert response.status_code == 503
+        body = json.loads(response.body)
+        assert body["data"]["checks"]["llm_provider"]["status"] == "warming_up"
+
+    @pytest.mark.asyncio
+    async def test_warmup_generates_once_and_clears_pending(self, monkeypatch):
+        from backend.api import deps
+
+        provider = Mock()
+        provider.generate = AsyncMock()
+        monkeypatch.setattr(deps, "get_llm_provider", lambda: provider)
+
+        await deps.start_llm_warmup()
+
+        provider.generate.assert_awaited_once()
+        assert provider.generate.await_args.kwargs["max_tokens"] == 1
+        assert deps.is_llm_warming_up() is False
+
+    @pytest.mark.asyncio
+    async def test_failed_warmup_does_not_block_readiness(self, monkeypatch):
+        from backend.api import deps
+
+        provider = Mock()
+        provider.generate = AsyncMock(side_effect=ConnectionError("provider down"))
+        monkeypatch.setattr(deps, "get_llm_provider", lambda: provider)
+
+        await deps.start_llm_warmup()
+
+        assert deps.is_llm_warming_up() is False
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_cancelled_warmup(self, monkeypatch):
+        from backend.api import deps
+
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow_generate(*args, **kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        provider = Mock()
+        provider.generate = slow_generate
+        monkeypatch.setattr(deps, "get_llm_provider", lambda: provider)
+
+        task = deps.start_llm_warmup()
+        await asyncio.wait_for(started.wait(), timeout=5)
+        await deps.stop_llm_warmup(task)
+
+        # La generación en curso quedó cancelada y cerrada, no colgada
+        assert task.done()
+        assert cancelled.is_set()
+        assert deps.is_llm_warming_up() is False
+
+
 # ============================================================================
 # Deep Health Check Tests
 # ============================================================================
@@ -645,40 +645,36 @@ class TestInterviewSimulator:
 
     def test_start_interview(self, client, sample_session):
         """Test starting a technical interview"""
-        with patch('backend.api.routers.simulators.LLMProviderFactory') as mock_factory:
-            mock_llm = Mock()
-            mock_factory.create_from_env.return_value = mock_llm
-
-            with patch('backend.api.routers.simulators.SimuladorProfesionalAgent') as mock_agent:
-                mock_instance = Mock()
-                mock_instance.generar_pregunta_entrevista.return_value = "What is Big O notation?"
-                mock_agent.return_value = mock_instance
-
-                with patch('backend.api.routers.simulators.InterviewSessionRepository') as mock_repo:
-                    mock_interview = Mock()
-                    mock_interview.id = "interview-123"
-                    mock_interview.session_id = sample_session.id
-                    mock_interview.student_id = "test-student"
-                    mock_interview.interview_type = "CONCEPTUAL"
-                    mock_interview.difficulty_level = "MEDIUM"
-                    mock_interview.questions_asked = []
-                    mock_interview.responses = []
-                    mock_interview.created_at = datetime.now()
-                    mock_interview.updated_at = datetime.now()
-
-                    mock_repo_instance = Mock()
-                    mock_repo_instance.create.return_value = mock_interview
-                    mock_repo_instance.add_question.return_value = mock_interview
-                    mock_repo.return_value = mock_repo_instance
-
-                    response = client.post("/api/v1/simulators/interview/start", json={
-                        "session_id": sample_session.id,
-                        "student_id": "test-student",
-                        "interview_type": "CONCEPTUAL",
-                        "difficulty_level": "MEDIUM"
-                    })
-
-                    assert response.status_code == 200
+        with patch('backend.api.routers.simulators.SimuladorProfesionalAgent') as mock_agent:
+            mock_instance = Mock()
+            mock_instance.generar_pregunta_entrevista.return_value = "What is Big O notation?"
+            mock_agent.return_value = mock_instance
+
+            with patch('backend.api.routers.simulators.InterviewSessionRepository') as mock_repo:
+                mock_interview = Mock()
+                mock_interview.id = "interview-123"
+                mock_interview.session_id = sample_session.id
+                mock_interview.student_id = "test-student"
+                mock_interview.interview_type = "CONCEPTUAL"
+                mock_interview.difficulty_level = "MEDIUM"
+                mock_interview.questions_asked = []
+                mock_interview.responses = []
+                mock_interview.created_at = datetime.now()
+                mock_interview.updated_at = datetime.now()
+
+                mock_repo_instance = Mock()
+                mock_repo_instance.create.return_value = mock_interview
+                mock_repo_instance.add_question.return_value = mock_interview
+                mock_repo.return_value = mock_repo_instance
+
+                response = client.post("/api/v1/simulators/interview/start", json={
+                    "session_id": sample_session.id,
+                    "student_id": "test-student",
+                    "interview_type": "CONCEPTUAL",
+                    "difficulty_level": "MEDIUM"
+                })
+
+                assert response.status_code == 200
 
     def test_get_interview_not_found(self, client):
         """Test getting non-existent interview"""
@@ -701,45 +697,47 @@ class TestIncidentSimulator:
 
     def test_start_incident(self, client, sample_session):
         """Test starting an incident simulation"""
-        with patch('backend.api.routers.simulators.LLMProviderFactory') as mock_factory:
-            mock_llm = Mock()
-            mock_factory.create_from_env.return_value = mock_llm
-
-            with patch('backend.api.routers.simulators.SimuladorProfesionalAgent') as mock_agent:
-                mock_instance = Mock()
-                mock_instance.generar_incidente.return_value = {
-                    "description": "Database connection timeout",
-                    "logs": "ERROR: Connection refused",
-                    "metrics": {"cpu": 95, "memory": 80}
-                }
-                mock_agent.return_value = mock_instance
-
-                with patch('backend.api.routers.simulators.IncidentSimulationRepository') as mock_repo:
-                    mock_incident = Mock()
-                    mock_incident.id = "incident-123"
-                    mock_incident.session_id = sample_session.id
-                    mock_incident.student_id = "test-student"
-                    mock_incident.incident_type = "DATABASE_OUTAGE"
-                    mock_incident.severity = "HIGH"
-                    mock_incident.incident_description = "Database timeout"
-                    mock_incident.simulated_logs = "ERROR logs"
-                    mock_incident.simulated_metrics = {"cpu": 95}
-                    mock_incident.diagnosis_process = []
-                    mock_incident.created_at = datetime.now()
-                    mock_incident.updated_at = datetime.now()
-
-                    mock_repo_instance = Mock()
-                    mock_repo_instance.create.return_value = mock_incident
-                    mock_repo.return_value = mock_repo_instance
-
-                    response = client.post("/api/v1/simulators/incident/start", json={
-                        "session_id": sample_session.id,
-                        "student_id": "test-student",
-                        "incident_type": "DATABASE_OUTAGE",
-                        "severity": "HIGH"
-                    })
-
-                    assert response.status_code == 200
+        with patch('backend.api.routers.simulators.SimuladorProfesionalAgent') as mock_agent:
+            mock_instance = Mock()
+            mock_instance.generar_incidente.return_value = {
+                "description": "Database connection timeout",
+                "logs": "ERROR: Connection refused",
+                "metrics": {"cpu": 95, "memory": 80}
+            }
+            mock_agent.return_value = mock_instance
+
+            with patch('backend.api.routers.simulators.IncidentSimulationRepository') as mock_repo:
+                mock_incident = Mock()
+                mock_incident.id = "incident-123"
+                mock_incident.session_id = sample_session.id
+                mock_incident.student_id = "test-student"
+                mock_incident.incident_type = "DATABASE_OUTAGE"
+                mock_incident.severity = "HIGH"
+                mock_incident.incident_description = "Database timeout"
+                mock_incident.simulated_logs = "ERROR logs"
+                mock_incident.simulated_metrics = {"cpu": 95}
+                mock_incident.diagnosis_process = []
+                mock_incident.solution_proposed = None
+                mock_incident.root_cause_identified = None
+                mock_incident.time_to_diagnose_minutes = None
+                mock_incident.time_to_resolve_minutes = None
+                mock_incident.post_mortem = None
+                mock_incident.evaluation = None
+                mock_incident.created_at = datetime.now()
+                mock_incident.updated_at = datetime.now()
+
+                mock_repo_instance = Mock()
+                mock_repo_instance.create.return_value = mock_incident
+                mock_repo.return_value = mock_repo_instance
+
+                response = client.post("/api/v1/simulators/incident/start", json={
+                    "session_id": sample_session.id,
+                    "student_id": "test-student",
+                    "incident_type": "DATABASE_OUTAGE",
+                    "severity": "HIGH"
+                })
+
+                assert response.status_code == 200
 
     def test_get_incident_not_found(self, client):
         """Test getting non-existent incident"""
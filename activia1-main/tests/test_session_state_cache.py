@@ -0,0 +1,65 @@
+"""
+Tests para el cache de estado de sesiones (backend/api/deps.py)
+
+Verifica:
+1. La segunda validación de una sesión no consulta la base de datos
+2. Las sesiones inexistentes no se cachean
+3. invalidate_session_state fuerza a releer el estado
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from backend.api import deps
+from backend.core.redis_cache import RedisCache
+
+
+class CountingSessionRepo:
+    def __init__(self, session=None):
+        self.session = session
+        self.calls = 0
+
+    def get_by_id(self, session_id):
+        self.calls += 1
+        return self.session
+
+
+@pytest.fixture(autouse=True)
+def memory_session_state_cache(monkeypatch):
+    """Cache nuevo por test, sin Redis"""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setattr(deps, "_session_state_cache", RedisCache(prefix="session_state_test:"))
+
+
+def make_session(status="active"):
+    return SimpleNamespace(id="session_1", student_id="student_001", activity_id="prog2_tp1", status=status)
+
+
+class TestSessionStateCache:
+
+    def test_second_lookup_hits_cache(self):
+        repo = CountingSessionRepo(make_session())
+
+        first = deps.get_session_state(repo, "session_1")
+        second = deps.get_session_state(repo, "session_1")
+
+        assert first == second == deps.SessionState("session_1", "student_001", "prog2_tp1", "active")
+        assert repo.calls == 1
+
+    def test_missing_session_is_not_cached(self):
+        repo = CountingSessionRepo(None)
+
+        assert deps.get_session_state(repo, "session_1") is None
+        repo.session = make_session()
+        assert deps.get_session_state(repo, "session_1").status == "active"
+        assert repo.calls == 2
+
+    def test_invalidate_rereads_status(self):
+        repo = CountingSessionRepo(make_session())
+        deps.get_session_state(repo, "session_1")
+
+        repo.session = make_session(status="completed")
+        deps.invalidate_session_state("session_1")
+
+        assert deps.get_session_state(repo, "session_1").status == "completed"
+        assert repo.calls == 2
@@ -0,0 +1,439 @@
+"""
+Tests para el streaming de simuladores (POST /simulators/interact/stream)
+
+Verifica:
+1. stream_interact emite los tokens del LLM y al final la respuesta completa
+2. Sin LLM (respuestas predefinidas) solo se emite la respuesta final
+3. Si el provider no soporta streaming se usa generate()
+4. El endpoint emite eventos SSE y persiste las trazas con el texto completo
+5. POST /simulators/interact responde con IDs pre-generados (UUIDv7
+   crecientes aun dentro del mismo milisegundo) y persiste las trazas en una
+   BackgroundTask
+6. El historial precargado se usa sin volver a consultar el repositorio
+7. Los endpoints SM-IA/CX-IA/DSO-IA persisten la traza en una BackgroundTask
+8. POST /simulators/incident/start/stream emite el escenario del incidente a
+   medida que se genera y al final el incidente persistido
+"""
+import contextlib
+from types import SimpleNamespace
+from uuid import UUID
+
+import orjson
+import pytest
+from fastapi import BackgroundTasks
+
+from backend.agents.simulators import SimuladorProfesionalAgent, SimuladorType
+from backend.api.routers import simulators as simulators_router
+from backend.api.schemas.simulator import SimulatorInteractionRequest, SimulatorType as ApiSimulatorType
+from backend.core import constants
+from backend.core.constants import utc_now, uuid7
+from backend.llm.base import LLMResponse
+
+
+class StreamingLLM:
+    """Provider que emite la respuesta en chunks fijos"""
+
+    model = "fake-model"
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def generate_stream(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class NonStreamingLLM:
+    """Provider sin soporte de streaming"""
+
+    async def generate_stream(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    async def generate(self, messages, **kwargs):
+        return LLMResponse(content="respuesta completa", model="fake-model", usage={"total_tokens": 5})
+
+
+async def collect(agent, prompt="Propongo usar caché"):
+    return [event async for event in agent.stream_interact(prompt)]
+
+
+class TestStreamInteract:
+    """Tests de SimuladorProfesionalAgent.stream_interact"""
+
+    @pytest.mark.asyncio
+    async def test_tokens_then_full_response(self):
+        agent = SimuladorProfesionalAgent(
+            SimuladorType.PRODUCT_OWNER, llm_provider=StreamingLLM(["¿Cuáles ", "son los ", "criterios?"])
+        )
+
+        events = await collect(agent)
+
+        assert events[:-1] == [("token", "¿Cuáles "), ("token", "son los "), ("token", "criterios?")]
+        kind, response = events[-1]
+        assert kind == "response"
+        assert response["message"] == "¿Cuáles son los criterios?"
+        assert response["role"] == "product_owner"
+        assert agent._token_queue is None
+
+    @pytest.mark.asyncio
+    async def test_predefined_response_has_no_tokens(self):
+        agent = SimuladorProfesionalAgent(SimuladorType.SCRUM_MASTER)
+
+        events = await collect(agent)
+
+        assert len(events) == 1
+        assert events[0][0] == "response"
+        assert events[0][1]["role"] == "scrum_master"
+
+    @pytest.mark.asyncio
+    async def test_provider_without_streaming_falls_back_to_generate(self):
+        agent = SimuladorProfesionalAgent(SimuladorType.TECH_INTERVIEWER, llm_provider=NonStreamingLLM())
+
+        events = await collect(agent)
+
+        assert events == [
+            ("token", "respuesta completa"),
+            ("response", events[-1][1]),
+        ]
+        assert events[-1][1]["message"] == "respuesta completa"
+
+
+class FakeSessionRepo:
+    def __init__(self, db=None):
+        pass
+
+    def get_by_id(self, session_id):
+        return SimpleNamespace(id=session_id, status="active", student_id="student_001", activity_id="prog2_tp1")
+
+
+class FakeTraceRepo:
+    """TraceRepository en memoria compartido entre las sesiones del endpoint"""
+
+    created = []
+
+    def __init__(self, db):
+        pass
+
+    def get_by_session(self, session_id, limit=100, offset=0):
+        return []
+
+    def create_many(self, traces):
+        self.created.extend(traces)
+        return [SimpleNamespace(id=f"trace_{len(self.created) - len(traces) + i}") for i in range(1, len(traces) + 1)]
+
+
+class TestStreamEndpoint:
+    """Tests del endpoint POST /simulators/interact/stream"""
+
+    @pytest.mark.asyncio
+    async def test_emits_sse_events_and_persists_traces(self, monkeypatch):
+        @contextlib.contextmanager
+        def fake_db_session():
+            yield None
+
+        FakeTraceRepo.created = []
+        monkeypatch.setattr(simulators_router, "get_db_session", fake_db_session)
+        monkeypatch.setattr(simulators_router, "TraceRepository", FakeTraceRepo)
+        monkeypatch.setattr(simulators_router, "SessionRepository", FakeSessionRepo)
+        request = SimulatorInteractionRequest(
+            session_id="session_1", simulator_type=ApiSimulatorType.PRODUCT_OWNER, prompt="Propongo usar caché"
+        )
+
+        response = await simulators_router.stream_interaction_with_simulator(
+            request, StreamingLLM(["Hola ", "equipo"]), None
+        )
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        events = [orjson.loads(event[len(b"data: "):]) for event in body.split(b"\n\n") if event]
+
+        assert response.media_type == "text/event-stream"
+        assert [event["type"] for event in events] == ["token", "token", "response"]
+        final = events[-1]["data"]
+        assert final["response"] == "Hola equipo"
+        assert final["interaction_id"] == "trace_1_trace_2"
+        assert [trace.content for trace in FakeTraceRepo.created] == ["Propongo usar caché", "Hola equipo"]
+
+
+class TestInteractBackgroundPersistence:
+    """Tests de la persistencia en background de POST /simulators/interact"""
+
+    @pytest.mark.asyncio
+    async def test_response_uses_pregenerated_ids_and_defers_persistence(self, monkeypatch):
+        @contextlib.contextmanager
+        def fake_db_session():
+            yield None
+
+        FakeTraceRepo.created = []
+        monkeypatch.setattr(simulators_router, "get_db_session", fake_db_session)
+        monkeypatch.setattr(simulators_router, "TraceRepository", FakeTraceRepo)
+        monkeypatch.setattr(simulators_router, "SessionRepository", FakeSessionRepo)
+        request = SimulatorInteractionRequest(
+            session_id="session_1", simulator_type=ApiSimulatorType.PRODUCT_OWNER, prompt="Propongo usar caché"
+        )
+        background_tasks = BackgroundTasks()
+
+        response = await simulators_router.interact_with_simulator(
+            request, background_tasks, None, None
+        )
+        data = orjson.loads(response.body)["data"]
+
+        # La respuesta sale antes de persistir
+        assert FakeTraceRepo.created == []
+        input_id, output_id = data["trace_id_input"], data["trace_id_output"]
+        assert data["interaction_id"] == f"{input_id}_{output_id}"
+        # UUIDv7: versión 7 y ordenados por tiempo de creación
+        assert UUID(input_id).version == UUID(output_id).version == 7
+        assert input_id <= output_id
+
+        await background_tasks()
+        assert [trace.id for trace in FakeTraceRepo.created] == [input_id, output_id]
+        assert [trace.trace_metadata["simulator_type"] for trace in FakeTraceRepo.created] == ["product_owner"] * 2
+
+
+class TestUUID7:
+    """Tests de uuid7(): IDs de trazas ordenados por tiempo de creación"""
+
+    @pytest.fixture(autouse=True)
+    def reset_counter(self, monkeypatch):
+        """Sin IDs previos: el reloj fijo del test no queda detrás del real"""
+        monkeypatch.setattr(constants, "_uuid7_last_ms", 0)
+
+    def test_ids_increase_within_same_millisecond(self, monkeypatch):
+        monkeypatch.setattr(constants.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+        ids = [uuid7() for _ in range(5000)]  # Más que el contador de 12 bits
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert all(UUID(value).version == 7 for value in ids)
+
+    def test_ids_increase_when_clock_goes_back(self, monkeypatch):
+        monkeypatch.setattr(constants.time, "time_ns", lambda: 1_700_000_000_001_000_000)
+        first = uuid7()
+        monkeypatch.setattr(constants.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+
+        assert uuid7() > first
+
+
+class TestPreloadedHistory:
+    """Tests de preload_conversation_history (sesión de DB de vida corta)"""
+
+    @pytest.mark.asyncio
+    async def test_interact_uses_preloaded_history(self):
+        class HistoryRepo:
+            calls = 0
+
+            def get_by_session(self, session_id, limit=100, offset=0):
+                self.calls += 1
+                return [SimpleNamespace(interaction_type="student_prompt", content="turno anterior")]
+
+        class RecordingLLM(StreamingLLM):
+            async def generate_stream(self, messages, **kwargs):
+                self.messages = messages
+                yield "ok"
+
+        repo, llm = HistoryRepo(), RecordingLLM([])
+        agent = SimuladorProfesionalAgent(SimuladorType.PRODUCT_OWNER, llm_provider=llm)
+        agent.preload_conversation_history("session_1", repo)
+
+        await collect(agent)
+
+        assert repo.calls == 1
+        assert [m.content for m in llm.messages[1:-1]] == ["turno anterior"]
+
+
+INCIDENT_JSON = '{"description": "API caída", "logs": "ERROR 500", "metrics": {"cpu_usage_percent": 90}}'
+
+
+class MemoryCache:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key, mode=None):
+        return self.store.get((key, mode))
+
+    def set(self, key, value, mode=None):
+        self.store[(key, mode)] = value
+
+
+class TestStreamIncidente:
+    """Tests de SimuladorProfesionalAgent.stream_incidente"""
+
+    @pytest.mark.asyncio
+    async def test_tokens_then_incident(self):
+        chunks = [INCIDENT_JSON[:20], INCIDENT_JSON[20:]]
+        agent = SimuladorProfesionalAgent(llm_provider=StreamingLLM(chunks))
+
+        events = [event async for event in agent.stream_incidente("API_ERROR", "HIGH")]
+
+        assert events[:-1] == [("token", chunk) for chunk in chunks]
+        assert events[-1] == ("incident", orjson.loads(INCIDENT_JSON))
+
+    @pytest.mark.asyncio
+    async def test_fallback_has_no_tokens(self):
+        agent = SimuladorProfesionalAgent()
+
+        events = [event async for event in agent.stream_incidente("DATABASE", "CRITICAL")]
+
+        assert len(events) == 1
+        assert events[0][0] == "incident"
+        assert "description" in events[0][1]
+
+
+class FakeSingleTraceRepo(FakeTraceRepo):
+    def create(self, trace):
+        self.created.append(trace)
+        return SimpleNamespace(id=trace.id)
+
+
+class TestSimulatorBackgroundTrace:
+    """Tests de la traza diferida de los endpoints SM-IA/CX-IA/DSO-IA"""
+
+    @pytest.mark.asyncio
+    async def test_client_requirements_trace_is_written_after_response(self, monkeypatch):
+        @contextlib.contextmanager
+        def fake_db_session():
+            yield None
+
+        FakeSingleTraceRepo.created = []
+        monkeypatch.setattr(simulators_router, "get_db_session", fake_db_session)
+        monkeypatch.setattr(simulators_router, "TraceRepository", FakeSingleTraceRepo)
+        monkeypatch.setattr(
+            simulators_router, "get_session_state",
+            lambda repo, session_id: simulators_router.SessionState(session_id, "student_001", "prog2_tp1", "active"),
+        )
+        request = simulators_router.ClientRequirementRequest(
+            session_id="session_1", student_id="student_001", project_type="MOBILE_APP"
+        )
+        background_tasks = BackgroundTasks()
+
+        response = await simulators_router.get_client_requirements(request, background_tasks, None, None)
+
+        assert response.status_code == 200
+        assert FakeSingleTraceRepo.created == []
+
+        await background_tasks()
+        (trace,) = FakeSingleTraceRepo.created
+        assert trace.session_id == "session_1"
+        assert trace.activity_id == "client_requirements"
+        assert trace.content == "Client requirements request: MOBILE_APP"
+
+    @pytest.mark.asyncio
+    async def test_daily_standup_returns_feedback_and_defers_trace(self, monkeypatch):
+        @contextlib.contextmanager
+        def fake_db_session():
+            yield None
+
+        FakeSingleTraceRepo.created = []
+        monkeypatch.setattr(simulators_router, "get_db_session", fake_db_session)
+        monkeypatch.setattr(simulators_router, "TraceRepository", FakeSingleTraceRepo)
+        monkeypatch.setattr(
+            simulators_router, "get_session_state",
+            lambda repo, session_id: simulators_router.SessionState(session_id, "student_001", "prog2_tp1", "active"),
+        )
+        request = simulators_router.DailyStandupRequest(
+            session_id="session_1",
+            student_id="student_001",
+            what_did_yesterday="Terminé el login",
+            what_will_do_today="Tests del login",
+            impediments="Falta acceso a la base de staging",
+        )
+        background_tasks = BackgroundTasks()
+
+        response = await simulators_router.daily_standup(request, background_tasks, None, None)
+
+        data = orjson.loads(response.body)["data"]
+        assert data["detected_issues"] == ["Impedimento reportado"]
+        assert data["suggestions"]  # Reporte de ayer demasiado corto
+        await background_tasks()
+        assert len(FakeSingleTraceRepo.created) == 1
+
+    @pytest.mark.asyncio
+    async def test_security_audit_validates_vulnerability_list(self, monkeypatch):
+        monkeypatch.setattr(
+            simulators_router, "get_session_state",
+            lambda repo, session_id: simulators_router.SessionState(session_id, "student_001", "prog2_tp1", "active"),
+        )
+        request = simulators_router.SecurityAuditRequest(
+            session_id="session_1",
+            student_id="student_001",
+            code="def run(user_input):\n    return eval(user_input)  # evaluar expresiones del usuario\n",
+        )
+
+        response = await simulators_router.security_audit(request, BackgroundTasks(), None, None)
+
+        (vuln,) = orjson.loads(response.body)["data"]["vulnerabilities"]
+        assert vuln["vulnerability_type"] == "CODE_INJECTION"
+        assert vuln["line_number"] == 2
+        assert vuln["cwe_id"] is None
+
+    @pytest.mark.asyncio
+    async def test_security_audit_id_is_the_persisted_trace_id(self, monkeypatch):
+        @contextlib.contextmanager
+        def fake_db_session():
+            yield None
+
+        FakeSingleTraceRepo.created = []
+        monkeypatch.setattr(simulators_router, "get_db_session", fake_db_session)
+        monkeypatch.setattr(simulators_router, "TraceRepository", FakeSingleTraceRepo)
+        monkeypatch.setattr(
+            simulators_router, "get_session_state",
+            lambda repo, session_id: simulators_router.SessionState(session_id, "student_001", "prog2_tp1", "active"),
+        )
+        request = simulators_router.SecurityAuditRequest(
+            session_id="session_1", student_id="student_001", code="print('hola mundo')\n" * 5
+        )
+        background_tasks = BackgroundTasks()
+
+        first = await simulators_router.security_audit(request, background_tasks, None, None)
+        second = await simulators_router.security_audit(request, background_tasks, None, None)
+        await background_tasks()
+
+        audit_ids = [orjson.loads(r.body)["data"]["audit_id"] for r in (first, second)]
+        assert audit_ids == [f"audit_{trace.id}" for trace in FakeSingleTraceRepo.created]
+        assert audit_ids[0] != audit_ids[1]
+
+
+class FakeIncidentRepo:
+    created = []
+
+    def __init__(self, db):
+        pass
+
+    def create(self, **fields):
+        self.created.append(fields)
+        return SimpleNamespace(
+            id="incident_1", diagnosis_process=[], created_at=utc_now(), updated_at=utc_now(), **fields
+        )
+
+
+class TestStreamStartIncident:
+    """Tests del endpoint POST /simulators/incident/start/stream"""
+
+    @pytest.mark.asyncio
+    async def test_emits_tokens_then_persisted_incident(self, monkeypatch):
+        @contextlib.contextmanager
+        def fake_db_session():
+            yield None
+
+        FakeIncidentRepo.created = []
+        monkeypatch.setattr(simulators_router, "get_db_session", fake_db_session)
+        monkeypatch.setattr(simulators_router, "IncidentSimulationRepository", FakeIncidentRepo)
+        monkeypatch.setattr(simulators_router, "_simulator_response_cache", MemoryCache())
+        monkeypatch.setattr(
+            simulators_router, "get_session_state",
+            lambda repo, session_id: simulators_router.SessionState(session_id, "student_001", "prog2_tp1", "active"),
+        )
+        request = simulators_router.IncidentStartRequest(
+            session_id="session_1", student_id="student_001", incident_type="API_ERROR", severity="HIGH"
+        )
+
+        response = await simulators_router.stream_start_incident(
+            request, StreamingLLM([INCIDENT_JSON[:30], INCIDENT_JSON[30:]])
+        )
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        events = [orjson.loads(event[len(b"data: "):]) for event in body.split(b"\n\n") if event]
+
+        assert [event["type"] for event in events] == ["token", "token", "incident"]
+        assert "".join(event["content"] for event in events[:-1]) == INCIDENT_JSON
+        assert events[-1]["data"]["incident_id"] == "incident_1"
+        assert FakeIncidentRepo.created[0]["incident_description"] == "API caída"
@@ -7,7 +7,7 @@ Cubre:
 - Métodos de agentes: generar_pregunta_entrevista, generar_incidente, etc.
 """
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from backend.database.repositories import (
     InterviewSessionRepository,
@@ -110,6 +110,45 @@ class TestInterviewSessionRepository:
         assert updated.responses[0]["response"] == response_data["response"]
         assert updated.responses[0]["evaluation"]["clarity_score"] == 0.8
 
+    def test_append_turn(self, interview_repo, session_id):
+        """Test: Respuesta y próxima pregunta se agregan en un solo commit"""
+        interview = interview_repo.create(
+            session_id=session_id,
+            student_id="student_test_001",
+            interview_type="CONCEPTUAL",
+            questions_asked=[{"question": "Q1"}],
+        )
+
+        updated = interview_repo.append_turn(
+            interview.id, {"response": "R1", "evaluation": {}}, {"question": "Q2"}
+        )
+        assert [r["response"] for r in updated.responses] == ["R1"]
+        assert [q["question"] for q in updated.questions_asked] == ["Q1", "Q2"]
+
+        # Última respuesta: sin próxima pregunta
+        updated = interview_repo.append_turn(interview.id, {"response": "R2", "evaluation": {}})
+        assert len(updated.responses) == 2
+        assert len(updated.questions_asked) == 2
+
+        assert interview_repo.append_turn("missing", {"response": "R"}) is None
+
+    def test_get_turn_state_tracks_last_question(self, interview_repo, session_id):
+        """Test: Lectura acotada del turno (última pregunta + conteo)"""
+        interview = interview_repo.create(
+            session_id=session_id,
+            student_id="student_test_001",
+            interview_type="CONCEPTUAL",
+            questions_asked=[{"question": "Q1"}],
+        )
+        interview_repo.append_turn(interview.id, {"response": "R1"}, {"question": "Q2"})
+
+        turn = interview_repo.get_turn_state(interview.id)
+
+        assert turn.last_question == {"question": "Q2"}
+        assert turn.question_count == 2
+        assert turn.interview_type == "CONCEPTUAL"
+        assert interview_repo.get_turn_state("missing") is None
+
     def test_complete_interview(self, interview_repo, session_id):
         """Test: Completar entrevista con evaluación final"""
         interview = interview_repo.create(
@@ -200,6 +239,10 @@ class TestIncidentSimulationRepository:
         assert updated.diagnosis_process[0]["action"] == diagnosis_step["action"]
         assert updated.diagnosis_process[0]["finding"] == diagnosis_step["finding"]
 
+    def test_add_diagnosis_step_incidente_inexistente(self, incident_repo):
+        """Test: Sin incidente no se agrega nada (el endpoint responde 404)"""
+        assert incident_repo.add_diagnosis_step("no-existe", {"action": "a", "finding": "f"}) is None
+
     def test_complete_incident(self, incident_repo, session_id):
         """Test: Completar incidente con solución"""
         incident = incident_repo.create(
@@ -237,6 +280,52 @@ class TestIncidentSimulationRepository:
         assert completed.time_to_diagnose_minutes == 10
         assert completed.evaluation["overall_score"] == 0.8
 
+    def test_complete_incident_mide_tiempos(self, incident_repo, session_id):
+        """Test: Sin tiempos explícitos se miden desde created_at y los pasos"""
+        incident = incident_repo.create(
+            session_id=session_id,
+            student_id="student_test_001",
+            incident_type="PERFORMANCE",
+            severity="HIGH",
+            incident_description="Latencia p99 de 8s en /orders"
+        )
+        created_at = incident.created_at.replace(tzinfo=timezone.utc)
+        incident_repo.add_diagnosis_step(incident.id, {
+            "action": "Revisar slow query log",
+            "finding": "Full scan en orders",
+            "timestamp": (created_at + timedelta(minutes=12)).isoformat(),
+        })
+
+        completed = incident_repo.complete_incident(
+            incident_id=incident.id,
+            solution_proposed="Índice en orders.customer_id",
+            root_cause_identified="Falta de índice",
+            post_mortem="Se agregó el índice faltante",
+            evaluation={"overall_score": 0.7},
+        )
+
+        assert completed.time_to_diagnose_minutes == 12
+        assert completed.time_to_resolve_minutes == 0
+
+    def test_incident_response_desde_orm(self, incident_repo, session_id):
+        """Test: IncidentResponse se arma desde la fila ORM (id -> incident_id)"""
+        from backend.api.routers.simulators import _to_incident_response
+
+        incident = incident_repo.create(
+            session_id=session_id,
+            student_id="student_test_001",
+            incident_type="API_ERROR",
+            severity="HIGH",
+            incident_description="API endpoint /users devuelve HTTP 500"
+        )
+
+        response = _to_incident_response(incident)
+
+        assert response.incident_id == incident.id
+        assert response.incident_description == incident.incident_description
+        assert response.solution_proposed is None
+        assert response.diagnosis_process == []
+
     def test_get_by_student(self, incident_repo, session_id):
         """Test: Obtener incidentes por estudiante"""
         # Crear 2 incidentes
@@ -399,6 +488,51 @@ class TestSimuladorProfesionalAgentIRIA:
             assert len(incident["logs"]) > 0
             assert incident["metrics"]["cpu_usage_percent"] >= 0
 
+    @pytest.mark.asyncio
+    async def test_generar_incidente_usa_response_cache(self):
+        """Test: El incidente del LLM se cachea por tipo + severidad; el fallback no"""
+        import threading
+        from backend.llm.base import LLMResponse
+
+        class MemoryCache:
+            def __init__(self):
+                self.store = {}
+                self.threads = set()
+
+            def get(self, key, mode=None):
+                self.threads.add(threading.get_ident())
+                return self.store.get((key, mode))
+
+            def set(self, key, value, mode=None):
+                self.threads.add(threading.get_ident())
+                self.store[(key, mode)] = value
+
+        class CountingLLM:
+            def __init__(self, content):
+                self.content = content
+                self.calls = 0
+
+            async def generate(self, messages, **kwargs):
+                self.calls += 1
+                return LLMResponse(content=self.content, model="fake", usage={})
+
+        cache = MemoryCache()
+        llm = CountingLLM('{"description": "API caída", "logs": "ERROR 500", "metrics": {}}')
+        agent = SimuladorProfesionalAgent(simulator_type=None, llm_provider=llm, response_cache=cache)
+
+        first = await agent.generar_incidente("API_ERROR", "HIGH")
+        second = await agent.generar_incidente("API_ERROR", "HIGH")
+
+        assert llm.calls == 1
+        assert first == second
+        assert first["description"] == "API caída"
+
+        llm.content = "sin json"
+        await agent.generar_incidente("DATABASE", "HIGH")
+        assert ("DATABASE:HIGH", "INCIDENT") not in cache.store
+        # El cache síncrono nunca se usa desde el event loop
+        assert threading.get_ident() not in cache.threads
+
     def test_evaluar_resolucion_incidente_sin_llm(self):
         """Test: Evaluar resolución sin LLM (heurística)"""
         agent = SimuladorProfesionalAgent(
@@ -515,6 +649,82 @@ result = eval(user_input)
         # SQL injection se detecta cuando hay SELECT * FROM y % juntos
         assert len(vuln_types) >= 2  # Al menos 2 vulnerabilidades críticas
 
+    def test_auditar_seguridad_reporta_linea(self):
+        """Test: Cada vulnerabilidad indica la línea de su primera aparición"""
+        agent = SimuladorProfesionalAgent(simulator_type=None, llm_provider=None)
+
+        codigo = 'import os\nx = 1\nresult = eval(user_input)\nDB_PASSWORD: str = "admin"\n'
+
+        audit = agent.auditar_seguridad(codigo=codigo, lenguaje="python")
+
+        lines = {v["vulnerability_type"]: v["line_number"] for v in audit["vulnerabilities"]}
+        assert lines == {"CODE_INJECTION": 3, "HARDCODED_CREDENTIALS": 4}
+
+    @pytest.mark.asyncio
+    async def test_prompt_layout_keeps_static_prefix(self, monkeypatch):
+        """Test: El contexto dinámico va en el último mensaje, no en el system prompt"""
+        from backend.agents import simulators as simulators_module
+        from backend.llm.base import LLMResponse
+
+        # Sin estado compartido: parámetros del LLM fijos, agente nuevo sin
+        # batcher ni cache y el enum del mismo módulo que la clase del agente
+        monkeypatch.delenv("SIMULATOR_TEMPERATURE", raising=False)
+        monkeypatch.delenv("SIMULATOR_MAX_TOKENS", raising=False)
+
+        class CapturingLLM:
+            def __init__(self):
+                self.calls = []
+
+            async def generate(self, messages, **kwargs):
+                self.calls.append(messages)
+                return LLMResponse(content="ok", model="fake", usage={})
+
+        llm = CapturingLLM()
+        agent = simulators_module.SimuladorProfesionalAgent(
+            simulator_type=simulators_module.SimuladorType.PRODUCT_OWNER,
+            llm_provider=llm,
+            llm_batcher=None,
+            response_cache=None,
+        )
+
+        first_response = await agent.interact("Propuesta A", context={"sprint": 2, "equipo": "backend"})
+        second_response = await agent.interact("Propuesta B", context={"equipo": "backend", "sprint": 3})
+
+        assert first_response["message"] == second_response["message"] == "ok"
+        assert len(llm.calls) == 2
+        first, second = llm.calls
+        assert first[0].content == second[0].content
+        assert "Contexto" not in first[0].content
+        assert first[-1].content.endswith("Propuesta A")
+        assert '{"equipo": "backend", "sprint": 3}' in second[-1].content
+
+    @pytest.mark.asyncio
+    async def test_sprint6_system_prompts_are_static(self):
+        """Test: Los parámetros de IT-IA / IR-IA van en el mensaje del usuario"""
+        from backend.llm.base import LLMResponse
+
+        class CapturingLLM:
+            def __init__(self):
+                self.calls = []
+
+            async def generate(self, messages, **kwargs):
+                self.calls.append(messages)
+                return LLMResponse(content="{}", model="fake", usage={})
+
+        llm = CapturingLLM()
+        agent = SimuladorProfesionalAgent(simulator_type=None, llm_provider=llm)
+
+        await agent.generar_incidente("API_ERROR", "HIGH")
+        await agent.generar_incidente("DATABASE", "LOW")
+        await agent.generar_pregunta_entrevista("CONCEPTUAL", "EASY")
+        await agent.generar_pregunta_entrevista("DESIGN", "HARD", contexto="Actividad: colas")
+
+        incident_a, incident_b, question_a, question_b = llm.calls
+        assert incident_a[0].content == incident_b[0].content
+        assert "DATABASE" in incident_b[-1].content and "LOW" in incident_b[-1].content
+        assert question_a[0].content == question_b[0].content
+        assert "Actividad: colas" in question_b[-1].content
+
 
 # ============================================================================
 # TESTS DE INTEGRACIÓN
@@ -670,5 +880,39 @@ class TestIntegracionCompleta:
         assert completed.time_to_resolve_minutes == 30
 
 
+# ============================================================================
+# TESTS DE SCHEMAS
+# ============================================================================
+
+
+class TestSchemasLimites:
+    """Tests de los límites de tamaño de los requests Sprint 6"""
+
+    def test_security_audit_rechaza_codigo_excesivo(self):
+        """Test: Código por encima de 64k caracteres se rechaza al validar"""
+        from pydantic import ValidationError
+        from backend.api.schemas.simulators import SecurityAuditRequest
+
+        with pytest.raises(ValidationError) as exc_info:
+            SecurityAuditRequest(
+                session_id="session_1", student_id="student_001", code="x = 1\n" * 11_000
+            )
+
+        assert exc_info.value.errors()[0]["type"] == "string_too_long"
+
+    def test_daily_standup_rechaza_texto_excesivo(self):
+        """Test: Campos del daily por encima de 2000 caracteres se rechazan"""
+        from pydantic import ValidationError
+        from backend.api.schemas.simulators import DailyStandupRequest
+
+        with pytest.raises(ValidationError):
+            DailyStandupRequest(
+                session_id="session_1",
+                student_id="student_001",
+                what_did_yesterday="Implementé el login " * 200,
+                what_will_do_today="Tests del login",
+            )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])